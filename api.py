@@ -0,0 +1,104 @@
+import json
+from typing import Any, Dict
+
+from flask import Blueprint, Response, current_app, request
+from werkzeug.utils import secure_filename
+
+from limiter import Overloaded
+from metrics import metrics
+from processed import prepare_results
+from uploads import source_digest
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the standard library encoder
+    orjson = None
+
+api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+
+def dumps(data: Any) -> bytes:
+    """Compact JSON bytes, through orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def json_response(data: Any, status: int = 200) -> Response:
+    return Response(dumps(data), status=status, mimetype='application/json')
+
+
+def overloaded_response(error: Overloaded) -> Response:
+    response = json_response({'error': str(error)}, 503)
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def combined_result(filename: str, parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """The same combined record the upload form stores"""
+    return {
+        "filename": secure_filename(filename),
+        "basic_info": parsed["basic_info"],
+        "subject_table": parsed["subject_table"]
+    }
+
+
+###############################
+# FLASK ROUTE HANDLERS
+###############################
+
+@api_bp.route('/parse', methods=['POST'])
+def parse():
+    """Parse one PDF ('file') and return {'result': combined, 'prepared': view model}"""
+    from app import ProcessingError, index_results, process_pdf
+
+    file = request.files.get('file')
+    if file is None or not file.filename:
+        return json_response({'error': 'No file uploaded'}, 400)
+    if not file.filename.lower().endswith('.pdf'):
+        return json_response({'error': 'Only PDF files are allowed'}, 415)
+
+    try:
+        parsed = process_pdf(file.stream)  # Spooled and hashed while the request was parsed
+    except Overloaded as e:
+        metrics.inc('sppu_uploads_total', outcome='overloaded')
+        return overloaded_response(e)
+    except ProcessingError as e:
+        metrics.inc('sppu_uploads_total', outcome='failed')
+        return json_response({'error': str(e)}, 422)
+    except Exception as e:
+        metrics.inc('sppu_uploads_total', outcome='error')
+        current_app.logger.exception('API parse failed')
+        return json_response({'error': f'Processing failed: {e}'}, 500)
+    metrics.inc('sppu_uploads_total', outcome='ok')
+
+    result = combined_result(file.filename, parsed)
+    index_results([(source_digest(file.stream), result)])
+    with metrics.span('prepare'):
+        prepared = prepare_results([result])[0]
+    with metrics.span('serialize'):
+        return json_response({'result': result, 'prepared': prepared})
+
+
+@api_bp.route('/parse/batch', methods=['POST'])
+def parse_batch():
+    """Parse several PDFs or ZIPs of PDFs ('files'); one entry per PDF, in upload order.
+
+    Each entry is {'file', 'ok', 'result', 'prepared', 'sha256'} or
+    {'file', 'ok': false, 'error'}; 'summary' aggregates the batch as /bulk does.
+    """
+    from app import index_results
+    from bulk import app_bulk_options, process_bulk
+
+    files = [f for f in request.files.getlist('files') or request.files.getlist('file') if f and f.filename]
+    if not files:
+        return json_response({'error': 'No files uploaded'}, 400)
+
+    response = process_bulk(((f.filename, f.stream) for f in files), **app_bulk_options())
+    succeeded = [entry for entry in response['results'] if entry['ok']]
+    index_results((entry['sha256'], entry['result']) for entry in succeeded)
+    with metrics.span('prepare'):
+        for entry, prepared in zip(succeeded, prepare_results([entry['result'] for entry in succeeded])):
+            entry['prepared'] = prepared
+    with metrics.span('serialize'):
+        return json_response(response)
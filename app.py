@@ -1,22 +1,181 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, send_file
+from flask import Flask, Request, Response, current_app, g, render_template, request, redirect, url_for, flash, session, send_file, jsonify
 from werkzeug.utils import secure_filename
 import subprocess
-import re
 import tempfile
+import time
+import itertools
 import os
 import json
 from io import BytesIO
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, Dict, Any, Iterable, Optional, Sequence
 from datetime import datetime
+from cache import ResultCache
+from result_store import create_result_store, get_result_store
+from jobs import JobManager, QueueFull
+from metrics import metrics, format_sample, prune_dead_workers
+from results_index import ResultsIndex
+from pdf_region import region_args
+from limiter import ConcurrencyLimiter, HostSemaphore, Overloaded
+from uploads import PdfSource, SpooledUpload, source_digest, source_size
+from marksheet import (MARKSHEET_PARSERS, ExtractionError, ExtractionTimeout, extract_sgpa_info, has_complete_table,
+                       iter_table_lines, pdftotext)
+
+class UploadRequest(Request):
+    """Request that allows a larger body on the bulk endpoint and spools file parts as they stream in"""
+
+    @property
+    def max_content_length(self):
+        if self.endpoint in ('bulk.bulk_upload', 'api.parse_batch'):
+            return current_app.config['BULK_MAX_CONTENT_LENGTH']
+        return current_app.config['MAX_CONTENT_LENGTH']
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # The multipart parser writes each file part here chunk by chunk
+        return SpooledUpload(current_app.config['UPLOAD_SPOOL_SIZE'])
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.secret_key = 'your-secret-key-here'  # Change this for production
 app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # 5MB upload limit
+app.config['BULK_MAX_CONTENT_LENGTH'] = 200 * 1024 * 1024  # ZIP of a whole division
+# Uploaded files stay in memory up to this size, then spill to a temp file
+app.config['UPLOAD_SPOOL_SIZE'] = int(os.environ.get('UPLOAD_SPOOL_SIZE', 256 * 1024))
+app.config['BULK_WORKERS'] = int(os.environ.get('BULK_WORKERS', 0)) or None  # None = one per core
+
+# Subject table parser: 'regex' (default) or 'columns' (fixed-width offsets
+# from the table header, regex fallback for rows that don't fit; same
+# records, no measurable speed-up over regex)
+app.config['MARKSHEET_PARSER'] = os.environ.get('MARKSHEET_PARSER', 'regex')
+
+# pdftotext first converts only these pages ('FIRST-LAST', '' = all) and
+# this crop box ('x,y,W,H' in points, '' = whole page; learn one with
+# `python -m pdf_region samples/*.pdf`). Marksheets whose subject table is
+# not complete in that region are converted again in full.
+app.config['PDFTOTEXT_PAGES'] = os.environ.get('PDFTOTEXT_PAGES', '1-1')
+app.config['PDFTOTEXT_CROP'] = os.environ.get('PDFTOTEXT_CROP', '')
+region_args(app.config['PDFTOTEXT_PAGES'], app.config['PDFTOTEXT_CROP'])  # fail fast on bad settings
+
+# At most PDFTOTEXT_CONCURRENCY pdftotext runs per worker process; up to
+# PDFTOTEXT_QUEUE more uploads wait PDFTOTEXT_QUEUE_TIMEOUT seconds for a
+# slot and the rest get an immediate 503 with Retry-After
+app.config['PDFTOTEXT_CONCURRENCY'] = int(os.environ.get('PDFTOTEXT_CONCURRENCY', 0)) or os.cpu_count() or 1
+app.config['PDFTOTEXT_QUEUE'] = int(os.environ.get('PDFTOTEXT_QUEUE', 16))
+app.config['PDFTOTEXT_QUEUE_TIMEOUT'] = float(os.environ.get('PDFTOTEXT_QUEUE_TIMEOUT', 10))  # seconds
+app.config['PDFTOTEXT_TIMEOUT'] = float(os.environ.get('PDFTOTEXT_TIMEOUT', 30))  # seconds per run, then killed
+app.config['PDFTOTEXT_RETRY_AFTER'] = int(os.environ.get('PDFTOTEXT_RETRY_AFTER', 5))  # seconds
+# Wait queue of the asyncio path (async_app.py), where a waiting upload is
+# a suspended coroutine rather than a blocked thread
+app.config['ASYNC_PDFTOTEXT_QUEUE'] = int(os.environ.get('ASYNC_PDFTOTEXT_QUEUE', 512))
+# On top of that, at most PDFTOTEXT_HOST_CONCURRENCY pdftotext runs across
+# every worker process and bulk pool worker on the host, counted with lock
+# files in PDFTOTEXT_LOCK_DIR (serve.py also splits PDFTOTEXT_CONCURRENCY
+# and BULK_WORKERS across the gunicorn workers)
+app.config['PDFTOTEXT_HOST_CONCURRENCY'] = int(os.environ.get('PDFTOTEXT_HOST_CONCURRENCY', 0)) or os.cpu_count() or 1
+app.config['PDFTOTEXT_LOCK_DIR'] = os.environ.get(
+    'PDFTOTEXT_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'sppu_pdftotext_slots'))
+
+extraction_limiter = ConcurrencyLimiter(
+    max_concurrent=app.config['PDFTOTEXT_CONCURRENCY'],
+    max_waiting=app.config['PDFTOTEXT_QUEUE'],
+    wait_timeout=app.config['PDFTOTEXT_QUEUE_TIMEOUT'],
+    retry_after=app.config['PDFTOTEXT_RETRY_AFTER']
+)
+pdftotext_slots = HostSemaphore(
+    app.config['PDFTOTEXT_LOCK_DIR'],
+    app.config['PDFTOTEXT_HOST_CONCURRENCY'],
+    retry_after=app.config['PDFTOTEXT_RETRY_AFTER']
+)
+app.extensions['pdftotext_slots'] = pdftotext_slots
+
+# Parsed results cache shared by all workers on the host
+app.config['RESULT_CACHE_PATH'] = os.environ.get(
+    'RESULT_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'sppu_result_cache.sqlite3'))
+app.config['RESULT_CACHE_MAX_BYTES'] = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+app.config['RESULT_CACHE_TTL'] = int(os.environ.get('RESULT_CACHE_TTL', 24 * 60 * 60))  # seconds
+
+result_cache = ResultCache(
+    app.config['RESULT_CACHE_PATH'],
+    max_bytes=app.config['RESULT_CACHE_MAX_BYTES'],
+    ttl=app.config['RESULT_CACHE_TTL']
+)
+app.extensions['result_cache'] = result_cache
+
+# Parsed results live server-side; the session only carries an opaque id.
+# Use 'memory' for a single process, 'sqlite' when running several workers.
+app.config['RESULT_STORE'] = os.environ.get('RESULT_STORE', 'sqlite')
+app.config['RESULT_STORE_PATH'] = os.environ.get(
+    'RESULT_STORE_PATH', os.path.join(tempfile.gettempdir(), 'sppu_results.sqlite3'))
+app.config['RESULT_STORE_MAX_ENTRIES'] = int(os.environ.get('RESULT_STORE_MAX_ENTRIES', 10000))
+app.config['RESULT_STORE_TTL'] = int(os.environ.get('RESULT_STORE_TTL', 2 * 60 * 60))  # seconds
+
+app.extensions['result_store'] = create_result_store(
+    app.config['RESULT_STORE'],
+    path=app.config['RESULT_STORE_PATH'],
+    max_entries=app.config['RESULT_STORE_MAX_ENTRIES'],
+    ttl=app.config['RESULT_STORE_TTL']
+)
+
+# Opt-in: set RESULT_INDEX_PATH (somewhere durable, not the temp dir) to
+# also record every parsed marksheet in a queryable index (see /index/...).
+# It holds every student's full result, so /index and /export answer only
+# requests carrying `Authorization: Bearer <INDEX_ADMIN_TOKEN>` (403 otherwise)
+app.config['RESULT_INDEX_PATH'] = os.environ.get('RESULT_INDEX_PATH', '')
+app.config['INDEX_ADMIN_TOKEN'] = os.environ.get('INDEX_ADMIN_TOKEN', '')
+
+results_index = ResultsIndex(app.config['RESULT_INDEX_PATH']) if app.config['RESULT_INDEX_PATH'] else None
+app.extensions['results_index'] = results_index
+
+# Opt-in background processing: POST with mode=async (or set JOB_MODE) to
+# get a job id back immediately and poll /jobs/<id> for the result
+app.config['JOB_MODE'] = os.environ.get('JOB_MODE', '0') == '1'
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 4))
+app.config['JOB_QUEUE_SIZE'] = int(os.environ.get('JOB_QUEUE_SIZE', 100))
+
+job_manager = JobManager(
+    max_workers=app.config['JOB_WORKERS'],
+    max_queue=app.config['JOB_QUEUE_SIZE']
+)
+
+# Each worker writes its metrics snapshot here; /metrics merges them all
+app.config['METRICS_DIR'] = os.environ.get(
+    'METRICS_DIR', os.path.join(tempfile.gettempdir(), 'sppu_metrics'))
+app.config['METRICS_FLUSH_INTERVAL'] = float(os.environ.get('METRICS_FLUSH_INTERVAL', 1.0))  # seconds
+
+prune_dead_workers(app.config['METRICS_DIR'])
+metrics.gauge('sppu_pdftotext_running', 'pdftotext runs holding an extraction slot',
+              lambda: extraction_limiter.stats()['running'])
+metrics.gauge('sppu_pdftotext_queued', 'Uploads waiting for an extraction slot',
+              lambda: extraction_limiter.stats()['waiting'])
+metrics.counter('sppu_pdftotext_rejected_total', 'Uploads turned away because the extraction queue was full',
+                lambda: extraction_limiter.stats()['rejected'])
+metrics.counter('sppu_pdftotext_queue_timeouts_total', 'Uploads that gave up waiting for an extraction slot',
+                lambda: extraction_limiter.stats()['timed_out'])
+metrics.histogram('sppu_pdftotext_wait_seconds', 'Time spent waiting for an extraction slot')
+metrics.counter('sppu_pdftotext_timeouts_total', 'pdftotext runs killed for exceeding PDFTOTEXT_TIMEOUT')
+metrics.counter('sppu_pdftotext_region_total', 'Region-limited pdftotext runs by outcome (hit, fallback, failed)')
+metrics.gauge('sppu_jobs_queued', 'Background jobs waiting for a thread',
+              lambda: job_manager.stats()['queued'])
+metrics.gauge('sppu_jobs_running', 'Background jobs currently running',
+              lambda: job_manager.stats()['running'])
+metrics.counter('sppu_jobs_rejected_total', 'Uploads rejected because the job queue was full',
+                lambda: job_manager.stats()['rejected'])
 
 # Register blueprint (to be created later)
 from processed import processed_bp
 app.register_blueprint(processed_bp)
 
+from bulk import bulk_bp
+app.register_blueprint(bulk_bp)
+
+from results_index import index_bp
+app.register_blueprint(index_bp)
+
+from exports import export_bp
+app.register_blueprint(export_bp)
+
+from api import api_bp
+app.register_blueprint(api_bp)
+
 # ANSI color codes for terminal output
 class Colors:
     GREEN = "\033[92m"
@@ -46,258 +205,154 @@ def print_processing_header(message: str):
 def print_processing_step(step: int, message: str):
     app.logger.info(f"{Colors.BLUE}{step}. {message}{Colors.RESET}")
 
-def extract_pdf_text(pdf_bytes: bytes) -> Tuple[bool, str]:
-    """Extract text from PDF bytes using pdftotext"""
+def extract_pdf_text(pdf: PdfSource, stop_early: bool = True, options: Sequence[str] = (),
+                     timeout: Optional[float] = None) -> Tuple[bool, str]:
+    """Run marksheet.pdftotext on a PDF (bytes or a spooled upload); (False, "") on failure, which is logged"""
     try:
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=True) as temp_pdf:
-            temp_pdf.write(pdf_bytes)
-            temp_pdf.flush()  # Ensure all data is written to disk
-            
-            result = subprocess.run(
-                ['pdftotext', '-layout', temp_pdf.name, '-'],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            return True, result.stdout
-    except subprocess.CalledProcessError as e:
-        print_error(f"pdftotext failed: {e.stderr}")
-        return False, ""
-    except Exception as e:
-        print_error(f"PDF extraction error: {str(e)}")
-        return False, ""
-
-def extract_subject_table(raw_text: str) -> str:
-    """Extract the subject table from raw text"""
-    lines = raw_text.split('\n')
-    table_lines = []
-    header_found = False
-    header_line_index = -1
-
-    # Find the table header
-    for i, line in enumerate(lines):
-        if re.search(r'Sem\s+SubCode\s+Subject Name', line):
-            header_found = True
-            header_line_index = i
-            table_lines.append(line.strip())
-            break
-    
-    if not header_found:
-        print_error("Table header not found in PDF text")
-        return ""
-    
-    # Extract table rows until end marker
-    for line in lines[header_line_index+1:]:
-        if re.search(r'SGPA|RESULT DATE', line, re.IGNORECASE):
-            break
-        if line.strip():
-            table_lines.append(line.rstrip())
-
-    return '\n'.join(table_lines)
-
-def fix_table_headers(table_text: str) -> str:
-    """Standardize table headers"""
-    lines = table_text.split('\n')
-    if len(lines) < 2:
-        return table_text
-    
-    header = lines[0]
-    
-    # Add missing columns if needed
-    if 'Ern' not in header and 'Crd' in header:
-        crd_pos = header.find('Crd')
-        header = header[:crd_pos+3] + " Ern" + header[crd_pos+3:]
-    
-    if 'Pnt' not in header and 'Crd' in header:
-        crd_positions = [i for i in range(len(header)) if header.startswith('Crd', i)]
-        if crd_positions:
-            last_crd_pos = crd_positions[-1]
-            header = header[:last_crd_pos+3] + "Pnt" + header[last_crd_pos+3:]
-    
-    # Standardize subject name column
-    header = re.sub(r'Subject\s+name', 'SubjectName', header)
-    
-    lines[0] = header
-    return '\n'.join(lines)
-
-def remove_sem_column(table_text: str) -> str:
-    """Remove the semester column from the table"""
-    lines = table_text.split('\n')
-    if not lines:
-        return table_text
-
-    header = lines[0]
-    sem_index = header.find("Sem")
-    if sem_index == -1:
-        return table_text
-
-    sem_width = 4
-    new_lines = []
-    for line in lines:
-        if len(line) > sem_index + sem_width:
-            new_lines.append(line[:sem_index] + line[sem_index+sem_width:])
-        else:
-            new_lines.append(line[:sem_index])
+        return True, pdftotext(pdf, stop_early=stop_early, options=options, timeout=timeout)
+    except ExtractionTimeout as e:
+        metrics.inc('sppu_pdftotext_timeouts_total')
+        print_error(str(e))
+    except ExtractionError as e:
+        print_error(str(e))
+    return False, ""
 
-    return '\n'.join(new_lines)
+def extract_marksheet_text(pdf: PdfSource) -> Tuple[bool, str]:
+    """Extract only the configured page range / crop box, or the whole PDF if that misses the table.
 
-def parse_marksheet(text: str) -> List[Dict[str, Any]]:
-    """Parse marksheet text into structured records"""
-    lines = text.split('\n')
-    records = []
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        i += 1
-        
-        if not line or line.startswith('SubCode'):
-            continue
-            
-        # Subject line processing
-        main_line_match = re.match(r'^\*?\s*(\S+)\s+(.*)', line)
-        if not main_line_match:
-            continue
-            
-        sub_code = main_line_match.group(1)
-        rest_of_line = main_line_match.group(2).strip()
-        
-        # Handle foreign language subjects
-        if sub_code.endswith('E') and rest_of_line.startswith('FOREIGN LANGUAGE'):
-            sub_code = sub_code[:-1]
-            
-        # Parse subject data
-        subject_name = ""
-        data_part = ""
-        has_ac = False
-        
-        # Check for AC (Additional Credit)
-        ac_match = re.search(r'\bAC\b', rest_of_line)
-        if ac_match:
-            has_ac = True
-            data_part = "AC"
-            subject_name = rest_of_line[:ac_match.start()].strip()
-            
-            # Handle multi-line subject names
-            while i < len(lines):
-                next_line = lines[i].strip()
-                if not next_line:
-                    i += 1
-                    continue
-                if re.match(r'^\*?\s*\d+', next_line):
-                    break
-                subject_name += " " + next_line
-                i += 1
-        else:
-            # Handle normal grade lines
-            data_match = re.search(r'(\d+\s+\d+\s+[A-Z+]+\s+\d+\s+\d+.*)$', rest_of_line)
-            if data_match:
-                data_part = data_match.group(1)
-                subject_name = rest_of_line[:data_match.start()].strip()
-                
-                # Handle multi-line subject names
-                while i < len(lines):
-                    next_line = lines[i].strip()
-                    if not next_line:
-                        i += 1
-                        continue
-                    if re.match(r'^\*?\s*\d+', next_line) or \
-                       re.search(r'(\d+\s+\d+\s+[A-Z+]+\s+\d+\s+\d+.*|\bAC\b)$', next_line):
-                        break
-                    subject_name += " " + next_line
-                    i += 1
-            else:
-                # Handle special cases
-                subject_name = rest_of_line
-                found_data = False
-                while i < len(lines) and not found_data:
-                    next_line = lines[i].strip()
-                    if not next_line:
-                        i += 1
-                        continue
-                        
-                    if re.match(r'^\*?\s*\d+', next_line):
-                        if "FOREIGN LANGUAGE" in subject_name:
-                            data_part = "AC"
-                            has_ac = True
-                            found_data = True
-                            break
-                        break
-                    
-                    ac_match = re.search(r'\bAC\b', next_line)
-                    if ac_match:
-                        data_part = "AC"
-                        has_ac = True
-                        subject_name += " " + next_line[:ac_match.start()].strip()
-                        found_data = True
-                        i += 1
-                        continue
-                        
-                    data_match = re.search(r'(\d+\s+\d+\s+[A-Z+]+\s+\d+\s+\d+.*)$', next_line)
-                    if data_match:
-                        data_part = data_match.group(1)
-                        subject_name += " " + next_line[:data_match.start()].strip()
-                        found_data = True
-                        i += 1
-                    else:
-                        subject_name += " " + next_line
-                        i += 1
-                
-                if not found_data and "FOREIGN LANGUAGE" in subject_name:
-                    data_part = "AC"
-                    has_ac = True
-        
-        # Create record
-        subject_name = re.sub(r'\s+', ' ', subject_name).strip()
-        
-        if has_ac or data_part == "AC":
-            record = {
-                'SubCode': sub_code,
-                'SubjectName': subject_name,
-                'Credit': None,
-                'EarnedCredit': None,
-                'Grade': 'AC',
-                'GradePoint': None,
-                'CreditPoint': None
-            }
-        else:
-            data_values = re.findall(r'\S+', data_part)
-            if len(data_values) >= 5:
-                record = {
-                    'SubCode': sub_code,
-                    'SubjectName': subject_name,
-                    'Credit': data_values[0],
-                    'EarnedCredit': data_values[1],
-                    'Grade': data_values[2],
-                    'GradePoint': data_values[3],
-                    'CreditPoint': data_values[4]
-                }
-            else:
-                continue
-        
-        records.append(record)
-    
-    return records
-
-def extract_sgpa_info(text: str) -> List[Dict[str, Any]]:
-    """Extract SGPA information from raw text"""
-    pattern = re.compile(
-        r'(?P<semester>\b(?:First|Second|Third|Fourth|Fifth|Sixth|Seventh|Eighth)\s+Semester)\s+SGPA\s*:\s*(?P<sgpa>[^\s]+)\s+Credits Earned/Total\s*:\s*(?P<earned>\d+)/(?P<total>\d+)\s+Total Credit Points\s*:\s*(?P<points>\d+)',
-        re.IGNORECASE
-    )
-
-    return [{
-        "semester": match.group("semester").title(),
-        "sgpa": match.group("sgpa") if re.match(r'^\d+\.\d+$', match.group("sgpa")) else "--",
-        "earned_credits": match.group("earned"),
-        "total_credits": match.group("total"),
-        "total_credit_points": match.group("points")
-    } for match in pattern.finditer(text)]
+    The region's text is used when it contains the whole subject table
+    (header through RESULT DATE). A different layout, a table running
+    onto a later page or a page without a text layer falls back to
+    converting the full document. A PDF that pdftotext rejects is not
+    retried.
+    """
+    timeout = app.config['PDFTOTEXT_TIMEOUT']
+    options = region_args(app.config['PDFTOTEXT_PAGES'], app.config['PDFTOTEXT_CROP'])
+    if not options:
+        return extract_pdf_text(pdf, timeout=timeout)
+    success, text = extract_pdf_text(pdf, options=options, timeout=timeout)
+    if not success or has_complete_table(text):
+        metrics.inc('sppu_pdftotext_region_total', outcome='hit' if success else 'failed')
+        return success, text
+    metrics.inc('sppu_pdftotext_region_total', outcome='fallback')
+    print_warning("Subject table not found in the configured region, extracting the whole PDF")
+    return extract_pdf_text(pdf, timeout=timeout)
 
 def generate_result_data(data):
     """Generate JSON data in memory"""
     return json.dumps(data, indent=4)
 
+class ProcessingError(Exception):
+    """Raised when a PDF cannot be turned into a result (message is shown to the user)"""
+
+def lookup_cached(pdf: PdfSource) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """The PDF's digest and its cached parse, if this PDF was seen before"""
+    with metrics.span('cache_lookup'):
+        digest = source_digest(pdf)  # Already computed for streamed uploads
+        cached = result_cache.get(digest)
+    if cached is not None:
+        print_info(f"Cache hit for {digest[:12]}, skipping extraction")
+    return digest, cached
+
+def process_pdf(pdf: PdfSource) -> Dict[str, Any]:
+    """Run the extraction pipeline on a PDF, going through the result cache"""
+    # Same PDF uploaded before: skip extraction and parsing
+    digest, cached = lookup_cached(pdf)
+    if cached is not None:
+        return cached
+
+    metrics.observe('sppu_pdf_bytes', source_size(pdf))
+
+    # Step 1: Extract text
+    print_processing_step(1, "Extracting text")
+    # Bounded: waits for a free slot (in this process, then on the host)
+    # or raises Overloaded (503 to the client)
+    with extraction_limiter.slot() as waited, \
+            pdftotext_slots.hold(app.config['PDFTOTEXT_QUEUE_TIMEOUT']) as host_waited:
+        metrics.observe('sppu_pdftotext_wait_seconds', waited + host_waited)
+        with metrics.span('pdftotext'):
+            success, raw_text = extract_marksheet_text(pdf)
+            if not success:
+                raise ProcessingError('Text extraction failed')
+    return parse_extracted_text(digest, raw_text)
+
+def parse_extracted_text(digest: str, raw_text: str) -> Dict[str, Any]:
+    """Steps 2-4 of the pipeline on pdftotext output; the parse is cached under digest"""
+    metrics.observe('sppu_raw_text_chars', len(raw_text))
+
+    # Step 2: Extract table (header fix and semester column removal are
+    # applied lazily as the parser pulls lines)
+    print_processing_step(2, "Extracting subject table")
+    with metrics.span('table_extract'):
+        table_lines = iter_table_lines(raw_text)
+        header = next(table_lines, None)
+        if header is None:
+            print_error("Table header not found in PDF text")
+            raise ProcessingError('No subject table found')
+
+    # Step 3: Parse marksheet
+    print_processing_step(3, "Parsing marksheet")
+    with metrics.span('parse'):
+        parse = MARKSHEET_PARSERS[app.config['MARKSHEET_PARSER']]
+        subject_records = parse(itertools.chain((header,), table_lines))
+        if not subject_records:
+            raise ProcessingError('No subject records parsed')
+    metrics.observe('sppu_subject_records', len(subject_records))
+
+    # Step 4: Extract SGPA
+    print_processing_step(4, "Extracting SGPA info")
+    with metrics.span('sgpa_extract'):
+        sgpa_info = extract_sgpa_info(raw_text)
+
+    parsed = {
+        "basic_info": sgpa_info,
+        "subject_table": subject_records
+    }
+    with metrics.span('cache_store'):
+        result_cache.set(digest, parsed)
+    return parsed
+
+def index_results(items: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+    """Record (digest, combined result) pairs in the results index, if enabled"""
+    if results_index is None:
+        return
+    try:
+        with metrics.span('index'):
+            results_index.add_many(items)
+    except Exception as e:
+        # The index is for analytics; never fail an upload because of it
+        print_warning(f"Could not index result: {e}")
+
+def store_result(pdf: PdfSource, filename: str, store) -> str:
+    """Process a PDF and save the combined result, returning its result id"""
+    print_processing_header(f"Processing {filename}")
+    parsed = process_pdf(pdf)
+
+    # Prepare results
+    combined_data = {
+        "filename": secure_filename(filename),
+        "basic_info": parsed["basic_info"],
+        "subject_table": parsed["subject_table"]
+    }
+
+    # Step 5: Generate JSON data in memory
+    print_processing_step(5, "Generating JSON data")
+    with metrics.span('serialize'):
+        json_data = generate_result_data(combined_data)
+    print_success("JSON data generated successfully")
+
+    index_results([(source_digest(pdf), combined_data)])
+
+    with metrics.span('store'):
+        return store.put(json_data)
+
+def wants_job_mode() -> bool:
+    """Whether this upload should be queued as a background job"""
+    mode = request.values.get('mode')
+    if mode:
+        return mode == 'async'
+    return app.config['JOB_MODE']
+
 @app.route('/', methods=['GET', 'POST'])
 def upload_file():
     if request.method == 'POST':
@@ -313,75 +368,184 @@ def upload_file():
         
         if file and file.filename.lower().endswith('.pdf'):
             try:
-                # Process PDF
-                pdf_bytes = file.read()
-                
-                print_processing_header(f"Processing {file.filename}")
-                
-                # Step 1: Extract text
-                print_processing_step(1, "Extracting text")
-                success, raw_text = extract_pdf_text(pdf_bytes)
-                if not success:
-                    flash('Text extraction failed')
-                    return redirect(request.url)
-                
-                # Step 2: Extract table
-                print_processing_step(2, "Extracting subject table")
-                table_text = extract_subject_table(raw_text)
-                if not table_text:
-                    flash('No subject table found')
-                    return redirect(request.url)
-                
-                # Step 3: Fix headers
-                print_processing_step(3, "Standardizing headers")
-                fixed_table = fix_table_headers(table_text)
-                
-                # Step 4: Remove semester column
-                print_processing_step(4, "Removing semester column")
-                final_table = remove_sem_column(fixed_table)
-                
-                # Step 5: Parse marksheet
-                print_processing_step(5, "Parsing marksheet")
-                subject_records = parse_marksheet(final_table)
-                if not subject_records:
-                    flash('No subject records parsed')
-                    return redirect(request.url)
-                
-                # Step 6: Extract SGPA
-                print_processing_step(6, "Extracting SGPA info")
-                sgpa_info = extract_sgpa_info(raw_text)
+                # Process PDF (file.stream is the SpooledUpload it was streamed into)
+                store = get_result_store()
                 
-                # Prepare results
-                combined_data = {
-                    "filename": secure_filename(file.filename),
-                    "basic_info": sgpa_info,
-                    "subject_table": subject_records
-                }
+                if wants_job_mode():
+                    # Hand the PDF to the worker pool and answer right away; the
+                    # job needs its own copy since the upload is closed with the request
+                    try:
+                        job_id = job_manager.submit(store_result, file.read(), file.filename, store)
+                    except QueueFull:
+                        metrics.inc('sppu_uploads_total', outcome='rejected')
+                        response = jsonify({'error': 'Job queue is full, try again shortly'})
+                        response.headers['Retry-After'] = '5'
+                        return response, 503
+                    metrics.inc('sppu_uploads_total', outcome='queued')
+                    print_info(f"Queued {file.filename} as job {job_id}")
+                    return jsonify({
+                        'job_id': job_id,
+                        'status': 'queued',
+                        'status_url': url_for('job_status', job_id=job_id)
+                    }), 202
                 
-                # Step 7: Generate JSON data in memory
-                print_processing_step(7, "Generating JSON data")
-                json_data = generate_result_data(combined_data)
-                print_success("JSON data generated successfully")
+                result_id = store_result(file.stream, file.filename, store)
                 
-                # Store JSON data in session (in memory)
-                session['result_json'] = json_data
+                # Keep the result server-side, only its id goes into the cookie
+                if session.get('result_id'):
+                    store.delete(session['result_id'])
+                session['result_id'] = result_id
+                metrics.inc('sppu_uploads_total', outcome='ok')
                 
                 return redirect(url_for('processed.show_results'))
                 
+            except Overloaded as e:
+                metrics.inc('sppu_uploads_total', outcome='overloaded')
+                response = jsonify({'error': str(e)})
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response, 503
+            except ProcessingError as e:
+                metrics.inc('sppu_uploads_total', outcome='failed')
+                flash(str(e))
+                return redirect(request.url)
             except Exception as e:
+                metrics.inc('sppu_uploads_total', outcome='error')
                 print_error(f"Processing error: {str(e)}")
                 flash(f'Processing failed: {str(e)}')
                 return redirect(request.url)
         else:
+            metrics.inc('sppu_uploads_total', outcome='rejected_type')
             flash('Only PDF files are allowed')
             return redirect(request.url)
     
     return render_template('upload.html')
 
+@app.route('/jobs/stats')
+def job_stats():
+    """Report job queue depth, wait time and run time"""
+    return jsonify(job_manager.stats())
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Report the state of a background processing job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    status = job.to_dict()
+    if job.status == 'done':
+        status['result_url'] = url_for('job_result', job_id=job_id)
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    """Attach a finished job's result to the session and show it"""
+    job = job_manager.get(job_id)
+    if job is None or job.status != 'done':
+        flash('Result is not ready yet')
+        return redirect(url_for('upload_file'))
+    
+    previous = session.get('result_id')
+    if previous and previous != job.result:
+        get_result_store().delete(previous)
+    session['result_id'] = job.result
+    return redirect(url_for('processed.show_results'))
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Observe request latency per endpoint and publish this worker's metrics"""
+    started = g.pop('request_started', None)
+    if started is not None and request.endpoint != 'metrics_endpoint':
+        metrics.observe('sppu_http_request_duration_seconds', time.perf_counter() - started,
+                        endpoint=request.endpoint or 'unmatched')
+    try:
+        metrics.flush(app.config['METRICS_DIR'], app.config['METRICS_FLUSH_INTERVAL'])
+    except OSError as e:
+        print_warning(f"Could not write metrics snapshot: {e}")
+    return response
+
+###############################
+# WARM-UP AND READINESS
+###############################
+
+WARM_TEMPLATES = ['upload.html', 'result.html']
+
+def warm_up() -> Dict[str, Any]:
+    """Check pdftotext and compile the page templates; returns the readiness state.
+
+    serve.py runs this in the gunicorn master before it binds, so with
+    preload_app the compiled templates and export modules are shared by
+    every worker copy-on-write.
+    """
+    checks = {}
+    try:
+        proc = subprocess.run(['pdftotext', '-v'], capture_output=True, timeout=10)
+        version = (proc.stderr or proc.stdout).decode(errors='replace').strip().splitlines()
+        checks['pdftotext'] = version[0] if proc.returncode == 0 and version else f"exit status {proc.returncode}"
+        pdftotext_ok = proc.returncode == 0
+    except (OSError, subprocess.SubprocessError) as e:
+        checks['pdftotext'] = str(e)
+        pdftotext_ok = False
+
+    templates_ok = True
+    for name in WARM_TEMPLATES:
+        try:
+            app.jinja_env.get_template(name)
+            checks[name] = 'compiled'
+        except Exception as e:
+            checks[name] = f"{e.__class__.__name__}: {e}"
+            templates_ok = False
+
+    # Only needed for downloads, so not imported at startup; load it once here
+    import openpyxl  # noqa: F401
+
+    state = {'ready': pdftotext_ok and templates_ok, 'checks': checks, 'checked_at': time.time()}
+    app.extensions['readiness'] = state
+    return state
+
+@app.route('/ready')
+def readiness():
+    """200 once warm-up has passed, 503 with the failing checks otherwise"""
+    state = app.extensions.get('readiness')
+    if state is None or not state['ready']:
+        # Dev server (no serve.py) or a failed check: check again now
+        state = warm_up()
+    return jsonify(state), 200 if state['ready'] else 503
+
+# Prometheus text format, as served by /metrics here and in async_app.py
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def render_metrics() -> str:
+    """Metrics merged across all workers on this host, plus the shared result cache's"""
+    text = metrics.render(metrics.collect(app.config['METRICS_DIR']))
+    # The result cache is shared by all workers, so report it once
+    cache = result_cache.stats()
+    text += format_sample('sppu_result_cache_hits_total', 'counter', 'Result cache hits', cache['hits'])
+    text += format_sample('sppu_result_cache_misses_total', 'counter', 'Result cache misses', cache['misses'])
+    text += format_sample('sppu_result_cache_evictions_total', 'counter', 'Result cache evictions', cache['evictions'])
+    text += format_sample('sppu_result_cache_bytes', 'gauge', 'Result cache size in bytes', cache['size_bytes'])
+    return text
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics merged across all workers on this host"""
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/cache/stats')
+def cache_stats():
+    """Report result cache hit/miss counters and size"""
+    return jsonify(result_cache.stats())
+
 @app.route('/clear_session')
 def clear_session():
     """Clear the session data"""
-    session.pop('result_json', None)
+    result_id = session.pop('result_id', None)
+    if result_id:
+        get_result_store().delete(result_id)
     flash('Session cleared successfully')
     return redirect(url_for('upload_file'))
 
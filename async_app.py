@@ -0,0 +1,384 @@
+"""Asyncio serving path for the JSON API (requires aiohttp).
+
+Usage:
+    python serve.py --worker-class aiohttp           # under gunicorn
+    python -m async_app [--host 127.0.0.1] [--port 5000]   # one process, for development
+
+Serves /api/v1/parse, /api/v1/parse/batch, /ready and /metrics with the
+same responses as the Flask app. pdftotext runs through
+asyncio.create_subprocess_exec and the parsing steps (the same
+parse_extracted_text the Flask app uses) run in the loop's thread pool.
+A waiting upload is a suspended coroutine, not a blocked worker, so one
+process keeps hundreds of uploads in flight while PDFTOTEXT_CONCURRENCY
+of them run pdftotext.
+"""
+import argparse
+import asyncio
+import codecs
+import io
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+from api import combined_result, dumps
+from app import (METRICS_CONTENT_TYPE, ProcessingError, app, index_results, lookup_cached, parse_extracted_text,
+                 pdftotext_slots, print_error, print_warning, render_metrics, warm_up)
+from bulk import expand_inputs, summarize
+from cache import pdf_digest
+from limiter import AsyncConcurrencyLimiter, Overloaded
+from marksheet import ResultDateScanner, cut_after_result_date, has_complete_table
+from marksheet.pdftotext import READ_CHUNK
+from metrics import metrics
+from pdf_region import region_args
+from processed import prepare_results
+from uploads import UPLOAD_CHUNK, PdfSource, SpooledUpload, source_chunks, source_digest, source_size
+
+# What subprocess text mode (the sync path) decodes pdftotext's output with
+PDFTOTEXT_ENCODING = io.TextIOWrapper(io.BytesIO()).encoding
+
+extraction_limiter = AsyncConcurrencyLimiter(
+    max_concurrent=app.config['PDFTOTEXT_CONCURRENCY'],
+    max_waiting=app.config['ASYNC_PDFTOTEXT_QUEUE'],
+    wait_timeout=app.config['PDFTOTEXT_QUEUE_TIMEOUT'],
+    retry_after=app.config['PDFTOTEXT_RETRY_AFTER']
+)
+
+metrics.gauge('sppu_async_pdftotext_running', 'pdftotext runs holding a slot on the asyncio path',
+              lambda: extraction_limiter.stats()['running'])
+metrics.gauge('sppu_async_pdftotext_queued', 'Uploads waiting for a slot on the asyncio path',
+              lambda: extraction_limiter.stats()['waiting'])
+metrics.counter('sppu_async_pdftotext_rejected_total', 'Uploads turned away on the asyncio path (queue full)',
+                lambda: extraction_limiter.stats()['rejected'])
+metrics.counter('sppu_async_pdftotext_queue_timeouts_total', 'Uploads that gave up waiting on the asyncio path',
+                lambda: extraction_limiter.stats()['timed_out'])
+
+
+###############################
+# EXTRACTION
+###############################
+
+async def extract_pdf_text_async(pdf: PdfSource, stop_early: bool = True, options: Sequence[str] = (),
+                                 timeout: Optional[float] = None) -> Tuple[bool, str]:
+    """extract_pdf_text on the event loop: same arguments, same text, no thread blocked"""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            'pdftotext', '-layout', *options, '-', '-',
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except OSError as e:
+        print_error(f"PDF extraction error: {str(e)}")
+        return False, ""
+
+    errors: List[str] = []
+
+    async def feed() -> None:
+        # Write the PDF, then collect stderr, while stdout is read below
+        try:
+            for chunk in source_chunks(pdf):
+                proc.stdin.write(chunk)
+                await proc.stdin.drain()
+            proc.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Child exited early (bad PDF, or we killed it after RESULT DATE)
+        errors.append((await proc.stderr.read()).decode('utf-8', errors='replace'))
+
+    raw: List[bytes] = []
+    stopped = False
+
+    async def read() -> None:
+        nonlocal stopped
+        scanner = ResultDateScanner()
+        decoder = codecs.getincrementaldecoder(PDFTOTEXT_ENCODING)()
+        while True:
+            chunk = await proc.stdout.read(READ_CHUNK)
+            if not chunk:
+                return
+            raw.append(chunk)
+            if stop_early and scanner.feed(decoder.decode(chunk)):
+                stopped = True
+                proc.kill()
+                return
+
+    feeder = asyncio.ensure_future(feed())
+    try:
+        await asyncio.wait_for(read(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        feeder.cancel()
+        metrics.inc('sppu_pdftotext_timeouts_total')
+        print_error(f"pdftotext killed after {timeout}s")
+        return False, ""
+    except Exception as e:
+        proc.kill()
+        await proc.wait()
+        feeder.cancel()
+        print_error(f"PDF extraction error: {str(e)}")
+        return False, ""
+    returncode = await proc.wait()
+    await feeder
+
+    # Decoded in one go exactly as the sync path's text-mode pipe does
+    text = io.TextIOWrapper(io.BytesIO(b''.join(raw)), encoding=PDFTOTEXT_ENCODING).read()
+    if stopped:
+        text = cut_after_result_date(text)
+    if returncode != 0 and not stopped:
+        print_error(f"pdftotext failed: {''.join(errors)}")
+        return False, ""
+    return True, text
+
+
+async def extract_marksheet_text_async(pdf: PdfSource) -> Tuple[bool, str]:
+    """extract_marksheet_text on the event loop (configured region first, whole PDF as fallback)"""
+    timeout = app.config['PDFTOTEXT_TIMEOUT']
+    options = region_args(app.config['PDFTOTEXT_PAGES'], app.config['PDFTOTEXT_CROP'])
+    if not options:
+        return await extract_pdf_text_async(pdf, timeout=timeout)
+    success, text = await extract_pdf_text_async(pdf, options=options, timeout=timeout)
+    if not success or has_complete_table(text):
+        metrics.inc('sppu_pdftotext_region_total', outcome='hit' if success else 'failed')
+        return success, text
+    metrics.inc('sppu_pdftotext_region_total', outcome='fallback')
+    print_warning("Subject table not found in the configured region, extracting the whole PDF")
+    return await extract_pdf_text_async(pdf, timeout=timeout)
+
+
+async def process_pdf_async(pdf: PdfSource, bounded: bool = True) -> Dict[str, Any]:
+    """process_pdf with pdftotext awaited and the blocking steps in the loop's thread pool.
+
+    bounded=False (batch entries) waits for extraction slots without a
+    timeout instead of failing with Overloaded.
+    """
+    loop = asyncio.get_running_loop()
+    digest, cached = await loop.run_in_executor(None, lookup_cached, pdf)
+    if cached is not None:
+        return cached
+
+    metrics.observe('sppu_pdf_bytes', source_size(pdf))
+    async with extraction_limiter.slot(bounded) as waited:
+        # The host-wide slot is waited for in the thread pool (it polls lock files)
+        start = time.monotonic()
+        timeout = app.config['PDFTOTEXT_QUEUE_TIMEOUT'] if bounded else None
+        host_slot = await loop.run_in_executor(None, pdftotext_slots.acquire, timeout)
+        if host_slot is None:
+            raise Overloaded('Timed out waiting for a free extraction slot', pdftotext_slots.retry_after)
+        try:
+            metrics.observe('sppu_pdftotext_wait_seconds', waited + time.monotonic() - start)
+            with metrics.span('pdftotext'):
+                success, raw_text = await extract_marksheet_text_async(pdf)
+                if not success:
+                    raise ProcessingError('Text extraction failed')
+        finally:
+            pdftotext_slots.release(host_slot)
+    return await loop.run_in_executor(None, parse_extracted_text, digest, raw_text)
+
+
+###############################
+# AIOHTTP HANDLERS
+###############################
+
+def json_response(data: Any, status: int = 200) -> web.Response:
+    return web.Response(body=dumps(data), status=status, content_type='application/json')
+
+
+def overloaded_response(error: Overloaded) -> web.Response:
+    response = json_response({'error': str(error)}, 503)
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+class UploadTooLarge(Exception):
+    """The streamed body went past MAX_CONTENT_LENGTH"""
+
+
+async def read_upload(request: web.Request, field: str = 'file') -> Tuple[Optional[str], Optional[SpooledUpload]]:
+    """Stream the first file part named `field` into a SpooledUpload, hashing it on the way.
+
+    Returns (None, None) if there is no such part. As with UploadRequest
+    on the Flask side, no more than UPLOAD_SPOOL_SIZE of the body is held
+    in memory.
+    """
+    limit = app.config['MAX_CONTENT_LENGTH']
+    reader = await request.multipart()
+    async for part in reader:
+        if part.name != field or not part.filename:
+            continue  # The reader drains skipped parts
+        upload = SpooledUpload(app.config['UPLOAD_SPOOL_SIZE'])
+        try:
+            while True:
+                chunk = await part.read_chunk(UPLOAD_CHUNK)
+                if not chunk:
+                    return part.filename, upload
+                if upload.size + len(chunk) > limit:
+                    raise UploadTooLarge()
+                upload.write(chunk)
+        except BaseException:
+            upload.close()
+            raise
+    return None, None
+
+
+async def parse(request: web.Request) -> web.Response:
+    """Same contract as the Flask /api/v1/parse"""
+    if (request.content_length or 0) > app.config['MAX_CONTENT_LENGTH']:
+        return json_response({'error': 'File too large'}, 413)
+    if request.content_type != 'multipart/form-data':
+        return json_response({'error': 'No file uploaded'}, 400)
+    try:
+        filename, upload = await read_upload(request)
+    except UploadTooLarge:
+        return json_response({'error': 'File too large'}, 413)
+    if upload is None:
+        return json_response({'error': 'No file uploaded'}, 400)
+    with upload:
+        if not filename.lower().endswith('.pdf'):
+            return json_response({'error': 'Only PDF files are allowed'}, 415)
+        return await _parse_upload(filename, upload)
+
+
+async def _parse_upload(filename: str, upload: SpooledUpload) -> web.Response:
+    try:
+        parsed = await process_pdf_async(upload)
+    except Overloaded as e:
+        metrics.inc('sppu_uploads_total', outcome='overloaded')
+        return overloaded_response(e)
+    except ProcessingError as e:
+        metrics.inc('sppu_uploads_total', outcome='failed')
+        return json_response({'error': str(e)}, 422)
+    except Exception as e:
+        metrics.inc('sppu_uploads_total', outcome='error')
+        print_error(f"Processing error: {str(e)}")
+        return json_response({'error': f'Processing failed: {e}'}, 500)
+    metrics.inc('sppu_uploads_total', outcome='ok')
+
+    loop = asyncio.get_running_loop()
+    result = combined_result(filename, parsed)
+    await loop.run_in_executor(None, index_results, [(source_digest(upload), result)])
+    prepared = (await loop.run_in_executor(None, prepare_results, [result]))[0]
+    return json_response({'result': result, 'prepared': prepared})
+
+
+async def _process_entry(name: str, pdf_bytes: Optional[bytes], error: Optional[str]) -> Dict[str, Any]:
+    # One /bulk-style entry; a failing file only fails its own entry
+    if error is not None:
+        return {'file': name, 'ok': False, 'error': error}
+    try:
+        parsed = await process_pdf_async(pdf_bytes, bounded=False)
+    except Exception as e:
+        return {'file': name, 'ok': False, 'error': str(e)}
+    return {'file': name, 'ok': True, 'result': combined_result(name.rsplit('/', 1)[-1], parsed),
+            'sha256': pdf_digest(pdf_bytes)}
+
+
+async def parse_batch(request: web.Request) -> web.Response:
+    """Same contract as the Flask /api/v1/parse/batch; the PDFs are processed concurrently.
+
+    At most PDFTOTEXT_CONCURRENCY entries of one batch are in flight, so a
+    large ZIP neither floods the extraction queue (where single uploads
+    would be turned away behind it) nor is decompressed into memory whole.
+    """
+    form = await request.post()
+    files = [f for f in form.getall('files', []) or form.getall('file', [])
+             if isinstance(f, web.FileField) and f.filename]
+    if not files:
+        return json_response({'error': 'No files uploaded'}, 400)
+
+    loop = asyncio.get_running_loop()
+    workers = app.config['PDFTOTEXT_CONCURRENCY']
+    entries = expand_inputs((f.filename, f.file) for f in files)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers)
+    results: List[Optional[Dict[str, Any]]] = []
+
+    async def produce() -> None:
+        # ZIP members are read in the thread pool, one at a time as consumers free up
+        try:
+            while True:
+                entry = await loop.run_in_executor(None, next, entries, None)
+                if entry is None:
+                    break
+                results.append(None)
+                await queue.put((len(results) - 1, entry))
+        finally:
+            for _ in range(workers):
+                await queue.put(None)
+
+    async def consume() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            index, entry = item
+            results[index] = await _process_entry(*entry)
+
+    await asyncio.gather(produce(), *(consume() for _ in range(workers)))
+
+    succeeded = [entry for entry in results if entry['ok']]
+    await loop.run_in_executor(None, index_results, [(e['sha256'], e['result']) for e in succeeded])
+    prepared = await loop.run_in_executor(None, prepare_results, [e['result'] for e in succeeded])
+    for entry, data in zip(succeeded, prepared):
+        entry['prepared'] = data
+    return json_response({'results': results, 'summary': summarize(results)})
+
+
+async def readiness(request: web.Request) -> web.Response:
+    """Same contract as the Flask /ready"""
+    state = app.extensions.get('readiness')
+    if state is None or not state['ready']:
+        state = await asyncio.get_running_loop().run_in_executor(None, warm_up)
+    return json_response(state, 200 if state['ready'] else 503)
+
+
+async def metrics_endpoint(request: web.Request) -> web.Response:
+    """Prometheus metrics merged across all workers on this host"""
+    text = await asyncio.get_running_loop().run_in_executor(None, render_metrics)
+    return web.Response(body=text.encode('utf-8'), headers={'Content-Type': METRICS_CONTENT_TYPE})
+
+
+@web.middleware
+async def record_request_metrics(request: web.Request, handler) -> web.StreamResponse:
+    """Observe request latency per route and publish this worker's metrics"""
+    started = time.perf_counter()
+    try:
+        return await handler(request)
+    finally:
+        route = request.match_info.route.name or 'unmatched'
+        if route != 'metrics_endpoint':
+            metrics.observe('sppu_http_request_duration_seconds', time.perf_counter() - started, endpoint=route)
+        try:
+            metrics.flush(app.config['METRICS_DIR'], app.config['METRICS_FLUSH_INTERVAL'])
+        except OSError as e:
+            print_warning(f"Could not write metrics snapshot: {e}")
+
+
+def create_app() -> web.Application:
+    """The aiohttp application (route names match the Flask endpoints)"""
+    application = web.Application(client_max_size=app.config['BULK_MAX_CONTENT_LENGTH'],
+                                  middlewares=[record_request_metrics])
+    application.add_routes([
+        web.post('/api/v1/parse', parse, name='api.parse'),
+        web.post('/api/v1/parse/batch', parse_batch, name='api.parse_batch'),
+        web.get('/ready', readiness, name='readiness'),
+        web.get('/metrics', metrics_endpoint, name='metrics_endpoint'),
+    ])
+    return application
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    if not warm_up()['ready']:
+        print('Warm-up failed, see /ready for details', file=sys.stderr)
+        return 1
+    web.run_app(create_app(), host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
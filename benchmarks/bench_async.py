@@ -0,0 +1,99 @@
+"""Concurrency of the asyncio path vs the Flask worker classes, on /api/v1/parse.
+
+Usage:
+    python -m benchmarks.bench_async [--worker-class sync --worker-class aiohttp ...]
+                                     [--workers 1] [-c 64] [-n 256] [--synthetic 50]
+
+Starts `python serve.py` once per worker class on a free local port (same
+worker count for each, fresh cache/index/metrics), waits for /ready, runs
+benchmarks.loadtest --api --bust-cache against it and prints the results
+side by side. Needs gunicorn, and aiohttp for the aiohttp class.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks import loadtest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url: str, proc: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with status {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"{url}/ready", timeout=2):
+                return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    raise RuntimeError('server did not become ready')
+
+
+def run_class(worker_class, args, scratch):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    state = os.path.join(scratch, worker_class)
+    env = dict(os.environ,
+               RESULT_CACHE_PATH=os.path.join(state, 'cache.sqlite3'),
+               RESULT_STORE_PATH=os.path.join(state, 'store.sqlite3'),
+               RESULT_INDEX_PATH=os.path.join(state, 'index.sqlite3'),
+               METRICS_DIR=os.path.join(state, 'metrics'))
+    os.makedirs(state)
+    command = [sys.executable, 'serve.py', '--bind', f"127.0.0.1:{port}", '--worker-class', worker_class,
+               '--workers', str(args.workers), '--threads', str(args.threads)]
+    with open(os.path.join(state, 'server.log'), 'w') as log:
+        proc = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            wait_ready(url, proc)
+            report_path = os.path.join(state, 'report.json')
+            loadtest.main(['--url', url, '--api', '--bust-cache', '-c', str(args.concurrency),
+                           '-n', str(args.sessions), '--synthetic', str(args.synthetic), '--json', report_path])
+            with open(report_path, encoding='utf-8') as f:
+                return json.load(f)
+        finally:
+            proc.terminate()
+            proc.wait(30)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--worker-class', action='append', help='Worker classes to compare (default: sync, aiohttp)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes per server')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per gthread worker')
+    parser.add_argument('-c', '--concurrency', type=int, default=64)
+    parser.add_argument('-n', '--sessions', type=int, default=256)
+    parser.add_argument('--synthetic', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as scratch:
+        for worker_class in args.worker_class or ['sync', 'aiohttp']:
+            print(f"== {worker_class} x {args.workers} worker(s), {args.concurrency} concurrent clients")
+            report = run_class(worker_class, args, scratch)
+            step = report['steps'].get('api_parse', {})
+            rows.append((worker_class, report['requests_per_s'], step.get('p50_ms'), step.get('p99_ms'),
+                         report['error_rate']))
+
+    print(f"\n{'worker class':<14}{'req/s':>10}{'p50_ms':>10}{'p99_ms':>10}{'errors':>9}")
+    for worker_class, rate, p50, p99, errors in rows:
+        print(f"{worker_class:<14}{rate:>10}{p50:>10}{p99:>10}{errors:>9.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
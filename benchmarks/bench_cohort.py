@@ -0,0 +1,102 @@
+"""Cohort analytics benchmark: NumPy columnar reports vs per-student loops.
+
+Usage:
+    python -m benchmarks.bench_cohort [-n 100000] [--seed 42] [--prepare 20000]
+
+Results are generated with benchmarks.synthetic (expected records, no
+parsing) and the same reports are computed twice: with cohort.Cohort and
+with plain Python loops over the result dicts. The first --prepare
+students also go through prepare_result_data one by one and through
+prepare_result_data_batch. Both pairs must agree.
+"""
+import argparse
+import copy
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.synthetic import generate_marksheet
+from cohort import Cohort, prepare_result_data_batch
+from processed import prepare_result_data
+
+
+def generate_results(count, seed):
+    rng = random.Random(seed)
+    # One curriculum: a subject keeps the same SubCode for every student
+    codes = {}
+    results = []
+    for index in range(count):
+        _, records, basic_info = generate_marksheet(rng)
+        for record in records:
+            record['SubCode'] = codes.setdefault(record['SubjectName'], str(210000 + len(codes)))
+        results.append({'filename': f"student_{index:06d}.pdf", 'basic_info': basic_info,
+                        'subject_table': records})
+    return results
+
+
+def loop_reports(results):
+    """Reference implementation with one Python loop per student"""
+    grades = defaultdict(Counter)
+    backlogs = Counter()
+    for result in results:
+        failed = 0
+        for subject in result['subject_table']:
+            grades[subject['SubCode']][subject['Grade']] += 1
+            failed += subject['Grade'] == 'F'
+        backlogs[failed] += 1
+    return {code: dict(counts) for code, counts in grades.items()}, dict(backlogs)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--count', type=int, default=100000, help='Students to generate')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--prepare', type=int, default=20000, help='Students for the prepare_result_data comparison')
+    args = parser.parse_args(argv)
+
+    results, elapsed = timed(generate_results, args.count, args.seed)
+    print(f"Generated {args.count} students in {elapsed:.1f}s")
+
+    cohort, ingest = timed(Cohort.from_results, results)
+    print(f"{'ingest':<22}{ingest * 1000:>10.1f} ms  ({len(cohort.row_code)} subject rows)")
+
+    reports = {}
+    for name, fn in [('grade_distribution', cohort.grade_distribution),
+                     ('pass_rates', cohort.pass_rates),
+                     ('backlog_counts', cohort.backlog_counts),
+                     ('class_breakdown', cohort.class_breakdown),
+                     ('summary', cohort.summary)]:
+        reports[name], elapsed = timed(fn)
+        print(f"{name:<22}{elapsed * 1000:>10.1f} ms")
+
+    (loop_grades, loop_backlogs), elapsed = timed(loop_reports, results)
+    print(f"{'python loops':<22}{elapsed * 1000:>10.1f} ms  (grade distribution + backlogs)")
+
+    if loop_grades != reports['grade_distribution'] or loop_backlogs != reports['backlog_counts']['by_count']:
+        print("MISMATCH between vectorized and loop reports")
+        return 1
+    print("Vectorized reports match the loop implementation")
+
+    subset = results[:args.prepare]
+    copies = copy.deepcopy(subset)  # prepare_result_data mutates its input
+    expected, elapsed = timed(lambda: [prepare_result_data(data) for data in copies])
+    print(f"{'prepare (per student)':<22}{elapsed * 1000:>10.1f} ms  ({len(subset)} students)")
+    batched, elapsed = timed(prepare_result_data_batch, subset)
+    print(f"{'prepare (batch)':<22}{elapsed * 1000:>10.1f} ms")
+    if json.dumps(expected) != json.dumps(batched):
+        print("MISMATCH between prepare_result_data and prepare_result_data_batch")
+        return 1
+    print("Batch preparation matches prepare_result_data")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Excel export benchmark: streaming openpyxl writer vs the former pandas path.
+
+Usage:
+    python -m benchmarks.bench_excel [-n 200] [--cohort 5000] [--seed 42]
+
+Single-result workbooks are built both ways for -n prepared results and
+compared cell by cell. The cohort section writes --cohort students (one
+row per subject) with write_cohort_workbook and with one pandas
+DataFrame per sheet, reporting time and peak traced memory.
+"""
+import argparse
+import copy
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+from openpyxl import load_workbook
+
+from benchmarks.bench_cohort import generate_results
+from exports import SEMESTER_COLUMNS, SUBJECT_COLUMNS, write_cohort_workbook
+from processed import build_excel_workbook, detect_and_split_semester, prepare_result_data
+
+
+def build_excel_workbook_pandas(processed_data):
+    """The pandas-based export this repo used before the streaming writer"""
+    import pandas as pd
+
+    mem_file = BytesIO()
+    with pd.ExcelWriter(mem_file, engine='openpyxl') as writer:
+        if 'subject_table' in processed_data:
+            for idx, semester_subjects in enumerate(detect_and_split_semester(processed_data['subject_table']), start=1):
+                if semester_subjects:
+                    pd.DataFrame(semester_subjects).to_excel(writer, sheet_name=f"Semester {idx}", index=False)
+        if 'second_semester_subjects' in processed_data and not any(
+            s.get('second_semester_subjects') for s in processed_data.get('subject_table', [])
+        ):
+            pd.DataFrame(processed_data['second_semester_subjects']).to_excel(
+                writer, sheet_name='Semester 2', index=False)
+        if 'basic_info' in processed_data:
+            pd.DataFrame(processed_data['basic_info']).to_excel(writer, sheet_name='Basic Info', index=False)
+        summary_data = {}
+        for key, label in (('cgpa', 'CGPA'), ('percentage', 'Percentage'),
+                           ('grade', 'Grade'), ('class_awarded', 'Class Awarded')):
+            if key in processed_data:
+                summary_data[label] = processed_data[key]
+        if summary_data:
+            pd.DataFrame([summary_data]).to_excel(writer, sheet_name='Summary', index=False)
+    return mem_file.getvalue()
+
+
+def cohort_workbook_pandas(results, out):
+    import pandas as pd
+
+    subjects, semesters = [], []
+    for result in results:
+        for subject in result['subject_table']:
+            subjects.append({'filename': result['filename'], **{c: subject.get(c) for c in SUBJECT_COLUMNS}})
+        for sem in result['basic_info']:
+            semesters.append({'filename': result['filename'], **{c: sem.get(c) for c in SEMESTER_COLUMNS}})
+    with pd.ExcelWriter(out, engine='openpyxl') as writer:
+        pd.DataFrame(subjects).to_excel(writer, sheet_name='Subjects', index=False)
+        pd.DataFrame(semesters).to_excel(writer, sheet_name='Semesters', index=False)
+
+
+def _trimmed(row):
+    # Empty trailing cells are simply absent in the streamed sheets
+    row = list(row)
+    while row and row[-1] is None:
+        row.pop()
+    return row
+
+
+def cells(xlsx_bytes):
+    """{sheet: rows of values}; NaN/None both read back as None"""
+    workbook = load_workbook(BytesIO(xlsx_bytes), read_only=True)
+    return {sheet.title: [_trimmed(row) for row in sheet.iter_rows(values_only=True)]
+            for sheet in workbook.worksheets}
+
+
+def measure(fn, *args):
+    """Wall time of one run, then peak traced memory of a second run"""
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    # tracemalloc slows allocation-heavy code a lot, so it gets its own run
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--count', type=int, default=200, help='Single-result workbooks to build')
+    parser.add_argument('--cohort', type=int, default=5000, help='Students in the cohort workbook')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    prepared = [prepare_result_data(copy.deepcopy(r)) for r in generate_results(args.count, args.seed)]
+
+    # Import pandas outside the timed region so only the export is measured
+    import pandas  # noqa: F401
+
+    timings = {}
+    for name, build in (('pandas', build_excel_workbook_pandas), ('streaming', build_excel_workbook)):
+        start = time.perf_counter()
+        outputs = [build(data) for data in prepared]
+        timings[name] = (time.perf_counter() - start, outputs)
+        print(f"single {name:<10}{timings[name][0] / len(prepared) * 1000:>9.2f} ms/workbook")
+
+    mismatched = sum(cells(a) != cells(b) for a, b in zip(timings['pandas'][1], timings['streaming'][1]))
+    print(f"Cell mismatches: {mismatched} of {len(prepared)} workbooks")
+
+    results = generate_results(args.cohort, args.seed)
+    for name, write in (('pandas', cohort_workbook_pandas), ('streaming', write_cohort_workbook)):
+        elapsed, peak = measure(lambda: write(iter(results), BytesIO()))
+        print(f"cohort {name:<10}{elapsed:>9.2f} s  peak {peak / 2**20:>7.1f} MiB")
+    return 1 if mismatched else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Compare pdftotext extraction over a temp file against the stdin/stdout pipe path.
+
+Usage:
+    python -m benchmarks.bench_extract marksheet.pdf [more.pdf ...] --repeat 50
+
+The 'region' mode is the app's extract_marksheet_text: only the
+PDFTOTEXT_PAGES / PDFTOTEXT_CROP region, with full extraction as fallback.
+Latency is wall clock per call. Disk and scheduler savings come from
+getrusage deltas (own process plus reaped children). For exact syscall
+counts run a single mode under strace, e.g.
+    strace -f -c python -m benchmarks.bench_extract a.pdf --mode pipe
+"""
+import argparse
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from app import extract_marksheet_text, extract_pdf_text
+
+
+def extract_pdf_text_tempfile(pdf_bytes: bytes):
+    """Previous implementation: write a temp file, buffer all of stdout"""
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=True) as temp_pdf:
+        temp_pdf.write(pdf_bytes)
+        temp_pdf.flush()
+        result = subprocess.run(
+            ['pdftotext', '-layout', temp_pdf.name, '-'],
+            check=True,
+            capture_output=True,
+            text=True
+        )
+        return True, result.stdout
+
+
+MODES = {
+    'tempfile': extract_pdf_text_tempfile,
+    'pipe': lambda pdf_bytes: extract_pdf_text(pdf_bytes, stop_early=False),
+    'pipe-early-stop': extract_pdf_text,
+    'region': extract_marksheet_text,
+}
+
+
+def _usage():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        'cpu': own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime,
+        'voluntary_ctx': own.ru_nvcsw + children.ru_nvcsw,
+        'involuntary_ctx': own.ru_nivcsw + children.ru_nivcsw,
+        'blocks_out': own.ru_oublock + children.ru_oublock,
+        'blocks_in': own.ru_inblock + children.ru_inblock,
+    }
+
+
+def run_mode(name, fn, pdfs, repeat):
+    latencies = []
+    text_bytes = 0
+    before = _usage()
+    for _ in range(repeat):
+        for pdf_bytes in pdfs:
+            start = time.perf_counter()
+            ok, text = fn(pdf_bytes)
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                raise SystemExit(f"{name}: extraction failed")
+            text_bytes += len(text)
+    after = _usage()
+    latencies.sort()
+    calls = len(latencies)
+    return {
+        'mode': name,
+        'calls': calls,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'p50_ms': latencies[calls // 2] * 1000,
+        'p95_ms': latencies[int((calls - 1) * 0.95)] * 1000,
+        'cpu_ms_per_call': (after['cpu'] - before['cpu']) / calls * 1000,
+        'ctx_switches_per_call': ((after['voluntary_ctx'] - before['voluntary_ctx'])
+                                  + (after['involuntary_ctx'] - before['involuntary_ctx'])) / calls,
+        'blocks_out_per_call': (after['blocks_out'] - before['blocks_out']) / calls,
+        'text_kb_per_call': text_bytes / calls / 1024,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pdfs', nargs='+', help='Marksheet PDFs to extract')
+    parser.add_argument('--repeat', type=int, default=20, help='Passes over the input PDFs per mode')
+    parser.add_argument('--mode', choices=sorted(MODES), action='append',
+                        help='Only run the given mode(s); default runs all')
+    args = parser.parse_args(argv)
+
+    pdfs = []
+    for path in args.pdfs:
+        with open(path, 'rb') as f:
+            pdfs.append(f.read())
+
+    modes = args.mode or list(MODES)
+    # Warm the page cache and the pdftotext binary once
+    for name in modes:
+        MODES[name](pdfs[0])
+
+    rows = [run_mode(name, MODES[name], pdfs, args.repeat) for name in modes]
+    columns = ['mode', 'calls', 'mean_ms', 'p50_ms', 'p95_ms', 'cpu_ms_per_call',
+               'ctx_switches_per_call', 'blocks_out_per_call', 'text_kb_per_call']
+    print('  '.join(f"{c:>22}" for c in columns))
+    for row in rows:
+        print('  '.join(f"{row[c]:>22.2f}" if isinstance(row[c], float) else f"{row[c]:>22}" for c in columns))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
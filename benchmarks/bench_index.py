@@ -0,0 +1,64 @@
+"""Results index benchmark: bulk inserts and indexed queries.
+
+Usage:
+    python -m benchmarks.bench_index [-n 30000] [--batch 1000] [--db PATH]
+
+Indexes synthetic results (about 13 subject rows each) in batches of
+--batch per transaction, then times the query API a few times each.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_cohort import generate_results
+from results_index import ResultsIndex
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--count', type=int, default=30000, help='Students to index')
+    parser.add_argument('--batch', type=int, default=1000, help='Results per insert transaction')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', help='Index path (default: a temporary file)')
+    args = parser.parse_args(argv)
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), 'bench_index.sqlite3')
+    index = ResultsIndex(path)
+    results = generate_results(args.count, args.seed)
+
+    start = time.perf_counter()
+    for offset in range(0, len(results), args.batch):
+        chunk = results[offset:offset + args.batch]
+        index.add_many((f"bench-{args.seed}-{offset + i}", result) for i, result in enumerate(chunk))
+    elapsed = time.perf_counter() - start
+    stats = index.stats()
+    print(f"Indexed {stats['marksheets']} marksheets / {stats['subjects']} subject rows "
+          f"in {elapsed:.1f}s ({stats['subjects'] / elapsed:,.0f} rows/s)")
+
+    subcode = results[0]['subject_table'][0]['SubCode']
+    queries = [
+        ('students_with_grade F', lambda: index.students_with_grade(subcode, 'F')),
+        ('grade_counts', lambda: index.grade_counts(subcode)),
+        ('sgpa_range 8.5-9.0', lambda: index.sgpa_range(8.5, 9.0)),
+        ('sgpa_range + semester', lambda: index.sgpa_range(6.0, 7.0, 'Fifth Semester')),
+        ('class_counts', index.class_counts),
+        ('class_counts semester', lambda: index.class_counts('Third Semester')),
+    ]
+    for name, query in queries:
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            rows = query()
+            timings.append(time.perf_counter() - start)
+        print(f"{name:<24}{statistics.median(timings) * 1000:>9.2f} ms  ({len(rows)} rows)")
+
+    if not args.db:
+        os.remove(path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Benchmark the regex subject-table parser against the fixed-width column parser.
+
+Usage:
+    python -m benchmarks.bench_parser corpus_dir_or_txt_files... [--repeat 5]
+
+The corpus is raw `pdftotext -layout` output (*.txt). Both parsers run over
+the same pre-normalized table lines, so only parsing is timed. Records are
+compared per file and any disagreement is reported.
+"""
+import argparse
+import os
+import sys
+import time
+
+from marksheet import iter_table_lines, parse_marksheet, parse_marksheet_columns
+
+
+def load_corpus(paths):
+    """Read raw text files, expanding directories to their *.txt files"""
+    texts = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(n for n in os.listdir(path) if n.endswith('.txt'))
+            files = [os.path.join(path, n) for n in names]
+        else:
+            files = [path]
+        for name in files:
+            with open(name, encoding='utf-8') as f:
+                texts.append((name, f.read()))
+    return texts
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def time_parser(parse, tables, repeat):
+    """Per-table latencies (seconds) and parsed records from the last pass"""
+    latencies = []
+    results = []
+    for _ in range(repeat):
+        results = []
+        for lines in tables:
+            start = time.perf_counter()
+            results.append(parse(lines))
+            latencies.append(time.perf_counter() - start)
+    return sorted(latencies), results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus', nargs='+', help='Raw pdftotext output files or directories of them')
+    parser.add_argument('--repeat', type=int, default=5, help='Passes over the corpus per parser')
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        raise SystemExit("Corpus is empty")
+    tables = [list(iter_table_lines(text)) for _, text in corpus]
+
+    stats = {}
+    regex_lat, regex_records = time_parser(parse_marksheet, tables, args.repeat)
+    column_lat, column_records = time_parser(
+        lambda lines: parse_marksheet_columns(lines, stats), tables, args.repeat)
+
+    mismatches = [corpus[i][0] for i, (a, b) in enumerate(zip(regex_records, column_records)) if a != b]
+    record_count = sum(len(r) for r in regex_records)
+
+    print(f"corpus: {len(corpus)} files, {record_count} subject records, {args.repeat} passes")
+    print(f"{'parser':>8} {'total_ms':>10} {'mean_us':>10} {'p50_us':>10} {'p99_us':>10} {'records/s':>12}")
+    for name, lat in (('regex', regex_lat), ('columns', column_lat)):
+        total = sum(lat)
+        print(f"{name:>8} {total * 1000:>10.1f} {total / len(lat) * 1e6:>10.1f} "
+              f"{percentile(lat, 0.5) * 1e6:>10.1f} {percentile(lat, 0.99) * 1e6:>10.1f} "
+              f"{record_count * args.repeat / total:>12.0f}")
+    print(f"speedup: {sum(regex_lat) / sum(column_lat):.2f}x")
+
+    handled = stats['column'] + stats['fallback']
+    print(f"column parser: {stats['column']} subjects by offset, {stats['fallback']} via regex fallback "
+          f"({stats['fallback'] / handled * 100 if handled else 0:.1f}%)")
+    if mismatches:
+        print(f"{len(mismatches)} files parsed differently:")
+        for name in mismatches[:20]:
+            print(f"  {name}")
+        return 1
+    print("outputs identical")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
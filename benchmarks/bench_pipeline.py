@@ -0,0 +1,167 @@
+"""Per-stage benchmark of the marksheet pipeline on synthetic marksheets.
+
+Usage:
+    python -m benchmarks.bench_pipeline [-n 500] [--seed 42]
+    python -m benchmarks.bench_pipeline --save-baseline    # record benchmarks/baseline.json
+    python -m benchmarks.bench_pipeline --check            # exit 1 on regression
+
+Each stage is timed on its own over the same corpus. The report gives
+throughput (docs/s), p50/p99 latency and peak traced memory per call.
+--check compares p50 against the stored baseline and fails any stage
+slower than the threshold. Baselines depend on the machine, so record
+them on the box that runs the check.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generate_corpus
+from marksheet import (extract_subject_table, fix_table_headers, remove_sem_column, parse_marksheet,
+                       parse_marksheet_columns, iter_table_lines, extract_sgpa_info)
+from processed import prepare_result_data, build_excel_workbook
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def build_inputs(texts):
+    """Precompute every stage's input so each stage is timed in isolation"""
+    docs = []
+    for raw in texts:
+        table = extract_subject_table(raw)
+        fixed = fix_table_headers(table)
+        final = remove_sem_column(fixed)
+        combined = {'filename': 'bench.pdf', 'basic_info': extract_sgpa_info(raw),
+                    'subject_table': parse_marksheet(final)}
+        docs.append({'raw': raw, 'table': table, 'fixed': fixed, 'final': final,
+                     'combined': json.dumps(combined)})
+    return docs
+
+
+def stages(excel):
+    """(name, input builder, stage callable); builders run outside the timed region"""
+    result = [
+        ('extract_subject_table', lambda d: d['raw'], extract_subject_table),
+        ('fix_table_headers', lambda d: d['table'], fix_table_headers),
+        ('remove_sem_column', lambda d: d['fixed'], remove_sem_column),
+        ('parse_marksheet', lambda d: d['final'], parse_marksheet),
+        ('parse_marksheet_columns', lambda d: d['final'], parse_marksheet_columns),
+        ('fused_table_pipeline', lambda d: d['raw'], lambda raw: parse_marksheet(iter_table_lines(raw))),
+        ('extract_sgpa_info', lambda d: d['raw'], extract_sgpa_info),
+        ('prepare_result_data', lambda d: json.loads(d['combined']), prepare_result_data),
+    ]
+    if excel:
+        result.append(('excel_export', lambda d: prepare_result_data(json.loads(d['combined'])),
+                       build_excel_workbook))
+    return result
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def run_stage(make_input, fn, docs, memory_sample, passes):
+    # Keep the fastest of several passes to damp scheduler noise
+    latencies = None
+    for _ in range(passes):
+        current = []
+        for doc in docs:
+            arg = make_input(doc)
+            start = time.perf_counter()
+            fn(arg)
+            current.append(time.perf_counter() - start)
+        if latencies is None or sum(current) < sum(latencies):
+            latencies = current
+    latencies.sort()
+
+    # Peak memory in a separate pass, tracemalloc would skew the timings
+    peak = 0
+    tracemalloc.start()
+    for doc in docs[:memory_sample]:
+        arg = make_input(doc)
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        fn(arg)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+        del arg
+    tracemalloc.stop()
+
+    total = sum(latencies)
+    return {
+        'docs_per_s': round(len(latencies) / total, 1) if total else None,
+        'p50_us': round(percentile(latencies, 0.50) * 1e6, 1),
+        'p99_us': round(percentile(latencies, 0.99) * 1e6, 1),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Stages whose p50 got slower than baseline * (1 + threshold)"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('stages', {}).get(name)
+        if not previous:
+            continue
+        ratio = current['p50_us'] / previous['p50_us'] if previous['p50_us'] else 1.0
+        if ratio > 1 + threshold:
+            regressions.append((name, previous['p50_us'], current['p50_us'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--count', type=int, default=500, help='Synthetic marksheets to generate')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--passes', type=int, default=3, help='Timed passes per stage (fastest is kept)')
+    parser.add_argument('--no-excel', action='store_true', help='Skip the (slow) Excel export stage')
+    parser.add_argument('--memory-sample', type=int, default=100, help='Docs traced for peak memory')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON path')
+    parser.add_argument('--save-baseline', action='store_true', help='Write results as the new baseline')
+    parser.add_argument('--check', action='store_true', help='Fail if a stage regressed past --threshold')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed p50 slowdown (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    docs = build_inputs(generate_corpus(args.count, args.seed))
+    print(f"{args.count} synthetic marksheets, seed {args.seed}")
+    print(f"{'stage':<26}{'docs/s':>12}{'p50_us':>12}{'p99_us':>12}{'peak_kib':>12}")
+
+    results = {}
+    for name, make_input, fn in stages(excel=not args.no_excel):
+        results[name] = run_stage(make_input, fn, docs, args.memory_sample,
+                                  1 if name == 'excel_export' else args.passes)
+        row = results[name]
+        print(f"{name:<26}{row['docs_per_s']:>12}{row['p50_us']:>12}{row['p99_us']:>12}{row['peak_kib']:>12}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'count': args.count,
+                'seed': args.seed,
+                'passes': args.passes,
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'stages': results
+            }, f, indent=4)
+            f.write('\n')
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first")
+            return 1
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: p50 {before}us -> {after}us ({(ratio - 1) * 100:.0f}% slower)")
+        if regressions:
+            return 1
+        print(f"No stage regressed more than {args.threshold * 100:.0f}% against the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Cold start benchmark: import time of the web app and the command line tools.
+
+Usage:
+    python -m benchmarks.bench_startup [-n 5] [--ref REV] [--module app ...]
+
+Each module is imported --runs times in a fresh interpreter under
+`python -X importtime`; the report gives the median cumulative import
+time and the heavy third-party packages that ended up loaded. With
+--ref the same is measured on a checkout of that git revision, so
+`--ref HEAD~1` shows what a change did to startup.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['marksheet', 'app', 'test', 'exports', 'results_index']
+HEAVY = ['flask', 'numpy', 'openpyxl', 'pandas', 'pyarrow', 'orjson']
+
+
+def import_profile(module, cwd, env):
+    """{module: (self us, cumulative us)} from one cold `python -X importtime` run"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                          cwd=cwd, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(f"import {module} failed in {cwd}:\n{proc.stderr[-2000:]}")
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        profile[name.strip()] = (int(self_us), int(cumulative))
+    return profile
+
+
+def measure(module, cwd, env, runs):
+    """Median cumulative import time (ms) and {heavy package: median ms}"""
+    totals, heavy = [], {}
+    for _ in range(runs):
+        profile = import_profile(module, cwd, env)
+        totals.append(profile[module][1] / 1000)
+        for package in HEAVY:
+            if package in profile:
+                heavy.setdefault(package, []).append(profile[package][1] / 1000)
+    return statistics.median(totals), {p: statistics.median(t) for p, t in heavy.items()}
+
+
+def checkout(rev, directory):
+    """Extract the tree at rev into directory (no worktree bookkeeping)"""
+    archive = os.path.join(directory, 'tree.tar')
+    subprocess.run(['git', 'archive', '--format=tar', '-o', archive, rev], cwd=ROOT, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(os.path.join(directory, 'tree'))
+    return os.path.join(directory, 'tree')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--runs', type=int, default=5, help='Fresh interpreters per module')
+    parser.add_argument('--ref', help='Git revision to compare against (e.g. HEAD~1)')
+    parser.add_argument('--module', action='append', help=f"Module to import (default: {' '.join(MODULES)})")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        # Keep the app's caches, index and metrics out of the real temp dir
+        env = dict(os.environ,
+                   RESULT_CACHE_PATH=os.path.join(scratch, 'cache.sqlite3'),
+                   RESULT_STORE_PATH=os.path.join(scratch, 'store.sqlite3'),
+                   RESULT_INDEX_PATH=os.path.join(scratch, 'index.sqlite3'),
+                   METRICS_DIR=os.path.join(scratch, 'metrics'))
+        trees = [('current', ROOT)]
+        if args.ref:
+            trees.insert(0, (args.ref, checkout(args.ref, scratch)))
+
+        for module in args.module or MODULES:
+            print(f"import {module}")
+            for label, cwd in trees:
+                try:
+                    total, heavy = measure(module, cwd, env, args.runs)
+                except RuntimeError as e:
+                    print(f"  {label:<12}{'unavailable':>12}  ({str(e).splitlines()[0]})")
+                    continue
+                loaded = ', '.join(f"{p} {ms:.0f}" for p, ms in sorted(heavy.items(), key=lambda kv: -kv[1]))
+                print(f"  {label:<12}{total:>9.1f} ms  heavy: {loaded or '-'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
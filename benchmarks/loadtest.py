@@ -0,0 +1,317 @@
+"""Load generator for a running app: upload, results page and downloads.
+
+Usage:
+    python -m benchmarks.loadtest [--url http://127.0.0.1:5000] [--pdfs DIR | --synthetic 50]
+                                  [-c 8] [-n 200 | --duration 60] [--no-downloads] [--bust-cache]
+                                  [--api] [--json OUT]
+
+Each of -c virtual users loops over the corpus: POST / with a PDF, follow
+the redirect to /results, then GET /download_json and /download_excel
+with the same session cookie. The run stops after -n sessions in total
+or after --duration seconds. The report gives requests/s, latency
+percentiles and errors per step, plus the server's own per-stage timings
+(the difference in /metrics between the start and the end of the run).
+With --api each session is a single POST /api/v1/parse instead (the
+only upload route of the asyncio path). Run it against `python serve.py`
+with different worker settings to compare them. --bust-cache appends a unique comment to every upload, so the result
+cache never answers and each upload runs pdftotext.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.synthetic import generate_marksheet, marksheet_pdf
+
+STEPS = ['upload', 'results', 'download_json', 'download_excel', 'api_parse']
+SAMPLE = re.compile(r'^(\w+)\{([^}]*)\} (\S+)$')
+LABEL = re.compile(r'(\w+)="([^"]*)"')
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def load_corpus(args) -> List[Tuple[str, bytes]]:
+    """(filename, PDF bytes) from --pdfs, or --synthetic generated marksheets"""
+    if args.pdfs:
+        corpus = []
+        for name in sorted(os.listdir(args.pdfs)):
+            if name.lower().endswith('.pdf'):
+                with open(os.path.join(args.pdfs, name), 'rb') as f:
+                    corpus.append((name, f.read()))
+        return corpus
+    rng = random.Random(args.seed)
+    return [(f"synthetic_{i:05d}.pdf", marksheet_pdf(generate_marksheet(rng)[0]))
+            for i in range(args.synthetic)]
+
+
+class Client:
+    """One virtual user: a keep-alive connection and a cookie jar"""
+
+    def __init__(self, url: str, timeout: float):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.cookies: Dict[str, str] = {}
+        self.conn: Optional[http.client.HTTPConnection] = None
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f"{k}={v}" for k, v in self.cookies.items())
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.BadStatusLine):
+                # A keep-alive connection the server already closed; retry once on a new one
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+        for cookie in response.msg.get_all('Set-Cookie') or []:
+            name, _, value = cookie.split(';', 1)[0].partition('=')
+            self.cookies[name.strip()] = value
+        return response.status, dict(response.getheaders()), data
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+
+
+def multipart(filename: str, pdf_bytes: bytes) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: application/pdf\r\n\r\n").encode() + pdf_bytes + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+class Recorder:
+    """Latencies and errors per step, shared by all virtual users"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.sessions = 0
+
+    def record(self, step: str, elapsed: float, error: Optional[str] = None) -> None:
+        with self.lock:
+            self.latencies[step].append(elapsed)
+            if error:
+                self.errors[step][error] += 1
+
+
+def run_session(client: Client, recorder: Recorder, filename: str, pdf_bytes: bytes, downloads: bool,
+                api: bool = False) -> None:
+    """Upload one PDF and walk the pages a user would; stops at the first failed step"""
+    body, content_type = multipart(filename, pdf_bytes)
+    if api:
+        steps = [('api_parse', 'POST', '/api/v1/parse', body, {'Content-Type': content_type}, 200)]
+    else:
+        steps = [('upload', 'POST', '/', body, {'Content-Type': content_type}, 302),
+                 ('results', 'GET', None, None, None, 200)]
+    if downloads and not api:
+        steps += [('download_json', 'GET', '/download_json', None, None, 200),
+                  ('download_excel', 'GET', '/download_excel', None, None, 200)]
+
+    results_path = '/results'
+    for step, method, path, data, headers, expected in steps:
+        start = time.perf_counter()
+        try:
+            status, response_headers, _ = client.request(method, path or results_path, data, headers)
+        except (OSError, http.client.HTTPException) as e:
+            recorder.record(step, time.perf_counter() - start, type(e).__name__)
+            return
+        elapsed = time.perf_counter() - start
+
+        error = None if status == expected else f"HTTP {status}"
+        if step == 'upload' and status == 302:
+            location = urlsplit(response_headers.get('Location', '')).path
+            if location != '/results':
+                # The app redirects back to the form (with a flash) when parsing fails
+                error = f"redirected to {location or '?'}"
+            results_path = location
+        recorder.record(step, elapsed, error)
+        if error:
+            return
+    with recorder.lock:
+        recorder.sessions += 1
+
+
+def scrape_stages(url: str) -> Dict[str, Any]:
+    """Per-stage (sum, count) and failures from the server's /metrics, or {} if unavailable"""
+    parts = urlsplit(url)
+    try:
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+        conn.request('GET', '/metrics')
+        response = conn.getresponse()
+        text = response.read().decode()
+        conn.close()
+    except (OSError, http.client.HTTPException):
+        return {}
+    if response.status != 200:
+        return {}
+
+    stages: Dict[str, Dict[str, float]] = defaultdict(lambda: {'sum': 0.0, 'count': 0.0, 'failures': 0.0})
+    for line in text.splitlines():
+        match = SAMPLE.match(line)
+        if not match:
+            continue
+        name, labels, value = match.group(1), dict(LABEL.findall(match.group(2))), float(match.group(3))
+        if 'stage' not in labels:
+            continue
+        if name == 'sppu_stage_duration_seconds_sum':
+            stages[labels['stage']]['sum'] = value
+        elif name == 'sppu_stage_duration_seconds_count':
+            stages[labels['stage']]['count'] = value
+        elif name == 'sppu_stage_failures_total':
+            stages[labels['stage']]['failures'] += value
+    return dict(stages)
+
+
+def stage_deltas(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    deltas = {}
+    for stage, end in after.items():
+        start = before.get(stage, {'sum': 0.0, 'count': 0.0, 'failures': 0.0})
+        count = end['count'] - start['count']
+        if count > 0:
+            deltas[stage] = {'count': int(count),
+                             'mean_ms': round((end['sum'] - start['sum']) / count * 1000, 2),
+                             'failures': int(end['failures'] - start['failures'])}
+    return deltas
+
+
+def summarize(recorder: Recorder, elapsed: float, stages: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    total = sum(len(v) for v in recorder.latencies.values())
+    failed = sum(sum(e.values()) for e in recorder.errors.values())
+    report = {
+        'elapsed_s': round(elapsed, 2),
+        'sessions': recorder.sessions,
+        'requests': total,
+        'requests_per_s': round(total / elapsed, 2) if elapsed else 0,
+        'sessions_per_s': round(recorder.sessions / elapsed, 2) if elapsed else 0,
+        'error_rate': round(failed / total, 4) if total else 0,
+        'steps': {},
+        'server_stages': stages,
+    }
+    for step in STEPS:
+        latencies = sorted(recorder.latencies.get(step, []))
+        if not latencies:
+            continue
+        errors = dict(recorder.errors.get(step, {}))
+        report['steps'][step] = {
+            'requests': len(latencies),
+            'errors': errors,
+            'error_rate': round(sum(errors.values()) / len(latencies), 4),
+            **{f"p{int(q * 100)}_ms": round(percentile(latencies, q) * 1000, 1) for q in (0.50, 0.90, 0.99)},
+            'max_ms': round(latencies[-1] * 1000, 1),
+        }
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"{report['sessions']} sessions, {report['requests']} requests in {report['elapsed_s']}s: "
+          f"{report['requests_per_s']} req/s, {report['sessions_per_s']} uploads/s, "
+          f"error rate {report['error_rate']:.2%}")
+    print(f"{'step':<16}{'requests':>10}{'errors':>8}{'p50_ms':>10}{'p90_ms':>10}{'p99_ms':>10}{'max_ms':>10}")
+    for step, row in report['steps'].items():
+        print(f"{step:<16}{row['requests']:>10}{sum(row['errors'].values()):>8}{row['p50_ms']:>10}"
+              f"{row['p90_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}")
+    for step, row in report['steps'].items():
+        for reason, count in row['errors'].items():
+            print(f"  {step}: {count} x {reason}")
+    if report['server_stages']:
+        print(f"{'server stage':<16}{'calls':>10}{'mean_ms':>10}{'failures':>10}")
+        for stage, row in report['server_stages'].items():
+            print(f"{stage:<16}{row['count']:>10}{row['mean_ms']:>10}{row['failures']:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='Base URL of the running app')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--pdfs', help='Directory of sample PDFs to replay')
+    source.add_argument('--synthetic', type=int, default=50, help='Synthetic marksheet PDFs to generate')
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help='Virtual users')
+    parser.add_argument('-n', '--sessions', type=int, default=200, help='Upload sessions in total')
+    parser.add_argument('--duration', type=float, help='Run for this many seconds instead of -n sessions')
+    parser.add_argument('--no-downloads', dest='downloads', action='store_false', help='Skip the download steps')
+    parser.add_argument('--bust-cache', action='store_true', help='Make every upload unique')
+    parser.add_argument('--api', action='store_true', help='POST /api/v1/parse only (no session, no downloads)')
+    parser.add_argument('--timeout', type=float, default=120, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='Also write the report as JSON to this file')
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args)
+    if not corpus:
+        parser.error('no PDFs to send')
+
+    recorder = Recorder()
+    lock = threading.Lock()
+    counter = itertools.count()
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    def next_upload() -> Optional[Tuple[str, bytes]]:
+        with lock:
+            n = next(counter)
+        if (deadline is None and n >= args.sessions) or (deadline is not None and time.perf_counter() >= deadline):
+            return None
+        filename, pdf_bytes = corpus[n % len(corpus)]
+        if args.bust_cache:
+            pdf_bytes += f"\n% loadtest {uuid.uuid4().hex}\n".encode()
+        return filename, pdf_bytes
+
+    def user() -> None:
+        client = Client(args.url, args.timeout)
+        try:
+            while True:
+                upload = next_upload()
+                if upload is None:
+                    return
+                run_session(client, recorder, *upload, downloads=args.downloads, api=args.api)
+        finally:
+            client.close()
+
+    before = scrape_stages(args.url)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=user, daemon=True) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    # Workers flush their metrics at most once a second
+    time.sleep(1.5)
+    stages = stage_deltas(before, scrape_stages(args.url))
+
+    report = summarize(recorder, elapsed, stages)
+    report['config'] = {'url': args.url, 'concurrency': args.concurrency, 'corpus': len(corpus),
+                        'downloads': args.downloads and not args.api, 'bust_cache': args.bust_cache,
+                        'api': args.api}
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 1 if report['requests'] == 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
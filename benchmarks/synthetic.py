@@ -0,0 +1,244 @@
+"""Synthetic SPPU marksheet text in `pdftotext -layout` form.
+
+Usage:
+    python -m benchmarks.synthetic OUT_DIR -n 1000 [--seed 42]
+
+Writes OUT_DIR/marksheet_00000.txt ... for use as a benchmark corpus (e.g.
+with benchmarks.bench_parser); with --pdf the same text is written as
+one-page Courier PDFs instead (e.g. for benchmarks.loadtest). The generator covers one- and two-semester
+tables, wrapped multi-line subject names, AC and FOREIGN LANGUAGE rows,
+'#' grace and '$' condonation markers and failed (F) subjects.
+"""
+import argparse
+import os
+import random
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+SEMESTER_NAMES = ['First', 'Second', 'Third', 'Fourth', 'Fifth', 'Sixth', 'Seventh', 'Eighth']
+
+SUBJECT_NAMES = [
+    'ENGINEERING MATHEMATICS-I', 'ENGINEERING MATHEMATICS-II', 'ENGINEERING MATHEMATICS-III',
+    'ENGINEERING PHYSICS', 'ENGINEERING CHEMISTRY', 'SYSTEMS IN MECHANICAL ENGINEERING',
+    'BASIC ELECTRICAL ENGINEERING', 'BASIC ELECTRONICS ENGINEERING', 'PROGRAMMING AND PROBLEM SOLVING',
+    'ENGINEERING MECHANICS', 'ENGINEERING GRAPHICS', 'WORKSHOP', 'PROJECT BASED LEARNING',
+    'DISCRETE MATHEMATICS', 'FUNDAMENTALS OF DATA STRUCTURES', 'OBJECT ORIENTED PROGRAMMING',
+    'COMPUTER GRAPHICS', 'DIGITAL ELECTRONICS AND LOGIC DESIGN', 'DATA STRUCTURES AND ALGORITHMS',
+    'SOFTWARE ENGINEERING', 'MICROPROCESSOR', 'PRINCIPLES OF PROGRAMMING LANGUAGES',
+    'DATABASE MANAGEMENT SYSTEMS', 'THEORY OF COMPUTATION', 'SYSTEMS PROGRAMMING AND OPERATING SYSTEM',
+    'COMPUTER NETWORKS AND SECURITY', 'DESIGN AND ANALYSIS OF ALGORITHMS', 'MACHINE LEARNING',
+    'ENGINEERING GRAPHICS AND DESIGN OF MECHANICAL COMPONENTS',
+    'DESIGN AND ANALYSIS OF ALGORITHMS AND COMPUTATIONAL COMPLEXITY LABORATORY',
+    'HUMAN COMPUTER INTERACTION AND USER EXPERIENCE DESIGN', 'INTERNET OF THINGS AND EMBEDDED SECURITY',
+    'CLOUD COMPUTING', 'HIGH PERFORMANCE COMPUTING', 'DEEP LEARNING', 'BUSINESS INTELLIGENCE',
+]
+
+AUDIT_COURSES = [
+    'ENVIRONMENTAL STUDIES', 'PHYSICAL EDUCATION-EXERCISE AND FIELD ACTIVITIES',
+    'SOFT SKILLS', 'MANDATORY AUDIT COURSE', 'CYBER SECURITY AND LAW',
+]
+
+GRADES = [('O', 10), ('A+', 9), ('A', 8), ('B+', 7), ('B', 6), ('C', 5), ('P', 4)]
+
+SEM_COL = 4        # "Sem " column removed by remove_sem_column
+CODE_WIDTH = 10    # SubCode column
+NAME_WIDTH = 46    # Subject name column before the grade data
+NAME_START = SEM_COL + CODE_WIDTH
+DATA_START = NAME_START + NAME_WIDTH
+
+
+def _header(with_ern_pnt: bool) -> List[str]:
+    """Table header; real marksheets sometimes lack the Ern/Pnt captions"""
+    head = 'Sem SubCode'.ljust(NAME_START) + 'Subject Name'.ljust(NAME_WIDTH)
+    if with_ern_pnt:
+        return [head + 'Crd  Ern  Grd  Pnt  Crd Pnt']
+    return [head + 'Crd  Grd   Grd   Crd', ' ' * (DATA_START + 15) + 'Pnt   Pnt']
+
+
+def _wrap(name: str, width: int) -> List[str]:
+    parts, current = [], ''
+    for word in name.split():
+        if current and len(current) + 1 + len(word) > width:
+            parts.append(current)
+            current = word
+        else:
+            current = f"{current} {word}".strip()
+    parts.append(current)
+    return parts
+
+
+def _data_cells(credit: int, earned: int, grade: str, grade_point: int, credit_point: str) -> str:
+    return f"{credit:>3}{earned:>5}   {grade:<3}{grade_point:>4}{credit_point:>6}"
+
+
+def _subject_rows(sem_no: int, code: str, name: str, data: Optional[str], rng: random.Random) -> List[str]:
+    """Layout rows for one subject, wrapping long names onto continuation lines"""
+    star = '*' if rng.random() < 0.03 else ''
+    prefix = f"{sem_no:>2}  " + f"{star}{code}".ljust(CODE_WIDTH)
+    parts = _wrap(name, NAME_WIDTH - 2)
+    data = data or ''
+    if len(parts) == 1:
+        return [(prefix + parts[0].ljust(NAME_WIDTH) + data).rstrip()]
+
+    # Grade data either sits on the first line or on the last wrapped line
+    data_on_last = rng.random() < 0.5
+    rows = [(prefix + parts[0].ljust(NAME_WIDTH) + ('' if data_on_last else data)).rstrip()]
+    for part in parts[1:-1]:
+        rows.append(' ' * NAME_START + part)
+    rows.append((' ' * NAME_START + parts[-1].ljust(NAME_WIDTH) + (data if data_on_last else '')).rstrip())
+    return rows
+
+
+def _semester(sem_no: int, ordinal: int, rng: random.Random, foreign_language: bool,
+              fail_rate: float) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, str]]:
+    rows, records = [], []
+    total_credits = earned_credits = total_points = 0
+    failed = False
+
+    for name in rng.sample(SUBJECT_NAMES, rng.randint(5, 8)):
+        code = f"{rng.randint(101, 417)}{rng.randint(0, 999):03d}"
+        credit = rng.choice([1, 2, 3, 3, 4, 4])
+        if rng.random() < fail_rate:
+            grade, grade_point, earned = 'F', 0, 0
+            failed = True
+        else:
+            grade, grade_point = rng.choice(GRADES)
+            earned = credit
+        points = credit * grade_point
+        marker = rng.choices(['', '#', '$'], weights=[90, 6, 4])[0]
+        credit_point = f"{points}{marker}"
+        rows += _subject_rows(sem_no, code, name, _data_cells(credit, earned, grade, grade_point, credit_point), rng)
+        records.append({'SubCode': code, 'SubjectName': name, 'Credit': str(credit), 'EarnedCredit': str(earned),
+                        'Grade': grade, 'GradePoint': str(grade_point), 'CreditPoint': credit_point})
+        total_credits += credit
+        earned_credits += earned
+        total_points += points
+
+    if foreign_language:
+        code = f"{rng.randint(101, 417)}{rng.randint(0, 999):03d}"
+        rows += _subject_rows(sem_no, code + 'E', 'FOREIGN LANGUAGE', None, rng)
+        records.append({'SubCode': code, 'SubjectName': 'FOREIGN LANGUAGE', 'Credit': None, 'EarnedCredit': None,
+                        'Grade': 'AC', 'GradePoint': None, 'CreditPoint': None})
+
+    # Every semester closes with an audit course graded AC
+    audit = f"{rng.choice(AUDIT_COURSES)}-{'I' * rng.randint(1, 3)}"
+    code = f"{rng.randint(101, 417)}{rng.randint(0, 999):03d}"
+    rows += _subject_rows(sem_no, code, audit, 'AC'.rjust(23), rng)
+    records.append({'SubCode': code, 'SubjectName': audit, 'Credit': None, 'EarnedCredit': None,
+                    'Grade': 'AC', 'GradePoint': None, 'CreditPoint': None})
+
+    sgpa = '--' if failed else f"{total_points / total_credits:.2f}"
+    info = {'semester': f"{SEMESTER_NAMES[ordinal]} Semester", 'sgpa': sgpa,
+            'earned_credits': str(earned_credits), 'total_credits': str(total_credits),
+            'total_credit_points': str(total_points)}
+    return rows, records, info
+
+
+def generate_marksheet(rng: random.Random, semesters: Optional[int] = None,
+                       fail_rate: float = 0.04) -> Tuple[str, List[Dict[str, Any]], List[Dict[str, str]]]:
+    """Return (raw_text, expected subject records, expected SGPA info) for one student"""
+    semesters = semesters or rng.choice([1, 2, 2])
+    year = rng.randint(1, 4)
+    first_ordinal = 2 * (year - 1) + (rng.randint(0, 1) if semesters == 1 else 0)
+
+    lines = [
+        ' ' * 22 + 'SAVITRIBAI PHULE PUNE UNIVERSITY',
+        ' ' * 11 + f"{['FIRST', 'SECOND', 'THIRD', 'FINAL'][year - 1]} YEAR ENGINEERING (2019 CREDIT PAT.) "
+                   f"EXAMINATION, {rng.choice(['MAY', 'DECEMBER'])} {rng.randint(2019, 2025)}",
+        f"SEAT NO.: F{rng.randint(10**8, 10**9 - 1)}   NAME : STUDENT {rng.randint(1, 99999):05d}"
+        f"{' ' * 14}MOTHER : PARENT      PRN : {rng.randint(10**7, 10**8 - 1)}{rng.choice('ABCDEFGHJK')}",
+        'CLG.: [CEGP010530] COLLEGE OF ENGINEERING PUNE',
+        '',
+    ]
+    lines += _header(with_ern_pnt=rng.random() < 0.3)
+
+    records, basic_info = [], []
+    for index in range(semesters):
+        sem_rows, sem_records, info = _semester(
+            index + 1, first_ordinal + index, rng,
+            foreign_language=(index == semesters - 1 and rng.random() < 0.3),
+            fail_rate=fail_rate)
+        lines += sem_rows
+        records += sem_records
+        basic_info.append(info)
+
+    lines.append('')
+    for info in basic_info:
+        lines.append(f" {info['semester'].upper()} SGPA : {info['sgpa']}   Credits Earned/Total : "
+                     f"{info['earned_credits']}/{info['total_credits']}   Total Credit Points : "
+                     f"{info['total_credit_points']}")
+    lines.append(f"RESULT DATE : {rng.randint(1, 28)} JULY {rng.randint(2019, 2025)}")
+    lines.append('\f')
+    return '\n'.join(lines) + '\n', records, basic_info
+
+
+def generate_corpus(count: int, seed: int = 42, **options) -> List[str]:
+    """Generate `count` raw marksheet texts deterministically from `seed`"""
+    rng = random.Random(seed)
+    return [generate_marksheet(rng, **options)[0] for _ in range(count)]
+
+
+def _pdf_string(line: str) -> str:
+    escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return f"({escaped.encode('latin-1', 'replace').decode('latin-1')})"
+
+
+def marksheet_pdf(text: str, font_size: float = 7.0) -> bytes:
+    """One-page PDF that shows `text` in Courier, one text line per line.
+
+    Courier is fixed-width, so `pdftotext -layout` gives back the same
+    columns the text was generated with.
+    """
+    lines = text.replace('\f', '').rstrip('\n').split('\n')
+    leading = font_size * 1.2
+    width = round(max(map(len, lines), default=0) * font_size * 0.6 + 72)
+    height = round(len(lines) * leading + 72)
+
+    ops = [f"BT /F1 {font_size} Tf {leading} TL 36 {height - 36} Td"]
+    ops += [f"T* {_pdf_string(line)} Tj" for line in lines]
+    ops.append('ET')
+    content = '\n'.join(ops).encode('latin-1')
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+        f"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>".encode('latin-1'),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>',
+        b'<< /Length ' + str(len(content)).encode() + b' >>\nstream\n' + content + b'\nendstream',
+    ]
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b'\nendobj\n'
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b''.join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('out_dir', help='Directory to write marksheet_*.txt (or .pdf) files into')
+    parser.add_argument('-n', '--count', type=int, default=1000, help='Number of marksheets')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--semesters', type=int, choices=[1, 2], help='Force one or two semesters per table')
+    parser.add_argument('--pdf', action='store_true', help='Write PDFs instead of text files')
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for index, text in enumerate(generate_corpus(args.count, args.seed, semesters=args.semesters)):
+        if args.pdf:
+            with open(os.path.join(args.out_dir, f"marksheet_{index:05d}.pdf"), 'wb') as f:
+                f.write(marksheet_pdf(text))
+            continue
+        with open(os.path.join(args.out_dir, f"marksheet_{index:05d}.txt"), 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(f"Wrote {args.count} marksheets to {args.out_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,275 @@
+import io
+import os
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.utils import secure_filename
+
+from cache import ResultCache, pdf_digest
+from limiter import HostSemaphore
+from marksheet import extract_table_text, parse_text
+from pdf_region import region_args
+
+bulk_bp = Blueprint('bulk', __name__)
+
+# Guard rails against zip bombs
+MAX_ZIP_MEMBERS = 2000
+MAX_ZIP_UNCOMPRESSED = 500 * 1024 * 1024
+
+# PDFs submitted ahead of the pool, per worker, before waiting for results
+PENDING_PER_WORKER = 4
+
+# process_one's (pdftotext region options, timeout, parser)
+PipelineSettings = Tuple[Sequence[str], Optional[float], str]
+DEFAULT_SETTINGS: PipelineSettings = ((), None, 'regex')
+
+# An uploaded PDF or ZIP: its bytes, or a seekable binary file (e.g. a spooled upload)
+UploadData = Union[bytes, BinaryIO]
+
+# One pool per (size, host slots) in this process; see _get_pool
+_pools: Dict[Tuple[int, Optional[str], int], ProcessPoolExecutor] = {}
+_pools_pid: Optional[int] = None
+_pools_lock = threading.Lock()
+_worker_slots: Optional[HostSemaphore] = None  # Set in each pool worker by _init_worker
+
+
+def default_workers() -> int:
+    """Pool size: one worker per available core"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _get_pool(workers: int, slots: Optional[HostSemaphore] = None) -> ProcessPoolExecutor:
+    """A pool of exactly `workers` processes, kept so repeated bulk calls don't pay process startup"""
+    global _pools, _pools_pid, _pools_lock
+    if _pools_pid != os.getpid():
+        # Pools (and the lock) copied by fork belong to the parent
+        _pools, _pools_pid, _pools_lock = {}, os.getpid(), threading.Lock()
+    initargs = (slots.directory, slots.slots) if slots else (None, 0)
+    with _pools_lock:
+        pool = _pools.get((workers, *initargs))
+        if pool is None:
+            pool = _pools[(workers, *initargs)] = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=initargs)
+        return pool
+
+
+def _init_worker(lock_dir: Optional[str], slots: int) -> None:
+    # Pool workers take the same host-wide pdftotext slots as the web path
+    global _worker_slots
+    _worker_slots = HostSemaphore(lock_dir, slots) if lock_dir else None
+
+
+def _reset_pool(pool: ProcessPoolExecutor) -> None:
+    with _pools_lock:
+        for key, known in list(_pools.items()):
+            if known is pool:
+                del _pools[key]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+###############################
+# INPUT HANDLING
+###############################
+
+def iter_zip_pdfs(zip_data: UploadData, zip_name: str = '') -> Iterator[Tuple[str, bytes]]:
+    """Yield (name, bytes) for every PDF inside a ZIP archive, one member at a time"""
+    source = io.BytesIO(zip_data) if isinstance(zip_data, bytes) else zip_data
+    with zipfile.ZipFile(source) as archive:
+        members = [m for m in archive.infolist()
+                   if not m.is_dir()
+                   and m.filename.lower().endswith('.pdf')
+                   and not m.filename.startswith('__MACOSX/')]
+        if len(members) > MAX_ZIP_MEMBERS:
+            raise ValueError(f"{zip_name or 'ZIP'} has more than {MAX_ZIP_MEMBERS} PDFs")
+        if sum(m.file_size for m in members) > MAX_ZIP_UNCOMPRESSED:
+            raise ValueError(f"{zip_name or 'ZIP'} is too large once uncompressed")
+        for member in members:
+            yield member.filename, archive.read(member)
+
+
+def expand_inputs(items: Iterable[Tuple[str, UploadData]]) -> Iterator[Tuple[str, Optional[bytes], Optional[str]]]:
+    """Flatten uploaded PDFs and ZIPs into (name, pdf_bytes, error) entries"""
+    for name, data in items:
+        lower = name.lower()
+        if lower.endswith('.zip'):
+            try:
+                for member_name, member_bytes in iter_zip_pdfs(data, name):
+                    yield f"{name}/{member_name}", member_bytes, None
+            except (zipfile.BadZipFile, ValueError) as e:
+                yield name, None, f"Invalid ZIP: {e}"
+        elif lower.endswith('.pdf'):
+            yield name, data if isinstance(data, bytes) else data.read(), None
+        else:
+            yield name, None, 'Only PDF and ZIP files are allowed'
+
+
+def read_paths(paths: Iterable[str]) -> Iterator[Tuple[str, bytes]]:
+    """Read PDFs or ZIPs from disk as (name, bytes) pairs"""
+    for path in paths:
+        with open(path, 'rb') as f:
+            yield os.path.basename(path), f.read()
+
+
+###############################
+# PROCESSING
+###############################
+
+def process_one(name: str, pdf_bytes: bytes, region: Sequence[str], timeout: Optional[float],
+                parser: str) -> Dict[str, Any]:
+    """Extract and parse one PDF (executed inside a pool worker).
+
+    Runs on the Flask-free marksheet core only, so workers never import
+    the app (its cache, index and metrics setup stay in the parent).
+    """
+    with _worker_slots.hold() if _worker_slots else nullcontext():
+        text = extract_table_text(pdf_bytes, region, timeout)
+    parsed = parse_text(text, parser)
+    return {
+        "filename": secure_filename(os.path.basename(name)),
+        "basic_info": parsed["basic_info"],
+        "subject_table": parsed["subject_table"]
+    }
+
+
+def app_bulk_options() -> Dict[str, Any]:
+    """process_bulk keyword arguments from the current Flask app's config and extensions"""
+    config = current_app.config
+    region = region_args(config['PDFTOTEXT_PAGES'], config['PDFTOTEXT_CROP'])
+    return {
+        'max_workers': config.get('BULK_WORKERS'),
+        'cache': current_app.extensions.get('result_cache'),
+        'settings': (region, config['PDFTOTEXT_TIMEOUT'], config['MARKSHEET_PARSER']),
+        'slots': current_app.extensions.get('pdftotext_slots'),
+    }
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate counts and SGPA statistics over per-file results"""
+    succeeded = [r for r in results if r['ok']]
+    sgpas = []
+    failed_semesters = 0
+    with_backlogs = 0
+    subject_count = 0
+    for entry in succeeded:
+        data = entry['result']
+        subject_count += len(data['subject_table'])
+        if any(s.get('Grade') == 'F' for s in data['subject_table']):
+            with_backlogs += 1
+        for sem in data['basic_info']:
+            if sem['sgpa'] == '--':
+                failed_semesters += 1
+            else:
+                sgpas.append(float(sem['sgpa']))
+
+    return {
+        'files': len(results),
+        'succeeded': len(succeeded),
+        'failed': len(results) - len(succeeded),
+        'subject_records': subject_count,
+        'students_with_backlogs': with_backlogs,
+        'failed_semesters': failed_semesters,
+        'sgpa': {
+            'count': len(sgpas),
+            'min': min(sgpas) if sgpas else None,
+            'avg': round(sum(sgpas) / len(sgpas), 2) if sgpas else None,
+            'max': max(sgpas) if sgpas else None
+        }
+    }
+
+
+def process_bulk(items: Iterable[Tuple[str, UploadData]], max_workers: Optional[int] = None,
+                 cache: Optional[ResultCache] = None, settings: PipelineSettings = DEFAULT_SETTINGS,
+                 slots: Optional[HostSemaphore] = None) -> Dict[str, Any]:
+    """Process many PDFs (or ZIPs of PDFs) across a process pool.
+
+    Returns per-file results in input order plus an aggregate summary.
+    A failing file only marks its own entry as failed. Successful entries
+    carry the PDF's sha256 so callers can deduplicate or index them.
+    Inputs are expanded lazily and at most PENDING_PER_WORKER PDFs per
+    worker are in flight, so a large ZIP is never held in memory whole.
+
+    `cache` (a ResultCache) answers PDFs seen before and stores new parses;
+    `settings` are process_one's (region, timeout, parser); `slots` caps
+    pdftotext host-wide. The Flask routes pass app_bulk_options().
+    """
+    workers = max_workers or default_workers()
+    results: List[Optional[Dict[str, Any]]] = []
+    pending: Dict[Future, Tuple[int, str, str]] = {}  # future -> (index, name, digest)
+
+    def collect(done: Iterable[Future]) -> None:
+        for future in done:
+            index, name, digest = pending.pop(future)
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                results[index] = {'file': name, 'ok': False, 'error': str(e)}
+                continue
+            if cache is not None:
+                cache.set(digest, {"basic_info": result["basic_info"], "subject_table": result["subject_table"]})
+            results[index] = {'file': name, 'ok': True, 'result': result, 'sha256': digest}
+
+    entries = expand_inputs(items)
+    names: List[str] = []
+    pool = _get_pool(workers, slots)
+    try:
+        for name, pdf_bytes, error in entries:
+            index = len(results)
+            names.append(name)
+            results.append(None)
+            if error is not None:
+                results[index] = {'file': name, 'ok': False, 'error': error}
+                continue
+            # Cache hits are answered here without a round trip through the pool
+            digest = pdf_digest(pdf_bytes)
+            cached = cache.get(digest) if cache is not None else None
+            if cached is not None:
+                result = {"filename": secure_filename(os.path.basename(name)), **cached}
+                results[index] = {'file': name, 'ok': True, 'result': result, 'sha256': digest}
+                continue
+            if len(pending) >= workers * PENDING_PER_WORKER:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending[pool.submit(process_one, name, pdf_bytes, *settings)] = (index, name, digest)
+        collect(wait(pending).done)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM); drop the pool so the next call starts fresh.
+        # Inputs not yet read are still expanded so every file gets an entry.
+        _reset_pool(pool)
+        names += [name for name, _, _ in entries]
+        results += [None] * (len(names) - len(results))
+        for index, entry in enumerate(results):
+            if entry is None:
+                results[index] = {'file': names[index], 'ok': False, 'error': 'Worker process crashed'}
+
+    return {'results': results, 'summary': summarize(results)}
+
+
+###############################
+# FLASK ROUTE HANDLERS
+###############################
+
+@bulk_bp.route('/bulk', methods=['POST'])
+def bulk_upload():
+    """Processes several PDFs or ZIP archives and returns per-file JSON results"""
+    files = request.files.getlist('files') or request.files.getlist('file')
+    files = [f for f in files if f and f.filename]
+    if not files:
+        return jsonify({'error': 'No files uploaded'}), 400
+
+    # Uploads stay spooled; ZIP members and PDFs are read as the pool needs them
+    items = ((f.filename, f.stream) for f in files)
+    response = process_bulk(items, **app_bulk_options())
+
+    from app import index_results
+    index_results((r['sha256'], r['result']) for r in response['results'] if r['ok'])
+    return jsonify(response)
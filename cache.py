@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Bump when the parser output changes so stale entries are never served
+CACHE_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters (name, value) VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+"""
+
+
+def pdf_digest(pdf_bytes: bytes) -> str:
+    """Return the SHA-256 hex digest used as the cache key for a PDF"""
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+class ResultCache:
+    """Disk-backed cache of parsed marksheets keyed by PDF hash.
+
+    Backed by a single SQLite file so every gunicorn worker on the host
+    shares the same entries and hit/miss counters.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024, ttl: int = 24 * 60 * 60):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread and per process (workers fork after import)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _key(digest: str) -> str:
+        return f"v{CACHE_VERSION}:{digest}"
+
+    def _bump(self, conn: sqlite3.Connection, name: str, amount: int = 1) -> None:
+        conn.execute('UPDATE counters SET value = value + ? WHERE name = ?', (amount, name))
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a PDF digest, or None on a miss"""
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            'SELECT data FROM entries WHERE key = ? AND created > ?',
+            (self._key(digest), now - self.ttl)
+        ).fetchone()
+        if row is None:
+            self._bump(conn, 'misses')
+            return None
+        conn.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, self._key(digest)))
+        self._bump(conn, 'hits')
+        return json.loads(row[0])
+
+    def set(self, digest: str, data: Dict[str, Any]) -> None:
+        """Store a parsed result and evict expired or least recently used entries"""
+        payload = json.dumps(data, separators=(',', ':'))
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        conn = self._connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO entries (key, data, size, created, accessed) VALUES (?, ?, ?, ?, ?)',
+                (self._key(digest), payload, size, now, now)
+            )
+            self._evict(conn, now)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        evicted = conn.execute('DELETE FROM entries WHERE created <= ?', (now - self.ttl,)).rowcount
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total > self.max_bytes:
+            # Drop least recently used entries until we are back under the limit
+            excess = total - self.max_bytes
+            for key, size in conn.execute('SELECT key, size FROM entries ORDER BY accessed').fetchall():
+                if excess <= 0:
+                    break
+                conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                excess -= size
+                evicted += 1
+        if evicted:
+            self._bump(conn, 'evictions', evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current cache size"""
+        conn = self._connect()
+        counters = dict(conn.execute('SELECT name, value FROM counters').fetchall())
+        entries, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        lookups = counters['hits'] + counters['misses']
+        return {
+            'hits': counters['hits'],
+            'misses': counters['misses'],
+            'evictions': counters['evictions'],
+            'hit_ratio': round(counters['hits'] / lookups, 4) if lookups else 0.0,
+            'entries': entries,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl
+        }
+
+    def clear(self) -> None:
+        """Remove every cached entry and reset the counters"""
+        conn = self._connect()
+        conn.execute('DELETE FROM entries')
+        conn.execute('UPDATE counters SET value = 0')
@@ -0,0 +1,541 @@
+"""Cohort analytics over many parsed results using columnar NumPy arrays.
+
+Usage:
+    python -m cohort results/*.json [--subject 310241]
+
+Each input is a result JSON as produced by upload_file or /bulk
+(`basic_info` + `subject_table`). Results are flattened once into
+per-semester and per-subject-row arrays; every report after that is a
+handful of vectorized passes (bincount / searchsorted / masked sums)
+instead of a Python loop per student.
+"""
+import argparse
+import copy
+import gc
+import json
+import re
+import sys
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from processed import detect_and_split_semester, prepare_result_data, process_subject_name
+
+# Class thresholds shared with get_semester_class / get_class_awarded
+CLASS_BOUNDS = np.array([5.5, 6.25, 6.75, 7.75])
+CLASS_NAMES = ['Pass', 'Second Class', 'Higher Second Class', 'First Class',
+               'First Class with Distinction', 'Failed']
+FAILED_CLASS = len(CLASS_NAMES) - 1
+
+# Percentage bounds of get_grade, lowest grade first
+GRADE_BOUNDS = np.array([40, 50, 60, 75])
+GRADE_NAMES = ['D', 'C', 'B', 'A', 'A+']
+
+# Known grades first so their codes are stable; unknown grades are appended
+GRADE_ORDER = ['O', 'A+', 'A', 'B+', 'B', 'C', 'P', 'F', 'AC']
+
+MARKER_NONE, MARKER_GRACE, MARKER_CONDONATION = 0, 1, 2
+NON_NUMERIC_PATTERN = re.compile(r'[^\d.]')
+
+
+def _number(value: Any) -> float:
+    """Numeric part of a table cell (e.g. '24#' -> 24.0); NaN when empty"""
+    if not value:
+        return np.nan
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    digits = NON_NUMERIC_PATTERN.sub('', str(value))
+    try:
+        return float(digits)
+    except ValueError:
+        return np.nan
+
+
+def _marker(credit_point: Any) -> int:
+    if not credit_point:
+        return MARKER_NONE
+    if '#' in credit_point:
+        return MARKER_GRACE
+    if '$' in credit_point:
+        return MARKER_CONDONATION
+    return MARKER_NONE
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """Pause the cyclic GC while building millions of short-lived rows.
+
+    The allocations would otherwise trigger repeated collections that find
+    nothing to free.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def py_round(values: np.ndarray, digits: int = 2) -> np.ndarray:
+    """np.round that agrees with Python's round() on values close to a tie.
+
+    np.round scales by 10**digits first, so 6.475 (stored as 6.47499...)
+    rounds up while round() gives 6.47; the few near-ties are redone in Python.
+    """
+    rounded = np.round(values, digits)
+    scaled = values * 10 ** digits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    rounded[near_tie] = [round(float(v), digits) for v in values[near_tie]]
+    return rounded
+
+
+def classify(values: np.ndarray) -> np.ndarray:
+    """Class index per SGPA/CGPA value (NaN -> Failed), as in get_class_awarded"""
+    classes = np.searchsorted(CLASS_BOUNDS, values, side='right')
+    classes[np.isnan(values)] = FAILED_CLASS
+    return classes
+
+
+class Cohort:
+    """Columnar arrays for a group of students.
+
+    Semester level (one entry per basic_info item): sem_student, sem_index,
+    sgpa (NaN when failed), earned_credits, total_credits, credit_points.
+    Subject level (one entry per subject row): row_student, row_semester,
+    row_code (index into codes), row_grade (index into grades), credit,
+    earned_credit, grade_point, credit_point, marker.
+    """
+
+    def __init__(self):
+        self.filenames: List[Optional[str]] = []
+        self.codes: List[str] = []
+        self.subject_names: List[str] = []
+        self.grades: List[str] = list(GRADE_ORDER)
+        self._code_index: Dict[str, int] = {}
+        self._grade_index: Dict[str, int] = {g: i for i, g in enumerate(self.grades)}
+
+        empty_int = np.empty(0, dtype=np.int32)
+        empty_float = np.empty(0, dtype=np.float64)
+        self.sem_student = empty_int
+        self.sem_index = np.empty(0, dtype=np.int8)
+        self.sgpa = empty_float
+        self.earned_credits = empty_float
+        self.total_credits = empty_float
+        self.credit_points = empty_float
+        self.row_student = empty_int
+        self.row_semester = np.empty(0, dtype=np.int8)
+        self.row_code = empty_int
+        self.row_grade = np.empty(0, dtype=np.int16)
+        self.credit = empty_float
+        self.earned_credit = empty_float
+        self.grade_point = empty_float
+        self.credit_point = empty_float
+        self.marker = np.empty(0, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return len(self.filenames)
+
+    ###############################
+    # INGEST
+    ###############################
+
+    @classmethod
+    def from_results(cls, results: Iterable[Dict[str, Any]]) -> 'Cohort':
+        """Build a cohort from result dicts in one pass"""
+        cohort = cls()
+        cohort.extend(results)
+        return cohort
+
+    def _code(self, code: str, name: str) -> int:
+        index = self._code_index.get(code)
+        if index is None:
+            index = self._code_index[code] = len(self.codes)
+            self.codes.append(code)
+            self.subject_names.append(name)
+        return index
+
+    def _grade(self, grade: Optional[str]) -> int:
+        grade = grade or ''
+        index = self._grade_index.get(grade)
+        if index is None:
+            index = self._grade_index[grade] = len(self.grades)
+            self.grades.append(grade)
+        return index
+
+    def extend(self, results: Iterable[Dict[str, Any]]) -> None:
+        """Append more students; rows are collected as tuples and turned into columns once"""
+        sems: List[tuple] = []
+        rows: List[tuple] = []
+        student = len(self.filenames)
+        code_of, grade_of = self._code, self._grade
+
+        with gc_paused():
+            for result in results:
+                self.filenames.append(result.get('filename'))
+                for index, sem in enumerate(result.get('basic_info') or []):
+                    sems.append((student, index, sem.get('sgpa'), sem['earned_credits'],
+                                 sem['total_credits'], sem['total_credit_points']))
+
+                # Same semester split the result page uses
+                for semester, subjects in enumerate(detect_and_split_semester(result.get('subject_table') or [])):
+                    for subject in subjects:
+                        rows.append((student, semester,
+                                     code_of(subject.get('SubCode'), subject.get('SubjectName')),
+                                     grade_of(subject.get('Grade')),
+                                     subject.get('Credit'), subject.get('EarnedCredit'),
+                                     subject.get('GradePoint'), subject.get('CreditPoint')))
+                student += 1
+
+        def grow(current: np.ndarray, values: Iterable[Any], count: int) -> np.ndarray:
+            return np.concatenate([current, np.fromiter(values, dtype=current.dtype, count=count)])
+
+        sem_student, sem_index, sgpa, earned, total, points = zip(*sems) if sems else ((),) * 6
+        n = len(sems)
+        self.sem_student = grow(self.sem_student, sem_student, n)
+        self.sem_index = grow(self.sem_index, sem_index, n)
+        self.sgpa = grow(self.sgpa, (np.nan if v in (None, '--') else float(v) for v in sgpa), n)
+        self.earned_credits = grow(self.earned_credits, map(float, earned), n)
+        self.total_credits = grow(self.total_credits, map(float, total), n)
+        self.credit_points = grow(self.credit_points, map(float, points), n)
+
+        (row_student, row_semester, row_code, row_grade,
+         credit, earned_credit, grade_point, credit_point) = zip(*rows) if rows else ((),) * 8
+        n = len(rows)
+        self.row_student = grow(self.row_student, row_student, n)
+        self.row_semester = grow(self.row_semester, row_semester, n)
+        self.row_code = grow(self.row_code, row_code, n)
+        self.row_grade = grow(self.row_grade, row_grade, n)
+        self.credit = grow(self.credit, map(_number, credit), n)
+        self.earned_credit = grow(self.earned_credit, map(_number, earned_credit), n)
+        self.grade_point = grow(self.grade_point, map(_number, grade_point), n)
+        self.credit_point = grow(self.credit_point, map(_number, credit_point), n)
+        self.marker = grow(self.marker, map(_marker, credit_point), n)
+
+    ###############################
+    # PER-STUDENT ARRAYS
+    ###############################
+
+    def cgpa(self) -> np.ndarray:
+        """CGPA per student over passed semesters (NaN if none), as calculate_cgpa"""
+        passed = ~np.isnan(self.sgpa)
+        points = np.bincount(self.sem_student, weights=np.where(passed, self.credit_points, 0), minlength=len(self))
+        credits = np.bincount(self.sem_student, weights=np.where(passed, self.total_credits, 0), minlength=len(self))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cgpa = py_round(points / credits, 2)
+        cgpa[credits == 0] = np.nan
+        return cgpa
+
+    def backlogs(self) -> np.ndarray:
+        """Number of F grades per student"""
+        failed = self.row_grade == self._grade_index['F']
+        return np.bincount(self.row_student[failed], minlength=len(self))
+
+    def marker_counts(self, marker: int) -> np.ndarray:
+        """Subjects per student carrying '#' (MARKER_GRACE) or '$' (MARKER_CONDONATION)"""
+        return np.bincount(self.row_student[self.marker == marker], minlength=len(self))
+
+    ###############################
+    # REPORTS
+    ###############################
+
+    def _codes_mask(self, subcode: Optional[str]) -> np.ndarray:
+        if subcode is None:
+            return np.ones(len(self.row_code), dtype=bool)
+        index = self._code_index.get(subcode)
+        if index is None:
+            return np.zeros(len(self.row_code), dtype=bool)
+        return self.row_code == index
+
+    def grade_distribution(self, subcode: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """{SubCode: {grade: count}} for every subject (or just one)"""
+        mask = self._codes_mask(subcode)
+        n_grades = len(self.grades)
+        flat = np.bincount(self.row_code[mask].astype(np.int64) * n_grades + self.row_grade[mask],
+                           minlength=len(self.codes) * n_grades).reshape(len(self.codes), n_grades)
+        present = np.flatnonzero(flat.sum(axis=1))
+        return {
+            self.codes[c]: {self.grades[g]: int(flat[c, g]) for g in np.flatnonzero(flat[c])}
+            for c in present
+        }
+
+    def pass_rates(self) -> Dict[str, Dict[str, Any]]:
+        """Per subject: graded attempts (AC rows excluded), passes and pass rate"""
+        graded = self.row_grade != self._grade_index['AC']
+        failed = self.row_grade == self._grade_index['F']
+        attempts = np.bincount(self.row_code[graded], minlength=len(self.codes))
+        fails = np.bincount(self.row_code[failed], minlength=len(self.codes))
+        return {
+            self.codes[c]: {
+                'name': self.subject_names[c],
+                'attempts': int(attempts[c]),
+                'passed': int(attempts[c] - fails[c]),
+                'pass_rate': round(float(1 - fails[c] / attempts[c]), 4)
+            }
+            for c in np.flatnonzero(attempts)
+        }
+
+    def backlog_counts(self) -> Dict[str, Any]:
+        """Students by number of backlogs, plus totals"""
+        per_student = self.backlogs()
+        histogram = np.bincount(per_student)
+        return {
+            'students_with_backlogs': int(np.count_nonzero(per_student)),
+            'total_backlogs': int(per_student.sum()),
+            'by_count': {int(n): int(histogram[n]) for n in np.flatnonzero(histogram)}
+        }
+
+    def class_breakdown(self, semester: Optional[int] = None) -> Dict[str, int]:
+        """Class awarded counts on CGPA, or on SGPA of one semester (0-based)"""
+        if semester is None:
+            values = self.cgpa()
+        else:
+            values = self.sgpa[self.sem_index == semester]
+        counts = np.bincount(classify(values), minlength=len(CLASS_NAMES))
+        return {name: int(count) for name, count in zip(CLASS_NAMES, counts)}
+
+    def sgpa_summary(self) -> List[Dict[str, Any]]:
+        """SGPA count, failures, mean and quartiles for each semester position"""
+        summary = []
+        for semester in np.unique(self.sem_index):
+            values = self.sgpa[self.sem_index == semester]
+            passed = values[~np.isnan(values)]
+            entry = {'semester': int(semester) + 1, 'students': int(len(values)),
+                     'failed': int(len(values) - len(passed))}
+            if len(passed):
+                q1, median, q3 = np.percentile(passed, [25, 50, 75])
+                entry.update(mean=round(float(passed.mean()), 2), min=float(passed.min()),
+                             q1=round(float(q1), 2), median=round(float(median), 2),
+                             q3=round(float(q3), 2), max=float(passed.max()))
+            summary.append(entry)
+        return summary
+
+    def summary(self) -> Dict[str, Any]:
+        """Headline numbers for the whole cohort"""
+        cgpa = self.cgpa()
+        valid = cgpa[~np.isnan(cgpa)]
+        return {
+            'students': len(self),
+            'subjects': len(self.codes),
+            'subject_rows': int(len(self.row_code)),
+            'cgpa_mean': round(float(valid.mean()), 2) if len(valid) else None,
+            'sgpa': self.sgpa_summary(),
+            'class_awarded': self.class_breakdown(),
+            'backlogs': self.backlog_counts(),
+            'grace_marks': int(np.count_nonzero(self.marker == MARKER_GRACE)),
+            'condonation_marks': int(np.count_nonzero(self.marker == MARKER_CONDONATION))
+        }
+
+
+###############################
+# BATCH RESULT PREPARATION
+###############################
+
+def _credit_point_value(credit_point: Any) -> int:
+    """Same value calculate_student_credit_points adds for one subject"""
+    if not credit_point:
+        return 0
+    if credit_point.isdigit():
+        return int(credit_point)
+    numeric = NON_NUMERIC_PATTERN.sub('', credit_point)
+    return int(float(numeric)) if numeric else 0
+
+
+def _credit_value(credit: Any) -> int:
+    """Same value calculate_final_credit_points adds for one subject"""
+    if not credit:
+        return 0
+    if isinstance(credit, str) and credit.isdigit():
+        return int(credit)
+    try:
+        return int(float(credit))
+    except (ValueError, TypeError):
+        return 0
+
+
+def _batchable(data: Dict[str, Any]) -> bool:
+    # Odd shapes (no subjects, already prepared) go through prepare_result_data
+    return (bool(data.get('subject_table')) and 'basic_info' in data
+            and 'second_semester_subjects' not in data)
+
+
+def prepare_result_data_batch(results: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """prepare_result_data for many students at once.
+
+    One Python pass splits semesters and flattens subject rows into arrays;
+    credit points, SGPA, CGPA, percentage, grade and class awarded are then
+    computed for every student with a few vectorized passes, and only the
+    flagged rows (F grades, '#' and '$' markers) are visited again to build
+    the backlog and marker lists. Returns new dicts equal to what
+    prepare_result_data returns; inputs are left unmodified.
+    """
+    with gc_paused():
+        return _prepare_batch(list(results))
+
+
+def _prepare_batch(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    prepared: List[Optional[Dict[str, Any]]] = [None] * len(results)
+    batch = []
+    for index, data in enumerate(results):
+        if _batchable(data):
+            batch.append(index)
+        else:
+            prepared[index] = prepare_result_data(copy.deepcopy(data))
+
+    names: Dict[str, str] = {}
+
+    def clean(name):
+        if name not in names:
+            names[name] = process_subject_name(name)
+        return names[name]
+
+    # Pass 1: copy subjects with cleaned names, split semesters and flatten.
+    # Slot 2*k + semester identifies semester `semester` of batch student k.
+    tables: List[List[List[Dict[str, Any]]]] = []
+    row_subjects: List[Dict[str, Any]] = []
+    rows: List[tuple] = []
+    for k, index in enumerate(batch):
+        subjects = []
+        for subject in results[index]['subject_table']:
+            subject = dict(subject)
+            if 'SubjectName' in subject:
+                subject['SubjectName'] = clean(subject['SubjectName'])
+            subjects.append(subject)
+        semesters = detect_and_split_semester(subjects)
+        tables.append(semesters)
+        for semester, sem_subjects in enumerate(semesters):
+            for subject in sem_subjects:
+                credit_point = subject.get('CreditPoint')
+                marks = str(credit_point) if credit_point else ''
+                row_subjects.append(subject)
+                rows.append((2 * k + semester, _credit_point_value(credit_point),
+                             _credit_value(subject.get('Credit')), subject.get('Grade') == 'F',
+                             '#' in marks, '$' in marks))
+
+    n_slots = 2 * len(batch)
+    slot, points, credits, failed, grace, condo = (
+        np.array(column) for column in (zip(*rows) if rows else ((),) * 6))
+    slot = slot.astype(np.int64)
+
+    # Pass 2: per-semester credit points and calculated SGPA
+    student_points = np.bincount(slot, weights=points, minlength=n_slots).astype(np.int64)
+    final_points = np.bincount(slot, weights=credits, minlength=n_slots).astype(np.int64) * 10
+    with np.errstate(divide='ignore', invalid='ignore'):
+        calculated_sgpa = py_round((student_points / final_points) * 10, 2)
+
+    # Pass 3: basic_info conversion, class per semester, CGPA over passed semesters
+    info_student, info_sgpa, info_points, info_credits = [], [], [], []
+    for k, index in enumerate(batch):
+        for sem in results[index]['basic_info']:
+            info_student.append(k)
+            info_sgpa.append(np.nan if sem['sgpa'] == '--' else float(sem['sgpa']))
+            info_points.append(int(sem['total_credit_points']))
+            info_credits.append(int(sem['total_credits']))
+    info_student = np.array(info_student, dtype=np.int64)
+    info_sgpa = np.array(info_sgpa, dtype=np.float64)
+    info_passed = ~np.isnan(info_sgpa)
+    info_class = classify(info_sgpa)
+    info_count = np.bincount(info_student, minlength=len(batch))
+    cgpa_points = np.bincount(info_student, weights=np.where(info_passed, info_points, 0), minlength=len(batch))
+    cgpa_credits = np.bincount(info_student, weights=np.where(info_passed, info_credits, 0), minlength=len(batch))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cgpa = py_round(cgpa_points / cgpa_credits, 2)
+    cgpa[cgpa_credits == 0] = np.nan
+    percentage = py_round(cgpa * 9.5, 2)
+    grade = np.searchsorted(GRADE_BOUNDS, percentage, side='right')
+    cgpa_class = classify(cgpa)
+
+    # Pass 4: backlog and marker lists from the flagged rows only
+    flagged: Dict[str, List[List[Dict[str, Any]]]] = {}
+    for key, mask in (('backlogs', failed), ('grace_marks', grace), ('condo_marks', condo)):
+        lists = flagged[key] = [[] for _ in range(n_slots)]
+        for row in np.flatnonzero(mask.astype(bool)):
+            subject = row_subjects[row]
+            lists[slot[row]].append({'code': subject.get('SubCode'),
+                                     'name': process_subject_name(subject.get('SubjectName'))})
+
+    # Assemble the per-student dicts in prepare_result_data's key order
+    info_start = 0
+    for k, index in enumerate(batch):
+        data = dict(results[index])
+        semesters = tables[k]
+        first, second = 2 * k, 2 * k + 1
+        has_second = len(semesters) > 1
+        n_info = int(info_count[k])
+
+        data['subject_table'] = semesters[0]
+        if has_second:
+            data['second_semester_subjects'] = semesters[1]
+        data['first_sem_credit_points'] = {'student_credit_points': int(student_points[first]),
+                                           'final_credit_points': int(final_points[first])}
+        if n_info > 0 and final_points[first] > 0:
+            data['first_sem_calculated_sgpa'] = float(calculated_sgpa[first])
+        if has_second:
+            data['second_sem_credit_points'] = {'student_credit_points': int(student_points[second]),
+                                                'final_credit_points': int(final_points[second])}
+            if n_info > 1 and final_points[second] > 0:
+                data['second_sem_calculated_sgpa'] = float(calculated_sgpa[second])
+
+        basic_info = []
+        for offset, sem in enumerate(results[index]['basic_info']):
+            row = info_start + offset
+            sem = dict(sem)
+            sem['sgpa'] = float(info_sgpa[row]) if info_passed[row] else None
+            sem['class_awarded'] = CLASS_NAMES[info_class[row]]
+            sem['earned_credits'] = int(sem['earned_credits'])
+            sem['total_credits'] = info_credits[row]
+            sem['total_credit_points'] = info_points[row]
+            basic_info.append(sem)
+        data['basic_info'] = basic_info
+        info_start += n_info
+
+        if n_info == 2:
+            passed = not np.isnan(cgpa[k])
+            data['cgpa'] = float(cgpa[k]) if passed else None
+            data['class_awarded'] = CLASS_NAMES[cgpa_class[k]]
+            data['percentage'] = float(percentage[k]) if passed else None
+            data['grade'] = GRADE_NAMES[grade[k]] if passed else 'F'
+
+        for key in ('backlogs', 'grace_marks', 'condo_marks'):
+            first_list = flagged[key][first]
+            second_list = flagged[key][second]
+            data[key] = {'first_sem': first_list, 'second_sem': second_list,
+                         'total': len(first_list) + len(second_list)}
+        prepared[index] = data
+
+    return prepared
+
+
+def load_results(paths: Iterable[str]) -> Iterable[Dict[str, Any]]:
+    """Read result JSON files (a single result or a /bulk response) lazily"""
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if 'results' in data:
+            for entry in data['results']:
+                if entry.get('ok'):
+                    yield entry['result']
+        else:
+            yield data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help='Result JSON files or saved /bulk responses')
+    parser.add_argument('--subject', help='Also print the grade distribution of this SubCode')
+    args = parser.parse_args(argv)
+
+    cohort = Cohort.from_results(load_results(args.paths))
+    report = cohort.summary()
+    if args.subject:
+        report['grade_distribution'] = cohort.grade_distribution(args.subject)
+        report['pass_rate'] = cohort.pass_rates().get(args.subject)
+    print(json.dumps(report, indent=4))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
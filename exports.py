@@ -0,0 +1,333 @@
+"""Cohort exports: streaming XLSX, CSV, JSON Lines and (with pyarrow) Parquet.
+
+Usage:
+    python -m exports FORMAT [--table subjects|semesters] [--index PATH | RESULT.json ...] [-o OUT]
+
+FORMAT is csv, jsonl, parquet or xlsx. Rows come from the results index
+(default) or from result JSON files / saved /bulk responses. Subject rows
+have the record shape parse_marksheet produces plus the source filename.
+"""
+import argparse
+import csv
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from flask import Blueprint, Response, abort, jsonify, send_file, stream_with_context
+
+if TYPE_CHECKING:
+    from openpyxl import Workbook
+
+export_bp = Blueprint('export', __name__, url_prefix='/export')
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+MAX_SHEET_ROWS = 1048576  # Excel's hard row limit, header included
+
+SUBJECT_COLUMNS = ['SubCode', 'SubjectName', 'Credit', 'EarnedCredit', 'Grade', 'GradePoint', 'CreditPoint']
+SEMESTER_COLUMNS = ['semester', 'sgpa', 'earned_credits', 'total_credits', 'total_credit_points']
+EXPORT_CHUNK = 64 * 1024  # characters buffered per streamed chunk
+PARQUET_BATCH = 10000     # rows per Parquet record batch
+
+NUMERIC_COLUMNS = {'Credit', 'EarnedCredit', 'GradePoint', 'CreditPoint',
+                   'earned_credits', 'total_credits', 'total_credit_points'}
+
+
+def _columns(records: List[Dict[str, Any]]) -> List[str]:
+    """Column order of pandas.DataFrame(records): keys in order of first appearance"""
+    columns = {}
+    for record in records:
+        for key in record:
+            columns.setdefault(key, None)
+    return list(columns)
+
+
+def write_records_sheet(workbook: 'Workbook', title: str, records: List[Dict[str, Any]]) -> None:
+    """Append a sheet laid out like DataFrame(records).to_excel(index=False)"""
+    sheet = workbook.create_sheet(title)
+    columns = _columns(records)
+    sheet.append(columns)
+    for record in records:
+        sheet.append([record.get(column) for column in columns])
+
+
+def _cell(column: str, value: Any) -> Any:
+    """Whole-number strings in numeric columns become ints so cohort sheets can be summed"""
+    if column in NUMERIC_COLUMNS and isinstance(value, str) and value.isdigit():
+        return int(value)
+    return value
+
+
+###############################
+# COHORT WORKBOOK
+###############################
+
+class _SheetSeries:
+    """Write-only sheet that continues on 'Title 2', 'Title 3'... past Excel's row limit"""
+
+    def __init__(self, workbook: 'Workbook', title: str, header: List[str]):
+        self.workbook = workbook
+        self.title = title
+        self.header = header
+        self.parts = 0
+        self._next_sheet()
+
+    def _next_sheet(self) -> None:
+        self.parts += 1
+        self.sheet = self.workbook.create_sheet(self.title if self.parts == 1 else f"{self.title} {self.parts}")
+        self.sheet.append(self.header)
+        self.rows = 1
+
+    def append(self, row: List[Any]) -> None:
+        if self.rows >= MAX_SHEET_ROWS:
+            self._next_sheet()
+        self.sheet.append(row)
+        self.rows += 1
+
+
+def write_cohort_workbook(results: Iterable[Dict[str, Any]], out: BinaryIO) -> int:
+    """Stream many results into one workbook and return the number of students.
+
+    'Subjects' has one row per subject and 'Semesters' one row per SGPA
+    line, each keyed by filename. Results are consumed one at a time and
+    rows go straight to openpyxl's temporary sheet files, so memory stays
+    flat however many students are exported.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    subjects = _SheetSeries(workbook, 'Subjects', ['filename'] + SUBJECT_COLUMNS)
+    semesters = _SheetSeries(workbook, 'Semesters', ['filename'] + SEMESTER_COLUMNS)
+
+    count = 0
+    for result in results:
+        filename = result.get('filename')
+        for subject in result.get('subject_table') or []:
+            subjects.append([filename] + [_cell(column, subject.get(column)) for column in SUBJECT_COLUMNS])
+        for sem in result.get('basic_info') or []:
+            sgpa = sem.get('sgpa')
+            row = [_cell(column, sem.get(column)) for column in SEMESTER_COLUMNS]
+            row[1] = None if sgpa in (None, '--') else float(sgpa)
+            semesters.append([filename] + row)
+        count += 1
+
+    workbook.save(out)
+    return count
+
+
+###############################
+# ROW STREAMS
+###############################
+
+def iter_subject_rows(results: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """One parse_marksheet-shaped record per subject, tagged with its filename"""
+    for result in results:
+        filename = result.get('filename')
+        for subject in result.get('subject_table') or []:
+            row = {'filename': filename}
+            row.update((column, subject.get(column)) for column in SUBJECT_COLUMNS)
+            yield row
+
+
+def iter_semester_rows(results: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """One basic_info record per semester, tagged with its filename"""
+    for result in results:
+        filename = result.get('filename')
+        for sem in result.get('basic_info') or []:
+            row = {'filename': filename}
+            row.update((column, sem.get(column)) for column in SEMESTER_COLUMNS)
+            yield row
+
+
+EXPORT_TABLES = {
+    'subjects': (iter_subject_rows, ['filename'] + SUBJECT_COLUMNS),
+    'semesters': (iter_semester_rows, ['filename'] + SEMESTER_COLUMNS),
+}
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[str]:
+    """CSV text in ~EXPORT_CHUNK pieces, header first"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= EXPORT_CHUNK:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_jsonl(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """JSON Lines text in ~EXPORT_CHUNK pieces"""
+    parts, size = [], 0
+    for row in rows:
+        line = json.dumps(row, separators=(',', ':')) + '\n'
+        parts.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK:
+            yield ''.join(parts)
+            parts, size = [], 0
+    yield ''.join(parts)
+
+
+def parquet_available() -> bool:
+    """Parquet export needs the optional pyarrow package"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def write_parquet(rows: Iterable[Dict[str, Any]], columns: List[str], out: Any) -> int:
+    """Write rows to Parquet in PARQUET_BATCH-row record batches; returns rows written.
+
+    Every column is stored as a nullable string, exactly as parsed; cast
+    downstream as needed.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    count = 0
+    with pq.ParquetWriter(out, schema, compression='zstd') as writer:
+        batch: Dict[str, List[Optional[str]]] = {column: [] for column in columns}
+        for row in rows:
+            for column in columns:
+                value = row.get(column)
+                batch[column].append(None if value is None else str(value))
+            count += 1
+            if count % PARQUET_BATCH == 0:
+                writer.write_batch(pa.record_batch(list(batch.values()), schema=schema))
+                batch = {column: [] for column in columns}
+        if batch[columns[0]]:
+            writer.write_batch(pa.record_batch(list(batch.values()), schema=schema))
+    return count
+
+
+###############################
+# FLASK ROUTE HANDLERS
+###############################
+
+def _export_filename(name: str, extension: str) -> str:
+    return f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+
+@export_bp.before_request
+def require_admin():
+    """Exports hold every indexed student's record: same admin token as /index"""
+    from results_index import get_results_index, has_admin_token
+
+    if get_results_index() is None:
+        return jsonify({'error': 'Results index is disabled'}), 404
+    if not has_admin_token():
+        return jsonify({'error': 'An admin token is required'}), 403
+
+
+def _indexed_results():
+    from results_index import get_results_index
+
+    return get_results_index().iter_results()
+
+
+@export_bp.route('/<table>.csv')
+def export_csv(table):
+    """Every indexed subject or semester row as streamed CSV"""
+    if table not in EXPORT_TABLES:
+        abort(404)
+    rows, columns = EXPORT_TABLES[table]
+    body = stream_with_context(iter_csv(rows(_indexed_results()), columns))
+    return Response(body, mimetype='text/csv', headers={
+        'Content-Disposition': f"attachment; filename={_export_filename(table, 'csv')}"})
+
+
+@export_bp.route('/<table>.jsonl')
+def export_jsonl(table):
+    """Every indexed subject or semester row as streamed JSON Lines"""
+    if table not in EXPORT_TABLES:
+        abort(404)
+    rows, _ = EXPORT_TABLES[table]
+    body = stream_with_context(iter_jsonl(rows(_indexed_results())))
+    return Response(body, mimetype='application/x-ndjson', headers={
+        'Content-Disposition': f"attachment; filename={_export_filename(table, 'jsonl')}"})
+
+
+@export_bp.route('/<table>.parquet')
+def export_parquet(table):
+    """Every indexed subject or semester row as Parquet (requires pyarrow)"""
+    if table not in EXPORT_TABLES:
+        abort(404)
+    if not parquet_available():
+        return {'error': 'Parquet export needs pyarrow installed'}, 501
+    rows, columns = EXPORT_TABLES[table]
+    # Parquet's footer is written last, so build the file first, then stream it
+    out = tempfile.TemporaryFile()
+    write_parquet(rows(_indexed_results()), columns, out)
+    out.seek(0)
+    return send_file(out, mimetype='application/vnd.apache.parquet', as_attachment=True,
+                     download_name=_export_filename(table, 'parquet'))
+
+@export_bp.route('/cohort.xlsx')
+def cohort_workbook():
+    """Every indexed result as one workbook (subjects and semesters sheets)"""
+    # Spooled to a temporary file (zip output needs seeking), then streamed
+    out = tempfile.TemporaryFile()
+    write_cohort_workbook(_indexed_results(), out)
+    out.seek(0)
+    return send_file(out, mimetype=XLSX_MIMETYPE, as_attachment=True,
+                     download_name=_export_filename('cohort', 'xlsx'))
+
+
+###############################
+# COMMAND LINE
+###############################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('format', choices=['csv', 'jsonl', 'parquet', 'xlsx'])
+    parser.add_argument('inputs', nargs='*', help='Result JSON files (default: read the results index)')
+    parser.add_argument('--table', choices=sorted(EXPORT_TABLES), default='subjects')
+    parser.add_argument('--index', help='Results index path (default: RESULT_INDEX_PATH)')
+    parser.add_argument('-o', '--output', default='-', help="Output file ('-' = stdout for csv/jsonl)")
+    args = parser.parse_args(argv)
+
+    if args.inputs:
+        from cohort import load_results
+        results = load_results(args.inputs)
+    else:
+        from results_index import ResultsIndex
+        path = args.index or os.environ.get('RESULT_INDEX_PATH')
+        if not path:
+            parser.error('No results index: pass --index PATH, set RESULT_INDEX_PATH or give result files')
+        results = ResultsIndex(path).iter_results()
+
+    rows, columns = EXPORT_TABLES[args.table]
+    if args.format in ('csv', 'jsonl'):
+        chunks = iter_csv(rows(results), columns) if args.format == 'csv' else iter_jsonl(rows(results))
+        out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        return 0
+
+    if args.output == '-':
+        parser.error(f"{args.format} output needs -o FILE")
+    if args.format == 'parquet':
+        if not parquet_available():
+            parser.error('Parquet export needs pyarrow installed')
+        count = write_parquet(rows(results), columns, args.output)
+        print(f"Wrote {count} rows to {args.output}", file=sys.stderr)
+    else:
+        with open(args.output, 'wb') as f:
+            count = write_cohort_workbook(results, f)
+        print(f"Wrote {count} students to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
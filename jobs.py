@@ -0,0 +1,160 @@
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """Raised when the job queue has no room for another upload"""
+
+
+class Job:
+    """State of one background processing job"""
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = 'queued'  # queued -> running -> done | failed
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+
+    @property
+    def wait_time(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return self.started_at - self.submitted_at
+
+    @property
+    def run_time(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'wait_seconds': round(self.wait_time, 4) if self.wait_time is not None else None,
+            'run_seconds': round(self.run_time, 4) if self.run_time is not None else None
+        }
+
+
+def _summary(samples) -> Dict[str, Any]:
+    """Count, mean and percentiles of recent timing samples"""
+    if not samples:
+        return {'count': 0, 'avg': None, 'p50': None, 'p95': None, 'max': None}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        'count': len(ordered),
+        'avg': round(sum(ordered) / len(ordered), 4),
+        'p50': round(ordered[int(last * 0.50)], 4),
+        'p95': round(ordered[int(last * 0.95)], 4),
+        'max': round(ordered[-1], 4)
+    }
+
+
+class JobManager:
+    """Runs uploads on a bounded background thread pool and tracks their state.
+
+    Jobs live in the memory of the worker process that accepted them, so
+    multi-worker deployments need sticky routing for /jobs/<id>.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 100, keep: int = 1000, samples: int = 500):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.keep = keep
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_times = deque(maxlen=samples)
+        self._run_times = deque(maxlen=samples)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Threads do not survive fork, so start the pool lazily in each worker
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pdf-job')
+            self._pid = os.getpid()
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> str:
+        """Queue fn(*args) and return the new job id"""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise QueueFull()
+            job = Job(secrets.token_urlsafe(12))
+            self._jobs[job.id] = job
+            self._queued += 1
+            self._prune()
+        self._get_executor().submit(self._run, job, fn, args)
+        return job.id
+
+    def _prune(self) -> None:
+        # Forget the oldest finished jobs once we track more than `keep`
+        excess = len(self._jobs) - self.keep
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.status in ('done', 'failed')][:excess]:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job, fn: Callable[..., Any], args) -> None:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            job.status = 'running'
+            job.started_at = time.time()
+            self._wait_times.append(job.wait_time)
+        try:
+            result = fn(*args)
+        except Exception as e:
+            logger.warning("Job %s failed: %s", job.id, e)
+            error, result = str(e), None
+        else:
+            error = None
+        with self._lock:
+            job.finished_at = time.time()
+            job.result = result
+            job.error = error
+            job.status = 'failed' if error is not None else 'done'
+            self._running -= 1
+            if error is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+            self._run_times.append(job.run_time)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput counters and wait/run time summaries"""
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'queued': self._queued,
+                'running': self._running,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'wait_seconds': _summary(self._wait_times),
+                'run_seconds': _summary(self._run_times)
+            }
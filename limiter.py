@@ -0,0 +1,241 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock files, only the per-process limits apply
+    fcntl = None
+
+
+class Overloaded(Exception):
+    """Raised when no extraction slot is free and the wait queue is full (or the wait ran out)"""
+
+    def __init__(self, message: str, retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """Caps how many extractions run at once in this process, with a bounded wait queue.
+
+    Up to max_concurrent callers hold a slot; up to max_waiting more block
+    for at most wait_timeout seconds. Anyone beyond that is turned away at
+    once with Overloaded, so a burst of uploads cannot fork an unbounded
+    number of pdftotext processes.
+    """
+
+    def __init__(self, max_concurrent: int, max_waiting: int, wait_timeout: float, retry_after: int = 5):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+        self._cond = threading.Condition()
+        self._pid = os.getpid()
+        self._running = 0
+        self._waiting = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    def _condition(self) -> threading.Condition:
+        # A lock copied by fork may be held by a thread that does not exist
+        # in the child, so each process starts from a fresh, empty limiter
+        if self._pid != os.getpid():
+            self._cond = threading.Condition()
+            self._pid = os.getpid()
+            self._running = self._waiting = 0
+        return self._cond
+
+    @contextmanager
+    def slot(self) -> Iterator[float]:
+        """Hold one extraction slot; yields the seconds spent waiting for it"""
+        cond = self._condition()
+        start = time.monotonic()
+        with cond:
+            if self._running >= self.max_concurrent:
+                if self._waiting >= self.max_waiting:
+                    self._rejected += 1
+                    raise Overloaded('Too many marksheets are being processed, try again shortly',
+                                     self.retry_after)
+                self._waiting += 1
+                try:
+                    deadline = start + self.wait_timeout
+                    while self._running >= self.max_concurrent:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._timed_out += 1
+                            raise Overloaded('Timed out waiting for a free extraction slot', self.retry_after)
+                        cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._running += 1
+        try:
+            yield time.monotonic() - start
+        finally:
+            with cond:
+                self._running -= 1
+                cond.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition():
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_waiting': self.max_waiting,
+                'running': self._running,
+                'waiting': self._waiting,
+                'rejected': self._rejected,
+                'timed_out': self._timed_out
+            }
+
+
+class AsyncConcurrencyLimiter:
+    """ConcurrencyLimiter for coroutines on one event loop.
+
+    Waiting uploads cost a suspended coroutine instead of a blocked
+    thread, so the wait queue can be far longer than a thread pool.
+    """
+
+    def __init__(self, max_concurrent: int, max_waiting: int, wait_timeout: float, retry_after: int = 5):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._running = 0
+        self._waiting = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    @asynccontextmanager
+    async def slot(self, bounded: bool = True) -> AsyncIterator[float]:
+        """Hold one extraction slot; yields the seconds spent waiting for it.
+
+        With bounded=False the caller is never turned away and waits as long
+        as it takes: for batch entries, whose batch already caps how many of
+        them ask at once.
+        """
+        if self._semaphore is None:
+            # Created on first use so it belongs to the worker's own loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        start = time.monotonic()
+        if self._semaphore.locked():
+            if bounded and self._waiting >= self.max_waiting:
+                self._rejected += 1
+                raise Overloaded('Too many marksheets are being processed, try again shortly', self.retry_after)
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.wait_timeout if bounded else None)
+            except asyncio.TimeoutError:
+                self._timed_out += 1
+                raise Overloaded('Timed out waiting for a free extraction slot', self.retry_after)
+            finally:
+                self._waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self._running += 1
+        try:
+            yield time.monotonic() - start
+        finally:
+            self._running -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_concurrent': self.max_concurrent,
+            'max_waiting': self.max_waiting,
+            'running': self._running,
+            'waiting': self._waiting,
+            'rejected': self._rejected,
+            'timed_out': self._timed_out
+        }
+
+
+class HostSemaphore:
+    """Caps how many extractions run at once across every process on the host.
+
+    Slot i is the lock file `directory`/slot-i, held with a POSIX record
+    lock (fcntl.lockf). The kernel drops such a lock when its process
+    exits, even on SIGKILL, and forked children (bulk pool workers,
+    pdftotext itself) do not inherit it, so a killed worker cannot leak a
+    slot. Record locks belong to the whole process, so threads of one
+    process are kept off each other's slots in memory. Waiting polls the
+    lock files, backing off up to max_poll seconds.
+    """
+
+    def __init__(self, directory: str, slots: int, retry_after: int = 5, max_poll: float = 0.1):
+        self.directory = directory
+        self.slots = slots
+        self.retry_after = retry_after
+        self.max_poll = max_poll
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._fds: List[int] = []
+        self._held: Set[int] = set()
+
+    def _open(self) -> threading.Lock:
+        # Lock files are opened once per process; a forked child holds none
+        # of its parent's slots and starts from its own descriptors
+        if self._pid != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            self._lock = threading.Lock()
+            self._fds = [os.open(os.path.join(self.directory, f'slot-{i}'), os.O_RDWR | os.O_CREAT, 0o600)
+                         for i in range(self.slots)]
+            self._held = set()
+            self._pid = os.getpid()
+        return self._lock
+
+    def _try_acquire(self) -> Optional[int]:
+        with self._open():
+            for index, fd in enumerate(self._fds):
+                if index in self._held:
+                    continue
+                try:
+                    fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue  # Held by another process
+                self._held.add(index)
+                return index
+        return None
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Take a slot, waiting up to timeout seconds (None: as long as it takes).
+
+        Returns the slot to pass to release(), or None if the wait ran out.
+        """
+        if fcntl is None:
+            return -1
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = 0.005
+        while True:
+            slot = self._try_acquire()
+            if slot is not None:
+                return slot
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                delay = min(delay, remaining)
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_poll)
+
+    def release(self, slot: int) -> None:
+        if slot < 0:
+            return
+        with self._open():
+            fcntl.lockf(self._fds[slot], fcntl.LOCK_UN)
+            self._held.discard(slot)
+
+    @contextmanager
+    def hold(self, timeout: Optional[float] = None) -> Iterator[float]:
+        """Hold one slot; yields the seconds spent waiting, raises Overloaded if the wait ran out"""
+        start = time.monotonic()
+        slot = self.acquire(timeout)
+        if slot is None:
+            raise Overloaded('Timed out waiting for a free extraction slot', self.retry_after)
+        try:
+            yield time.monotonic() - start
+        finally:
+            self.release(slot)
@@ -0,0 +1,20 @@
+"""Marksheet pipeline core: pdftotext output in, subject records and SGPA rows out.
+
+Pure functions over strings and line iterators with precompiled
+patterns, plus the pdftotext runner. Nothing here imports Flask, pandas
+or openpyxl, so the web app, test.py and batch worker processes share
+one copy and it imports in a few milliseconds.
+"""
+from marksheet.parser import MARKSHEET_PARSERS, parse_marksheet, parse_marksheet_columns, table_column_spans
+from marksheet.pdftotext import ExtractionError, ExtractionTimeout, extract_table_text, pdftotext
+from marksheet.pipeline import ParseError, parse_text
+from marksheet.sgpa import extract_sgpa_info
+from marksheet.table import (ResultDateScanner, cut_after_result_date, extract_subject_table, fix_table_headers,
+                             has_complete_table, iter_table_lines, iter_text_lines, remove_sem_column)
+
+__all__ = [
+    'ExtractionError', 'ExtractionTimeout', 'MARKSHEET_PARSERS', 'ParseError', 'ResultDateScanner',
+    'cut_after_result_date', 'extract_sgpa_info', 'extract_table_text', 'extract_subject_table', 'fix_table_headers',
+    'has_complete_table', 'iter_table_lines', 'iter_text_lines', 'parse_marksheet', 'parse_marksheet_columns',
+    'parse_text', 'pdftotext', 'remove_sem_column', 'table_column_spans'
+]
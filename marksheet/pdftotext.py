@@ -0,0 +1,118 @@
+import io
+import subprocess
+import threading
+from typing import BinaryIO, List, Optional, Sequence, Union
+
+from marksheet.table import ResultDateScanner, cut_after_result_date, has_complete_table
+
+READ_CHUNK = 16 * 1024  # characters per read from pdftotext's stdout
+WRITE_CHUNK = 64 * 1024  # bytes per write when the PDF is a file object
+
+# PDF bytes, or a readable binary file (read from the start, e.g. a spooled upload)
+PdfInput = Union[bytes, BinaryIO]
+
+
+class ExtractionError(Exception):
+    """pdftotext could not be run or rejected the PDF"""
+
+
+class ExtractionTimeout(ExtractionError):
+    """pdftotext was killed for running past its timeout"""
+
+
+def _feed(proc: subprocess.Popen, pdf: PdfInput, errors: List[str]) -> None:
+    """Write the PDF to pdftotext's stdin, then collect its stderr"""
+    try:
+        if isinstance(pdf, bytes):
+            proc.stdin.write(pdf)
+        else:
+            pdf.seek(0)
+            for chunk in iter(lambda: pdf.read(WRITE_CHUNK), b''):
+                proc.stdin.write(chunk)
+        proc.stdin.close()
+    except (BrokenPipeError, OSError):
+        pass  # Child exited early (bad PDF, or we killed it after RESULT DATE)
+    try:
+        errors.append(proc.stderr.read().decode('utf-8', errors='replace'))
+    except (OSError, ValueError):
+        pass
+
+
+def pdftotext(pdf: PdfInput, stop_early: bool = True, options: Sequence[str] = (),
+              timeout: Optional[float] = None) -> str:
+    """Layout text of a PDF, piped through pdftotext; raises ExtractionError on failure.
+
+    stdout is read in chunks; once the subject table and the RESULT DATE
+    line have been seen the rest of the document is not needed, so the child
+    is killed instead of converting the remaining pages. `options` are
+    extra pdftotext arguments (page range, crop box). A run still going
+    after `timeout` seconds is killed and raises ExtractionTimeout.
+    """
+    try:
+        proc = subprocess.Popen(
+            ['pdftotext', '-layout', *options, '-', '-'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+    except Exception as e:
+        raise ExtractionError(f"PDF extraction error: {str(e)}") from e
+
+    # stdin is fed from a helper thread so a full stdout pipe can't deadlock us
+    errors: List[str] = []
+    feeder = threading.Thread(target=_feed, args=(proc, pdf, errors), daemon=True)
+    feeder.start()
+
+    # Killing the child ends the stdout read below, which then sees the flag
+    timed_out = threading.Event()
+
+    def kill_slow_child():
+        timed_out.set()
+        proc.kill()
+    watchdog = threading.Timer(timeout, kill_slow_child) if timeout else None
+    if watchdog:
+        watchdog.daemon = True
+        watchdog.start()
+
+    chunks = []
+    scanner = ResultDateScanner()
+    stopped = False
+    stdout = io.TextIOWrapper(proc.stdout)  # Same decoding as subprocess text mode
+    try:
+        while True:
+            chunk = stdout.read(READ_CHUNK)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if stop_early and scanner.feed(chunk):
+                stopped = True
+                proc.kill()
+                break
+    except Exception as e:
+        proc.kill()
+        raise ExtractionError(f"PDF extraction error: {str(e)}") from e
+    finally:
+        if watchdog:
+            watchdog.cancel()
+        stdout.close()
+        returncode = proc.wait()
+        feeder.join()
+
+    if timed_out.is_set():
+        raise ExtractionTimeout(f"pdftotext killed after {timeout}s")
+
+    text = ''.join(chunks)
+    if stopped:
+        return cut_after_result_date(text)
+    if returncode != 0:
+        raise ExtractionError(f"pdftotext failed: {''.join(errors)}")
+    return text
+
+
+def extract_table_text(pdf: PdfInput, region: Sequence[str] = (), timeout: Optional[float] = None) -> str:
+    """pdftotext over the `region` options first, the whole PDF if that text misses the subject table"""
+    if region:
+        text = pdftotext(pdf, options=region, timeout=timeout)
+        if has_complete_table(text):
+            return text
+    return pdftotext(pdf, timeout=timeout)
@@ -0,0 +1,29 @@
+import itertools
+from typing import Any, Dict
+
+from marksheet.parser import MARKSHEET_PARSERS
+from marksheet.sgpa import extract_sgpa_info
+from marksheet.table import iter_table_lines
+
+
+class ParseError(Exception):
+    """pdftotext output that does not hold a usable subject table"""
+
+
+def parse_text(raw_text: str, parser: str = 'regex') -> Dict[str, Any]:
+    """Parse pdftotext output into {'basic_info': SGPA rows, 'subject_table': subject records}.
+
+    `parser` names an entry of MARKSHEET_PARSERS. Raises ParseError when
+    there is no subject table or no subject record could be parsed.
+    """
+    table_lines = iter_table_lines(raw_text)
+    header = next(table_lines, None)
+    if header is None:
+        raise ParseError('No subject table found')
+    subject_records = MARKSHEET_PARSERS[parser](itertools.chain((header,), table_lines))
+    if not subject_records:
+        raise ParseError('No subject records parsed')
+    return {
+        "basic_info": extract_sgpa_info(raw_text),
+        "subject_table": subject_records
+    }
@@ -0,0 +1,19 @@
+import re
+from typing import Any, Dict, List
+
+SGPA_PATTERN = re.compile(
+    r'(?P<semester>\b(?:First|Second|Third|Fourth|Fifth|Sixth|Seventh|Eighth)\s+Semester)\s+SGPA\s*:\s*(?P<sgpa>[^\s]+)\s+Credits Earned/Total\s*:\s*(?P<earned>\d+)/(?P<total>\d+)\s+Total Credit Points\s*:\s*(?P<points>\d+)',
+    re.IGNORECASE
+)
+SGPA_VALUE_PATTERN = re.compile(r'^\d+\.\d+$')
+
+
+def extract_sgpa_info(text: str) -> List[Dict[str, Any]]:
+    """Extract SGPA information from raw text ('--' for a withheld or garbled SGPA)"""
+    return [{
+        "semester": match.group("semester").title(),
+        "sgpa": match.group("sgpa") if SGPA_VALUE_PATTERN.match(match.group("sgpa")) else "--",
+        "earned_credits": match.group("earned"),
+        "total_credits": match.group("total"),
+        "total_credit_points": match.group("points")
+    } for match in SGPA_PATTERN.finditer(text)]
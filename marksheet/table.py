@@ -0,0 +1,155 @@
+import itertools
+import re
+from typing import Iterable, Iterator
+
+TABLE_HEADER_PATTERN = re.compile(r'Sem\s+SubCode\s+Subject Name')
+RESULT_DATE_PATTERN = re.compile(r'RESULT DATE', re.IGNORECASE)
+TABLE_END_PATTERN = re.compile(r'SGPA|RESULT DATE', re.IGNORECASE)
+SUBJECT_NAME_HEADER_PATTERN = re.compile(r'Subject\s+name')
+SEM_WIDTH = 4
+
+
+###############################
+# LOCATING THE TABLE
+###############################
+
+class ResultDateScanner:
+    """Spots the RESULT DATE line after the subject table header in text read piece by piece"""
+
+    def __init__(self):
+        self.window = ''  # Unscanned tail, so markers split across reads are still found
+        self.header_seen = False
+
+    def feed(self, chunk: str) -> bool:
+        """Scan the next piece of text; True once the table and RESULT DATE have both been seen"""
+        self.window += chunk
+        if not self.header_seen:
+            match = TABLE_HEADER_PATTERN.search(self.window)
+            if match:
+                self.header_seen = True
+                self.window = self.window[match.end():]
+        if self.header_seen and RESULT_DATE_PATTERN.search(self.window):
+            return True
+        self.window = self.window[-256:]
+        return False
+
+
+def cut_after_result_date(text: str) -> str:
+    """Keep everything up to the end of the RESULT DATE line (text must contain it)"""
+    header = TABLE_HEADER_PATTERN.search(text)
+    marker = RESULT_DATE_PATTERN.search(text, header.end())
+    line_end = text.find('\n', marker.end())
+    return text[:line_end + 1] if line_end != -1 else text
+
+
+def has_complete_table(text: str) -> bool:
+    """True if text holds the subject table header and a RESULT DATE line after it"""
+    header = TABLE_HEADER_PATTERN.search(text)
+    return header is not None and RESULT_DATE_PATTERN.search(text, header.end()) is not None
+
+
+###############################
+# NORMALIZING THE TABLE
+###############################
+
+def iter_text_lines(text: str) -> Iterator[str]:
+    """Yield the lines of text one at a time (same lines as text.split('\\n'))"""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def subject_table_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Yield the subject table header and its non-blank rows (nothing if there is no header)"""
+    lines = iter(lines)
+    for line in lines:
+        if TABLE_HEADER_PATTERN.search(line):
+            yield line.strip()
+            break
+    else:
+        return
+
+    # Table rows run until the SGPA block / result date
+    for line in lines:
+        if TABLE_END_PATTERN.search(line):
+            break
+        if line.strip():
+            yield line.rstrip()
+
+
+def fixed_header_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Yield table lines with missing header columns added"""
+    lines = iter(lines)
+    header = next(lines, None)
+    if header is None:
+        return
+    first_row = next(lines, None)
+    if first_row is None:
+        # Header only, nothing to standardize against
+        yield header
+        return
+
+    # Add missing columns if needed
+    if 'Ern' not in header and 'Crd' in header:
+        crd_pos = header.find('Crd')
+        header = header[:crd_pos+3] + " Ern" + header[crd_pos+3:]
+
+    if 'Pnt' not in header and 'Crd' in header:
+        last_crd_pos = header.rfind('Crd')
+        header = header[:last_crd_pos+3] + "Pnt" + header[last_crd_pos+3:]
+
+    # Standardize subject name column
+    header = SUBJECT_NAME_HEADER_PATTERN.sub('SubjectName', header)
+
+    yield header
+    yield first_row
+    yield from lines
+
+
+def without_sem_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Yield table lines with the semester column cut out"""
+    lines = iter(lines)
+    header = next(lines, None)
+    if header is None:
+        return
+    sem_index = header.find("Sem")
+    if sem_index == -1:
+        yield header
+        yield from lines
+        return
+
+    cut = sem_index + SEM_WIDTH
+    for line in itertools.chain((header,), lines):
+        if len(line) > cut:
+            yield line[:sem_index] + line[cut:]
+        else:
+            yield line[:sem_index]
+
+
+def iter_table_lines(raw_text: str) -> Iterator[str]:
+    """Single pass over the raw text yielding normalized subject table lines.
+
+    Fuses extract_subject_table, fix_table_headers and remove_sem_column so
+    parse_marksheet can consume the table without intermediate copies.
+    """
+    return without_sem_lines(fixed_header_lines(subject_table_lines(iter_text_lines(raw_text))))
+
+
+def extract_subject_table(raw_text: str) -> str:
+    """Extract the subject table from raw text"""
+    return '\n'.join(subject_table_lines(iter_text_lines(raw_text)))
+
+
+def fix_table_headers(table_text: str) -> str:
+    """Standardize table headers"""
+    return '\n'.join(fixed_header_lines(iter_text_lines(table_text)))
+
+
+def remove_sem_column(table_text: str) -> str:
+    """Remove the semester column from the table"""
+    return '\n'.join(without_sem_lines(iter_text_lines(table_text)))
@@ -0,0 +1,326 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshot folding is not locked against other processes
+    fcntl = None
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PDF_BYTES_BUCKETS = (10e3, 50e3, 100e3, 250e3, 500e3, 1e6, 2e6, 5e6)
+TEXT_CHARS_BUCKETS = (1e3, 2.5e3, 5e3, 10e3, 25e3, 50e3, 100e3, 250e3)
+RECORD_COUNT_BUCKETS = (1, 5, 10, 15, 20, 30, 50, 100)
+
+# Counters and histograms of every exited worker, summed (see prune_dead_workers)
+RETIRED_SNAPSHOT = 'metrics_retired.json'
+
+
+class Metrics:
+    """Process-local counters, gauges and histograms with Prometheus text output.
+
+    Each gunicorn worker keeps its own values and periodically writes a
+    snapshot to a shared directory; /metrics merges the snapshots of every
+    worker so the scrape sees the whole host. Counters and histograms from
+    workers that have exited are kept (folded into one retired snapshot),
+    their gauges are dropped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+        self._values: Dict[str, Dict[str, Any]] = {}
+        self._callbacks: Dict[str, Callable[[], float]] = {}
+        self._last_flush = 0.0
+        self._flushed_pid: Optional[int] = None
+
+    ###############################
+    # DEFINITIONS
+    ###############################
+
+    def _define(self, name: str, kind: str, help_text: str, buckets: Tuple[float, ...] = ()) -> None:
+        self._definitions[name] = {'type': kind, 'help': help_text, 'buckets': list(buckets)}
+        self._values.setdefault(name, {})
+
+    def counter(self, name: str, help_text: str, callback: Optional[Callable[[], float]] = None) -> None:
+        """Define a counter; a callback is read every time a snapshot is taken"""
+        self._define(name, 'counter', help_text)
+        if callback is not None:
+            self._callbacks[name] = callback
+
+    def gauge(self, name: str, help_text: str, callback: Optional[Callable[[], float]] = None) -> None:
+        """Define a gauge; a callback is read every time a snapshot is taken"""
+        self._define(name, 'gauge', help_text)
+        if callback is not None:
+            self._callbacks[name] = callback
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = DURATION_BUCKETS) -> None:
+        self._define(name, 'histogram', help_text, buckets)
+
+    ###############################
+    # RECORDING
+    ###############################
+
+    @staticmethod
+    def _label_key(labels: Dict[str, Any]) -> str:
+        return json.dumps(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        key = self._label_key(labels)
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[name][self._label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        buckets = self._definitions[name]['buckets']
+        key = self._label_key(labels)
+        with self._lock:
+            series = self._values[name]
+            state = series.get(key)
+            if state is None:
+                # Per-bucket counts (non-cumulative), then sum and count
+                state = series[key] = {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    state['buckets'][index] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time a pipeline stage; failures are counted with their reason"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.inc('sppu_stage_failures_total', stage=stage, reason=failure_reason(e))
+            raise
+        finally:
+            self.observe('sppu_stage_duration_seconds', time.perf_counter() - start, stage=stage)
+
+    ###############################
+    # MULTI-WORKER AGGREGATION
+    ###############################
+
+    def snapshot(self) -> Dict[str, Any]:
+        for name, callback in self._callbacks.items():
+            try:
+                self.set(name, callback())
+            except Exception:
+                pass
+        with self._lock:
+            return {'pid': os.getpid(), 'started': _process_start(os.getpid()),
+                    'values': json.loads(json.dumps(self._values))}
+
+    def flush(self, directory: str, min_interval: float = 1.0) -> None:
+        """Write this worker's snapshot (at most once per min_interval seconds)"""
+        now = time.monotonic()
+        if now - self._last_flush < min_interval:
+            return
+        self._last_flush = now
+        os.makedirs(directory, exist_ok=True)
+        if self._flushed_pid != os.getpid():
+            # A file under our pid may be a dead worker's whose pid was reused:
+            # retire it before it is overwritten (also retires any other dead worker)
+            prune_dead_workers(directory)
+            self._flushed_pid = os.getpid()
+        _write_snapshot(os.path.join(directory, f"metrics_{os.getpid()}.json"), self.snapshot())
+
+    def collect(self, directory: str) -> Dict[str, Dict[str, Any]]:
+        """Merge snapshots from every worker (live values for this process)"""
+        snapshots = [self.snapshot()]
+        if os.path.isdir(directory):
+            # Shared lock: never see a dead worker's file and the retired snapshot it was folded into
+            with _directory_lock(directory, exclusive=False):
+                for name in os.listdir(directory):
+                    if not _is_snapshot_file(name):
+                        continue
+                    data = _read_snapshot(os.path.join(directory, name))
+                    if data is not None and not _is_this_process(data):
+                        snapshots.append(data)
+
+        merged: Dict[str, Dict[str, Any]] = {name: {} for name in self._definitions}
+        for data in snapshots:
+            alive = _is_this_process(data) or _snapshot_alive(data)
+            _fold(merged, {name: series for name, series in data['values'].items()
+                           if name in self._definitions
+                           and (alive or self._definitions[name]['type'] != 'gauge')})
+        return merged
+
+    def render(self, merged: Dict[str, Dict[str, Any]]) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        for name, definition in self._definitions.items():
+            lines.append(f"# HELP {name} {definition['help']}")
+            lines.append(f"# TYPE {name} {definition['type']}")
+            for key, value in sorted(merged.get(name, {}).items()):
+                labels = json.loads(key)
+                if definition['type'] != 'histogram':
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(definition['buckets'], value['buckets']):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels + [['le', _format_value(bound)]])} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels + [['le', '+Inf']])} {value['count']}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return '\n'.join(lines) + '\n'
+
+
+def format_sample(name: str, kind: str, help_text: str, value: float) -> str:
+    """Render one unlabeled sample that is not aggregated across workers"""
+    return f"# HELP {name} {help_text}\n# TYPE {name} {kind}\n{name} {_format_value(value)}\n"
+
+
+def failure_reason(error: Exception) -> str:
+    """Short, low-cardinality label for why a stage failed"""
+    if type(error).__name__ == 'ProcessingError' and error.args:
+        return str(error.args[0])
+    return type(error).__name__
+
+
+def prune_dead_workers(directory: str) -> None:
+    """Fold snapshots of processes that no longer exist into the retired snapshot, then drop them.
+
+    Summed counters and histograms therefore never go backwards when a
+    worker exits. A snapshot whose pid now belongs to a newer process
+    (different start time) counts as dead.
+    """
+    if not os.path.isdir(directory):
+        return
+    with _directory_lock(directory, exclusive=True):
+        retired_path = os.path.join(directory, RETIRED_SNAPSHOT)
+        retired = _read_snapshot(retired_path) or {'pid': None, 'values': {}}
+        dead = []
+        for name in os.listdir(directory):
+            if not _is_snapshot_file(name) or name == RETIRED_SNAPSHOT:
+                continue
+            path = os.path.join(directory, name)
+            data = _read_snapshot(path)
+            if data is None or _snapshot_alive(data):
+                continue
+            _fold(retired['values'], data['values'])
+            dead.append(path)
+        if not dead:
+            return
+        _write_snapshot(retired_path, retired)
+        for path in dead:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _process_start(pid: int) -> Optional[int]:
+    """When a process started, in clock ticks since boot (None without /proc)"""
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # starttime is field 22; count from after the command name, which may hold spaces
+    return int(stat.rsplit(b')', 1)[1].split()[19])
+
+
+def _snapshot_alive(data: Dict[str, Any]) -> bool:
+    """True if the process that wrote a snapshot is still running (the retired one never is)"""
+    pid = data.get('pid')
+    if pid is None or not _pid_alive(pid):
+        return False
+    started = data.get('started')
+    return started is None or started == _process_start(pid)
+
+
+def _is_this_process(data: Dict[str, Any]) -> bool:
+    return data.get('pid') == os.getpid() and data.get('started') == _process_start(os.getpid())
+
+
+def _is_snapshot_file(name: str) -> bool:
+    return name.startswith('metrics_') and name.endswith('.json')
+
+
+def _read_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_snapshot(path: str, data: Dict[str, Any]) -> None:
+    # Written aside and renamed so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.metrics_')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _fold(target: Dict[str, Dict[str, Any]], values: Dict[str, Dict[str, Any]]) -> None:
+    """Add one snapshot's series into target (histograms bucket by bucket)"""
+    for name, series in values.items():
+        merged = target.setdefault(name, {})
+        for key, value in series.items():
+            if isinstance(value, dict):
+                state = merged.setdefault(key, {'buckets': [0] * len(value['buckets']), 'sum': 0.0, 'count': 0})
+                state['buckets'] = [a + b for a, b in zip(state['buckets'], value['buckets'])]
+                state['sum'] += value['sum']
+                state['count'] += value['count']
+            else:
+                merged[key] = merged.get(key, 0) + value
+
+
+@contextmanager
+def _directory_lock(directory: str, exclusive: bool) -> Iterator[None]:
+    """Serialize folding (exclusive) against reading (shared) across processes"""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, '.metrics.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return repr(float(value))
+    return repr(value)
+
+
+metrics = Metrics()
+metrics.histogram('sppu_stage_duration_seconds', 'Time spent in each processing stage')
+metrics.counter('sppu_stage_failures_total', 'Processing stage failures by reason')
+metrics.histogram('sppu_pdf_bytes', 'Size of uploaded PDFs in bytes', PDF_BYTES_BUCKETS)
+metrics.histogram('sppu_raw_text_chars', 'Characters of text extracted by pdftotext', TEXT_CHARS_BUCKETS)
+metrics.histogram('sppu_subject_records', 'Subject records parsed per marksheet', RECORD_COUNT_BUCKETS)
+metrics.counter('sppu_uploads_total', 'Marksheet uploads by outcome')
+metrics.histogram('sppu_http_request_duration_seconds', 'HTTP request latency by endpoint')
@@ -0,0 +1,139 @@
+"""Where the subject table sits on an SPPU marksheet, as pdftotext options.
+
+Usage:
+    python -m pdf_region SAMPLE.pdf [SAMPLE.pdf ...] [--margin 18]
+
+Runs `pdftotext -bbox` over sample marksheets, finds the 'Sem SubCode'
+header and the RESULT DATE line on each and prints the page range and
+crop box that cover all of them, as PDFTOTEXT_PAGES / PDFTOTEXT_CROP
+settings for the app. Crop boxes are in points from the top-left corner
+of the page (pdftotext's default 72 dpi).
+"""
+import argparse
+import math
+import re
+import subprocess
+import sys
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+PAGE_PATTERN = re.compile(r'<page width="([\d.]+)" height="([\d.]+)">(.*?)</page>', re.DOTALL)
+WORD_PATTERN = re.compile(r'<word xMin="([\d.]+)" yMin="([\d.]+)" xMax="([\d.]+)" yMax="([\d.]+)">([^<]*)</word>')
+
+
+class TableRegion(NamedTuple):
+    """Pages holding the subject table and, when it fits on one page, its box"""
+    first_page: int
+    last_page: int
+    box: Optional[Tuple[float, float, float, float]]  # x0, y0, x1, y1
+    page_size: Tuple[float, float]
+
+
+def parse_pages(spec: str) -> Optional[Tuple[int, int]]:
+    """'1-2' -> (1, 2), '3' -> (3, 3), '' -> None (every page)"""
+    spec = spec.strip()
+    if not spec:
+        return None
+    first, _, last = spec.partition('-')
+    first_page, last_page = int(first), int(last or first)
+    if first_page < 1 or last_page < first_page:
+        raise ValueError(f"Invalid page range: {spec!r}")
+    return first_page, last_page
+
+
+def parse_crop(spec: str) -> Optional[Tuple[int, int, int, int]]:
+    """'x,y,W,H' -> (x, y, W, H), '' -> None (whole page)"""
+    spec = spec.strip()
+    if not spec:
+        return None
+    values = tuple(int(v) for v in spec.split(','))
+    if len(values) != 4 or min(values) < 0 or 0 in values[2:]:
+        raise ValueError(f"Invalid crop box: {spec!r}")
+    return values
+
+
+def region_args(pages: str, crop: str) -> List[str]:
+    """pdftotext options (-f/-l, -x/-y/-W/-H) for PDFTOTEXT_PAGES / PDFTOTEXT_CROP settings"""
+    args: List[str] = []
+    page_range = parse_pages(pages)
+    if page_range:
+        args += ['-f', str(page_range[0]), '-l', str(page_range[1])]
+    box = parse_crop(crop)
+    if box:
+        args += ['-x', str(box[0]), '-y', str(box[1]), '-W', str(box[2]), '-H', str(box[3])]
+    return args
+
+
+###############################
+# LEARNING THE LAYOUT
+###############################
+
+def _words(page_body: str) -> List[Tuple[float, float, float, float, str]]:
+    return [(float(x0), float(y0), float(x1), float(y1), text)
+            for x0, y0, x1, y1, text in WORD_PATTERN.findall(page_body)]
+
+
+def find_table_region(bbox_html: str) -> Optional[TableRegion]:
+    """Locate the table in `pdftotext -bbox` output; None if the header or RESULT DATE is missing"""
+    pages = [(float(w), float(h), _words(body)) for w, h, body in PAGE_PATTERN.findall(bbox_html)]
+    start = end = None
+    for number, (_, _, words) in enumerate(pages, start=1):
+        for word, following in zip(words, words[1:]):
+            if start is None and word[4] == 'Sem' and following[4] == 'SubCode':
+                start = (number, word[1])
+            elif start is not None and word[4].upper() == 'RESULT' and following[4].upper().startswith('DATE'):
+                end = (number, following[3])
+                break
+        if end:
+            break
+    if start is None or end is None:
+        return None
+
+    width, height, words = pages[start[0] - 1]
+    if start[0] != end[0]:
+        # Table runs across pages: limit the page range, keep whole pages
+        return TableRegion(start[0], end[0], None, (width, height))
+    inside = [w for w in words if w[1] >= start[1] and w[3] <= end[1]]
+    box = (min(w[0] for w in inside), start[1], max(w[2] for w in inside), end[1])
+    return TableRegion(start[0], end[0], box, (width, height))
+
+
+def learn_region(regions: Sequence[TableRegion], margin: float = 18) -> Tuple[str, str]:
+    """PDFTOTEXT_PAGES and PDFTOTEXT_CROP values covering every sample region"""
+    pages = f"{min(r.first_page for r in regions)}-{max(r.last_page for r in regions)}"
+    if any(r.box is None for r in regions):
+        return pages, ''
+    width = min(r.page_size[0] for r in regions)
+    height = min(r.page_size[1] for r in regions)
+    x0 = max(0, math.floor(min(r.box[0] for r in regions) - margin))
+    y0 = max(0, math.floor(min(r.box[1] for r in regions) - margin))
+    x1 = min(width, math.ceil(max(r.box[2] for r in regions) + margin))
+    y1 = min(height, math.ceil(max(r.box[3] for r in regions) + margin))
+    return pages, f"{x0},{y0},{math.ceil(x1 - x0)},{math.ceil(y1 - y0)}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pdfs', nargs='+', help='Sample marksheet PDFs')
+    parser.add_argument('--margin', type=float, default=18, help='Points added around the learned box')
+    args = parser.parse_args(argv)
+
+    regions = []
+    for path in args.pdfs:
+        proc = subprocess.run(['pdftotext', '-bbox', path, '-'], capture_output=True, text=True)
+        region = find_table_region(proc.stdout) if proc.returncode == 0 else None
+        if region is None:
+            print(f"{path}: subject table not found, skipped", file=sys.stderr)
+            continue
+        regions.append(region)
+    if not regions:
+        print('No usable samples', file=sys.stderr)
+        return 1
+
+    pages, crop = learn_region(regions, args.margin)
+    print(f"PDFTOTEXT_PAGES={pages}")
+    print(f"PDFTOTEXT_CROP={crop}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
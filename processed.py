@@ -1,13 +1,22 @@
 from flask import Blueprint, render_template, session, redirect, url_for, flash
+import copy
 import json
 import re
 from io import BytesIO
 from flask import send_file
-import pandas as pd 
 from datetime import datetime
+from result_store import get_result_store
+from metrics import metrics
+from exports import XLSX_MIMETYPE, write_records_sheet
 
 processed_bp = Blueprint('processed', __name__, template_folder='templates')
 
+LEADING_CODE_PATTERN = re.compile(r'^\d+\s*')
+NON_NUMERIC_PATTERN = re.compile(r'[^\d.]')
+
+# Below this many results the NumPy batch path is not worth importing NumPy for
+BATCH_PREPARE_MIN = 32
+
 
 def process_subject_name(subject_name):
     """Processes subject names by removing leading numeric codes"""
@@ -15,7 +24,7 @@ def process_subject_name(subject_name):
         return subject_name
     
     # Use regex to remove leading numbers and any following whitespace
-    processed_name = re.sub(r'^\d+\s*', '', subject_name)
+    processed_name = LEADING_CODE_PATTERN.sub('', subject_name)
     return processed_name.strip()
 
 ###############################
@@ -31,7 +40,7 @@ def calculate_student_credit_points(subjects):
             # Extract numeric value by removing any special characters
             credit_point_str = subject.get('CreditPoint')
             # Remove any non-digit characters except decimal point
-            credit_point_numeric = re.sub(r'[^\d.]', '', credit_point_str)
+            credit_point_numeric = NON_NUMERIC_PATTERN.sub('', credit_point_str)
             
             if credit_point_numeric:
                 total_credit_points += int(float(credit_point_numeric))
@@ -317,31 +326,123 @@ def prepare_result_data(processed_data):
     
     return processed_data
 
+def prepare_results(results):
+    """prepare_result_data for a list of results, leaving the inputs unmodified.
+
+    Large lists go through cohort.prepare_result_data_batch; small ones
+    (single uploads) are prepared one by one without importing NumPy.
+    """
+    if len(results) < BATCH_PREPARE_MIN:
+        return [prepare_result_data(copy.deepcopy(result)) for result in results]
+    from cohort import prepare_result_data_batch
+    return prepare_result_data_batch(results)
+
+###############################
+# EXPORT BUILDERS
+###############################
+
+def build_excel_workbook(processed_data):
+    """Builds the XLSX export of prepared result data and returns its bytes.
+
+    Rows are streamed through openpyxl's write-only mode; the sheets match
+    the previous pandas export (Semester N, Basic Info, Summary).
+    """
+    # openpyxl is only needed for downloads, so it is not imported at startup
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+
+    # Write semester subjects
+    if 'subject_table' in processed_data:
+        subject_table = processed_data['subject_table']
+        semesters = detect_and_split_semester(subject_table)
+        
+        for idx, semester_subjects in enumerate(semesters, start=1):
+            if semester_subjects:  # Only create sheet if data is present
+                write_records_sheet(workbook, f"Semester {idx}", semester_subjects)
+
+    # Write second semester subjects if separately available (fallback)
+    if 'second_semester_subjects' in processed_data and not any(
+        s.get('second_semester_subjects') for s in processed_data.get('subject_table', [])
+    ):
+        write_records_sheet(workbook, 'Semester 2', processed_data['second_semester_subjects'])
+    
+    # Write basic info if exists
+    if 'basic_info' in processed_data:
+        write_records_sheet(workbook, 'Basic Info', processed_data['basic_info'])
+
+    # Write final summary if CGPA exists
+    summary_data = {}
+    if 'cgpa' in processed_data:
+        summary_data['CGPA'] = processed_data['cgpa']
+    if 'percentage' in processed_data:
+        summary_data['Percentage'] = processed_data['percentage']
+    if 'grade' in processed_data:
+        summary_data['Grade'] = processed_data['grade']
+    if 'class_awarded' in processed_data:
+        summary_data['Class Awarded'] = processed_data['class_awarded']
+    
+    if summary_data:
+        write_records_sheet(workbook, 'Summary', [summary_data])
+
+    mem_file = BytesIO()
+    workbook.save(mem_file)
+    return mem_file.getvalue()
+
 ###############################
 # FLASK ROUTE HANDLERS
 ###############################
 
+def load_artifact(name, build):
+    """Returns a derived artifact of the session's result, building it on first use"""
+    result_id = session.get('result_id')
+    if not result_id:
+        return None
+    
+    store = get_result_store()
+    data = store.get_artifact(result_id, name)
+    if data is None:
+        json_data = store.get(result_id)
+        if not json_data:
+            return None
+        data = build(json_data)
+        store.put_artifact(result_id, name, data)
+    return data
+
+def build_prepared_artifact(json_data):
+    """Runs prepare_result_data once and serializes the view model"""
+    with metrics.span('prepare'):
+        prepared = prepare_result_data(json.loads(json_data))
+    return json.dumps(prepared, separators=(',', ':')).encode('utf-8')
+
+def build_excel_export(prepared):
+    """Builds the workbook inside a timing span"""
+    with metrics.span('excel_export'):
+        return build_excel_workbook(prepared)
+
+def load_prepared_result():
+    """Returns the prepared view model for the session's result (memoized per upload)"""
+    prepared = load_artifact('prepared', build_prepared_artifact)
+    if prepared is None:
+        return None
+    return json.loads(prepared)
+
 @processed_bp.route('/download_json')
 def download_json():
     """Downloads the result data as JSON file"""
-    # Get JSON data directly from session
-    json_data = session.get('result_json')
+    # JSON bytes are cached next to the stored result
+    json_bytes = load_artifact('json', lambda json_data: json_data.encode('utf-8'))
     
-    if not json_data:
+    if not json_bytes:
         flash('No data available to download')
         return redirect(url_for('upload_file'))
     
     # Generate filename with timestamp
     filename = f"result_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
     
-    # Create BytesIO buffer and write JSON data
-    mem_file = BytesIO()
-    mem_file.write(json_data.encode('utf-8'))
-    mem_file.seek(0)  # Rewind to start of file
-    
     # Send as downloadable file
     return send_file(
-        mem_file,
+        BytesIO(json_bytes),
         mimetype='application/json',
         as_attachment=True,
         download_name=filename
@@ -350,65 +451,24 @@ def download_json():
 @processed_bp.route('/download_excel')
 def download_excel():
     """Downloads the result data as Excel (XLSX) file"""
-    json_data = session.get('result_json')
-    
-    if not json_data:
-        flash('No data available to download')
-        return redirect(url_for('upload_file'))
-    
     try:
-        processed_data = json.loads(json_data)
+        # Workbook is generated from the prepared view model once, then reused
+        xlsx_bytes = load_artifact(
+            'xlsx',
+            lambda json_data: build_excel_export(load_prepared_result())
+        )
     except Exception as e:
         flash('Error processing result data. Please try again.')
         return redirect(url_for('upload_file'))
-
-    mem_file = BytesIO()
-
-    with pd.ExcelWriter(mem_file, engine='openpyxl') as writer:
-        # Write semester subjects
-        if 'subject_table' in processed_data:
-            subject_table = processed_data['subject_table']
-            semesters = detect_and_split_semester(subject_table)
-            
-            for idx, semester_subjects in enumerate(semesters, start=1):
-                if semester_subjects:  # Only create sheet if data is present
-                    sheet_name = f"Semester {idx}"
-                    df_sem = pd.DataFrame(semester_subjects)
-                    df_sem.to_excel(writer, sheet_name=sheet_name, index=False)
-
-        # Write second semester subjects if separately available (fallback)
-        if 'second_semester_subjects' in processed_data and not any(
-            s.get('second_semester_subjects') for s in processed_data.get('subject_table', [])
-        ):
-            df_second_sem = pd.DataFrame(processed_data['second_semester_subjects'])
-            df_second_sem.to_excel(writer, sheet_name='Semester 2', index=False)
-        
-        # Write basic info if exists
-        if 'basic_info' in processed_data:
-            df_basic_info = pd.DataFrame(processed_data['basic_info'])
-            df_basic_info.to_excel(writer, sheet_name='Basic Info', index=False)
-
-        # Write final summary if CGPA exists
-        summary_data = {}
-        if 'cgpa' in processed_data:
-            summary_data['CGPA'] = processed_data['cgpa']
-        if 'percentage' in processed_data:
-            summary_data['Percentage'] = processed_data['percentage']
-        if 'grade' in processed_data:
-            summary_data['Grade'] = processed_data['grade']
-        if 'class_awarded' in processed_data:
-            summary_data['Class Awarded'] = processed_data['class_awarded']
-        
-        if summary_data:
-            df_summary = pd.DataFrame([summary_data])
-            df_summary.to_excel(writer, sheet_name='Summary', index=False)
-
-    mem_file.seek(0)
+    
+    if not xlsx_bytes:
+        flash('No data available to download')
+        return redirect(url_for('upload_file'))
 
     filename = f"result_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     return send_file(
-        mem_file,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        BytesIO(xlsx_bytes),
+        mimetype=XLSX_MIMETYPE,
         as_attachment=True,
         download_name=filename
     )
@@ -417,28 +477,25 @@ def download_excel():
 @processed_bp.route('/results')
 def show_results():
     """Displays processed student results"""
-    # Get JSON data directly from session
-    json_data = session.get('result_json')
-    
-    if not json_data:
-        flash('No data found. Please upload a PDF file first.')
-        return redirect(url_for('upload_file'))
-    
     try:
-        # Parse the JSON data
-        processed_data = json.loads(json_data)
+        # Prepared once per upload and memoized alongside the stored result
+        processed_data = load_prepared_result()
     except Exception as e:
         flash('Error processing result data. Please try again.')
         return redirect(url_for('upload_file'))
     
-    # Prepare all result data
-    processed_data = prepare_result_data(processed_data)
+    if processed_data is None:
+        flash('No data found. Please upload a PDF file first.')
+        return redirect(url_for('upload_file'))
     
     # Don't clear the session yet - we need it for potential download
-    return render_template('result.html', data=processed_data)
+    with metrics.span('render'):
+        return render_template('result.html', data=processed_data)
 
 @processed_bp.route('/clear_session')
 def clear_session():
     """Clears session data after download"""
-    session.pop('result_json', None)
-    return redirect(url_for('upload_file'))
\ No newline at end of file
+    result_id = session.pop('result_id', None)
+    if result_id:
+        get_result_store().delete(result_id)
+    return redirect(url_for('upload_file'))
@@ -0,0 +1,191 @@
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from flask import current_app
+
+
+def new_result_id() -> str:
+    """Generate an opaque, unguessable result id for the session"""
+    return secrets.token_urlsafe(18)
+
+
+class MemoryResultStore:
+    """In-process LRU result store (single worker deployments)"""
+
+    def __init__(self, max_entries: int = 1000, ttl: int = 2 * 60 * 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # result_id -> (expires_at, payload, artifacts)
+        self._lock = threading.Lock()
+
+    def put(self, payload: str) -> str:
+        """Store a serialized result and return its id"""
+        result_id = new_result_id()
+        with self._lock:
+            self._entries[result_id] = (time.time() + self.ttl, payload, {})
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result_id
+
+    def _live_entry(self, result_id: str):
+        entry = self._entries.get(result_id)
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            del self._entries[result_id]
+            return None
+        self._entries.move_to_end(result_id)
+        return entry
+
+    def get(self, result_id: str) -> Optional[str]:
+        """Return the serialized result, or None if missing or expired"""
+        with self._lock:
+            entry = self._live_entry(result_id)
+            return entry[1] if entry else None
+
+    def get_artifact(self, result_id: str, name: str) -> Optional[bytes]:
+        """Return a derived artifact (prepared view, export file) for a result"""
+        with self._lock:
+            entry = self._live_entry(result_id)
+            return entry[2].get(name) if entry else None
+
+    def put_artifact(self, result_id: str, name: str, data: bytes) -> None:
+        """Attach a derived artifact; it expires together with its result"""
+        with self._lock:
+            entry = self._live_entry(result_id)
+            if entry:
+                entry[2][name] = data
+
+    def delete(self, result_id: str) -> None:
+        with self._lock:
+            self._entries.pop(result_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResultStore:
+    """SQLite-backed result store shared by every worker on the host"""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS results (
+        id TEXT PRIMARY KEY,
+        payload TEXT NOT NULL,
+        expires REAL NOT NULL,
+        accessed REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS results_expires ON results (expires);
+    CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+    CREATE TABLE IF NOT EXISTS artifacts (
+        result_id TEXT NOT NULL REFERENCES results (id) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (result_id, name)
+    );
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: int = 2 * 60 * 60):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connect().executescript(self._SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread and per process (workers fork after import)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')  # artifacts go with their result
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def put(self, payload: str) -> str:
+        """Store a serialized result and return its id"""
+        result_id = new_result_id()
+        conn = self._connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'INSERT INTO results (id, payload, expires, accessed) VALUES (?, ?, ?, ?)',
+                (result_id, payload, now + self.ttl, now)
+            )
+            self._evict(conn, now)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return result_id
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute('DELETE FROM results WHERE expires < ?', (now,))
+        count = conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                'DELETE FROM results WHERE id IN (SELECT id FROM results ORDER BY accessed LIMIT ?)',
+                (count - self.max_entries,)
+            )
+
+    def get(self, result_id: str) -> Optional[str]:
+        """Return the serialized result, or None if missing or expired"""
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            'SELECT payload FROM results WHERE id = ? AND expires >= ?', (result_id, now)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute('UPDATE results SET accessed = ? WHERE id = ?', (now, result_id))
+        return row[0]
+
+    def get_artifact(self, result_id: str, name: str) -> Optional[bytes]:
+        """Return a derived artifact (prepared view, export file) for a result"""
+        row = self._connect().execute(
+            'SELECT a.data FROM artifacts a JOIN results r ON r.id = a.result_id '
+            'WHERE a.result_id = ? AND a.name = ? AND r.expires >= ?',
+            (result_id, name, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_artifact(self, result_id: str, name: str, data: bytes) -> None:
+        """Attach a derived artifact; it expires together with its result"""
+        try:
+            self._connect().execute(
+                'INSERT OR REPLACE INTO artifacts (result_id, name, data) VALUES (?, ?, ?)',
+                (result_id, name, data)
+            )
+        except sqlite3.IntegrityError:
+            pass  # Result was evicted meanwhile, nothing to attach to
+
+    def delete(self, result_id: str) -> None:
+        self._connect().execute('DELETE FROM results WHERE id = ?', (result_id,))
+
+    def __len__(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+
+def create_result_store(kind: str, path: Optional[str] = None, max_entries: Optional[int] = None,
+                        ttl: int = 2 * 60 * 60):
+    """Build the result store selected by configuration ('memory' or 'sqlite')"""
+    if kind == 'memory':
+        return MemoryResultStore(max_entries=max_entries or 1000, ttl=ttl)
+    if kind == 'sqlite':
+        if not path:
+            raise ValueError("SQLite result store needs a path")
+        return SQLiteResultStore(path, max_entries=max_entries or 10000, ttl=ttl)
+    raise ValueError(f"Unknown result store: {kind}")
+
+
+def get_result_store():
+    """Return the result store registered on the current app"""
+    return current_app.extensions['result_store']
@@ -0,0 +1,329 @@
+import hmac
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from flask import Blueprint, current_app, jsonify, request
+
+from processed import prepare_results
+
+index_bp = Blueprint('index', __name__, url_prefix='/index')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS marksheets (
+    id INTEGER PRIMARY KEY,
+    digest TEXT UNIQUE,
+    filename TEXT,
+    semesters INTEGER NOT NULL,
+    cgpa REAL,
+    class_awarded TEXT,
+    backlogs INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS marksheets_cgpa ON marksheets (cgpa);
+CREATE INDEX IF NOT EXISTS marksheets_class ON marksheets (class_awarded);
+CREATE TABLE IF NOT EXISTS semesters (
+    marksheet_id INTEGER NOT NULL REFERENCES marksheets (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    semester TEXT NOT NULL,
+    sgpa REAL,
+    earned_credits INTEGER,
+    total_credits INTEGER,
+    total_credit_points INTEGER,
+    class_awarded TEXT NOT NULL,
+    PRIMARY KEY (marksheet_id, position)
+);
+CREATE INDEX IF NOT EXISTS semesters_sgpa ON semesters (sgpa);
+CREATE INDEX IF NOT EXISTS semesters_semester_sgpa ON semesters (semester, sgpa);
+CREATE INDEX IF NOT EXISTS semesters_class ON semesters (class_awarded);
+CREATE INDEX IF NOT EXISTS semesters_semester_class ON semesters (semester, class_awarded);
+CREATE TABLE IF NOT EXISTS subjects (
+    marksheet_id INTEGER NOT NULL REFERENCES marksheets (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    subcode TEXT,
+    subject_name TEXT,
+    credit INTEGER,
+    earned_credit INTEGER,
+    grade TEXT,
+    grade_point INTEGER,
+    credit_point TEXT
+);
+CREATE INDEX IF NOT EXISTS subjects_subcode_grade ON subjects (subcode, grade);
+CREATE INDEX IF NOT EXISTS subjects_grade ON subjects (grade);
+CREATE INDEX IF NOT EXISTS subjects_marksheet ON subjects (marksheet_id);
+"""
+
+# SQLite allows at most 999 bound parameters in older builds
+_IN_CHUNK = 500
+
+
+def _int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ResultsIndex:
+    """Persistent, queryable index of every parsed marksheet.
+
+    Results are stored once per PDF digest, with one row per semester and
+    per subject so cohort questions ("who failed 310241", "SGPA between 8
+    and 9") are answered from indexes instead of re-uploading PDFs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread and per process (workers fork after import)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    ###############################
+    # INSERTS
+    ###############################
+
+    def add(self, result: Dict[str, Any], digest: Optional[str] = None) -> int:
+        """Index one result (filename, basic_info, subject_table); returns rows added"""
+        return self.add_many([(digest, result)])
+
+    def add_many(self, items: Iterable[Tuple[Optional[str], Dict[str, Any]]]) -> int:
+        """Index many results in one transaction; already indexed digests are skipped"""
+        items = list(items)
+        if not items:
+            return 0
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            known = self._known_digests(conn, [d for d, _ in items if d])
+            fresh, seen = [], set()
+            for digest, result in items:
+                if digest and (digest in known or digest in seen):
+                    continue
+                seen.add(digest)
+                fresh.append((digest, result))
+            if not fresh:
+                conn.execute('COMMIT')
+                return 0
+
+            # Ids are assigned here so child rows can go through executemany too
+            next_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM marksheets').fetchone()[0] + 1
+            prepared = prepare_results([result for _, result in fresh])
+            now = time.time()
+            marksheet_rows, semester_rows, subject_rows = [], [], []
+            for offset, ((digest, result), data) in enumerate(zip(fresh, prepared)):
+                marksheet_id = next_id + offset
+                marksheet_rows.append((
+                    marksheet_id, digest, result.get('filename'), len(data.get('basic_info', [])),
+                    data.get('cgpa'), data.get('class_awarded'), data['backlogs']['total'],
+                    json.dumps(result, separators=(',', ':')), now
+                ))
+                for position, sem in enumerate(data.get('basic_info', []), start=1):
+                    semester_rows.append((
+                        marksheet_id, position, sem['semester'], sem['sgpa'], sem['earned_credits'],
+                        sem['total_credits'], sem['total_credit_points'], sem['class_awarded']
+                    ))
+                tables = [data.get('subject_table', []), data.get('second_semester_subjects', [])]
+                for position, subjects in enumerate(tables, start=1):
+                    for subject in subjects:
+                        subject_rows.append((
+                            marksheet_id, position, subject.get('SubCode'), subject.get('SubjectName'),
+                            _int(subject.get('Credit')), _int(subject.get('EarnedCredit')),
+                            subject.get('Grade'), _int(subject.get('GradePoint')), subject.get('CreditPoint')
+                        ))
+
+            conn.executemany('INSERT INTO marksheets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', marksheet_rows)
+            conn.executemany('INSERT INTO semesters VALUES (?, ?, ?, ?, ?, ?, ?, ?)', semester_rows)
+            conn.executemany('INSERT INTO subjects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', subject_rows)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return len(marksheet_rows)
+
+    @staticmethod
+    def _known_digests(conn: sqlite3.Connection, digests: List[str]) -> set:
+        known = set()
+        for start in range(0, len(digests), _IN_CHUNK):
+            chunk = digests[start:start + _IN_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            known.update(row[0] for row in conn.execute(
+                f'SELECT digest FROM marksheets WHERE digest IN ({placeholders})', chunk))
+        return known
+
+    def delete(self, marksheet_id: int) -> None:
+        self._connect().execute('DELETE FROM marksheets WHERE id = ?', (marksheet_id,))
+
+    ###############################
+    # QUERIES
+    ###############################
+
+    def get(self, marksheet_id: int) -> Optional[Dict[str, Any]]:
+        """Return the stored result JSON for one marksheet"""
+        row = self._connect().execute(
+            'SELECT payload FROM marksheets WHERE id = ?', (marksheet_id,)).fetchone()
+        return json.loads(row['payload']) if row else None
+
+    def iter_results(self, batch: int = 500) -> Iterator[Dict[str, Any]]:
+        """Yield every stored result in insertion order without loading them all"""
+        cursor = self._connect().execute('SELECT payload FROM marksheets ORDER BY id')
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                return
+            for row in rows:
+                yield json.loads(row['payload'])
+
+    def students_with_grade(self, subcode: str, grade: str = 'F',
+                            limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Marksheets with `grade` in subject `subcode`"""
+        rows = self._connect().execute(
+            'SELECT m.id, m.filename, s.position AS semester, s.subject_name, s.grade, s.credit_point '
+            'FROM subjects s JOIN marksheets m ON m.id = s.marksheet_id '
+            'WHERE s.subcode = ? AND s.grade = ? ORDER BY m.id LIMIT ? OFFSET ?',
+            (subcode, grade, limit, offset))
+        return [dict(row) for row in rows]
+
+    def sgpa_range(self, low: Optional[float] = None, high: Optional[float] = None,
+                   semester: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Semester results with low <= SGPA <= high (failed semesters have no SGPA)"""
+        clauses, params = ['s.sgpa IS NOT NULL'], []
+        if low is not None:
+            clauses.append('s.sgpa >= ?')
+            params.append(low)
+        if high is not None:
+            clauses.append('s.sgpa <= ?')
+            params.append(high)
+        if semester:
+            clauses.append('s.semester = ?')
+            params.append(semester)
+        rows = self._connect().execute(
+            'SELECT m.id, m.filename, s.semester, s.sgpa, s.class_awarded '
+            'FROM semesters s JOIN marksheets m ON m.id = s.marksheet_id '
+            f'WHERE {" AND ".join(clauses)} ORDER BY s.sgpa DESC, m.id LIMIT ? OFFSET ?',
+            (*params, limit, offset))
+        return [dict(row) for row in rows]
+
+    def class_counts(self, semester: Optional[str] = None) -> Dict[str, int]:
+        """Class awarded breakdown, overall (CGPA) or for one semester name"""
+        conn = self._connect()
+        if semester:
+            rows = conn.execute('SELECT class_awarded, COUNT(*) FROM semesters WHERE semester = ? '
+                                'GROUP BY class_awarded', (semester,))
+        else:
+            rows = conn.execute('SELECT class_awarded, COUNT(*) FROM marksheets '
+                                'WHERE class_awarded IS NOT NULL GROUP BY class_awarded')
+        return {row[0]: row[1] for row in rows}
+
+    def grade_counts(self, subcode: str) -> Dict[str, int]:
+        """Grade distribution for one subject"""
+        rows = self._connect().execute(
+            'SELECT grade, COUNT(*) FROM subjects WHERE subcode = ? GROUP BY grade', (subcode,))
+        return {row[0]: row[1] for row in rows}
+
+    def summary(self, marksheet_id: int) -> Optional[Dict[str, Any]]:
+        """Indexed columns of one marksheet, without the stored result"""
+        row = self._connect().execute(
+            'SELECT id, filename, semesters, cgpa, class_awarded, backlogs FROM marksheets WHERE id = ?',
+            (marksheet_id,)).fetchone()
+        return dict(row) if row else None
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._connect()
+        return {
+            'marksheets': conn.execute('SELECT COUNT(*) FROM marksheets').fetchone()[0],
+            'semesters': conn.execute('SELECT COUNT(*) FROM semesters').fetchone()[0],
+            'subjects': conn.execute('SELECT COUNT(*) FROM subjects').fetchone()[0]
+        }
+
+
+def get_results_index() -> Optional[ResultsIndex]:
+    """Return the results index registered on the current app (None if disabled)"""
+    return current_app.extensions.get('results_index')
+
+
+def has_admin_token() -> bool:
+    """Whether the request carries `Authorization: Bearer <INDEX_ADMIN_TOKEN>` (never true if unset)"""
+    token = current_app.config.get('INDEX_ADMIN_TOKEN')
+    scheme, _, given = request.headers.get('Authorization', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(given.strip(), token)
+
+
+###############################
+# FLASK ROUTE HANDLERS
+###############################
+
+def _paging() -> Tuple[int, int]:
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    return max(limit, 0), max(request.args.get('offset', 0, type=int), 0)
+
+
+@index_bp.before_request
+def require_index():
+    if get_results_index() is None:
+        return jsonify({'error': 'Results index is disabled'}), 404
+    if not has_admin_token():
+        return jsonify({'error': 'An admin token is required'}), 403
+
+
+@index_bp.route('/stats')
+def index_stats():
+    """Row counts of the results index"""
+    return jsonify(get_results_index().stats())
+
+
+@index_bp.route('/subjects/<subcode>/students')
+def subject_students(subcode):
+    """Students with a given grade (default F) in one subject"""
+    limit, offset = _paging()
+    grade = request.args.get('grade', 'F')
+    return jsonify({'subcode': subcode, 'grade': grade,
+                    'students': get_results_index().students_with_grade(subcode, grade, limit, offset)})
+
+
+@index_bp.route('/subjects/<subcode>/grades')
+def subject_grades(subcode):
+    """Grade distribution of one subject"""
+    return jsonify({'subcode': subcode, 'grades': get_results_index().grade_counts(subcode)})
+
+
+@index_bp.route('/sgpa')
+def sgpa_range():
+    """Semester results whose SGPA lies in [min, max]"""
+    limit, offset = _paging()
+    return jsonify({'results': get_results_index().sgpa_range(
+        request.args.get('min', type=float), request.args.get('max', type=float),
+        request.args.get('semester'), limit, offset)})
+
+
+@index_bp.route('/classes')
+def class_breakdown():
+    """Class awarded counts, overall or for ?semester=Fifth Semester"""
+    return jsonify(get_results_index().class_counts(request.args.get('semester')))
+
+
+@index_bp.route('/marksheets/<int:marksheet_id>')
+def marksheet(marksheet_id):
+    """Indexed columns of one marksheet plus its stored result JSON"""
+    index = get_results_index()
+    data = index.summary(marksheet_id)
+    if data is None:
+        return jsonify({'error': 'Unknown marksheet'}), 404
+    data['result'] = index.get(marksheet_id)
+    return jsonify(data)
@@ -0,0 +1,125 @@
+"""Production server: the app under gunicorn, warmed up before it takes traffic.
+
+Usage:
+    python serve.py [--bind HOST:PORT] [--worker-class sync|gthread|gevent|aiohttp]
+                    [--workers N] [--threads N] [--timeout SECONDS] [--check]
+
+Every option can also come from the environment (WEB_BIND, WEB_WORKER_CLASS,
+WEB_WORKERS, WEB_THREADS, WEB_TIMEOUT); flags win. The app is imported and
+warmed up (pdftotext checked, templates compiled) in the master process
+and the workers fork from it (preload_app), so they start ready and share
+that memory copy-on-write. --check runs the warm-up, prints it and exits.
+
+Unless set explicitly, PDFTOTEXT_CONCURRENCY and BULK_WORKERS are each
+worker's share of the cores, so the workers' pdftotext runs and bulk
+pools together fit the machine; PDFTOTEXT_HOST_CONCURRENCY caps the
+pdftotext runs across all of them.
+
+The aiohttp worker class serves the asyncio path in async_app.py instead
+of the Flask app: only the JSON API, /ready and /metrics.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+from typing import Any, Dict
+
+WORKER_CLASSES = ['sync', 'gthread', 'gevent', 'aiohttp']
+
+# Worker classes gunicorn does not ship itself, by their import path
+GUNICORN_WORKERS = {'aiohttp': 'aiohttp.GunicornWebWorker'}
+
+
+def available_cores() -> int:
+    """CPUs this process may run on (respects container CPU sets)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def default_workers(worker_class: str, cores: int) -> int:
+    """Worker processes for a worker class on this many cores.
+
+    Sync workers spend most of a request waiting on pdftotext, so use
+    gunicorn's 2 x cores + 1. Threaded, gevent and aiohttp workers overlap
+    requests inside each process, so one per core is enough.
+    """
+    if worker_class == 'sync':
+        return 2 * cores + 1
+    return cores
+
+
+def per_worker_share(workers: int, cores: int) -> int:
+    """Each worker's share of the cores (at least one)"""
+    return max(1, cores // workers)
+
+
+def gunicorn_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """gunicorn settings for the parsed command line"""
+    options = {
+        'bind': args.bind,
+        'worker_class': GUNICORN_WORKERS.get(args.worker_class, args.worker_class),
+        'workers': args.workers or default_workers(args.worker_class, available_cores()),
+        'timeout': args.timeout,
+        'preload_app': True,
+        'accesslog': '-',
+        'errorlog': '-',
+    }
+    if args.worker_class == 'gthread':
+        options['threads'] = args.threads
+    return options
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bind', default=os.environ.get('WEB_BIND', '127.0.0.1:5000'))
+    parser.add_argument('--worker-class', choices=WORKER_CLASSES,
+                        default=os.environ.get('WEB_WORKER_CLASS', 'sync'))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_WORKERS', 0)),
+                        help='Worker processes (default: derived from the available cores)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WEB_THREADS', 4)),
+                        help='Threads per gthread worker')
+    parser.add_argument('--timeout', type=int, default=int(os.environ.get('WEB_TIMEOUT', 120)),
+                        help='Seconds before a silent worker is restarted (bulk uploads are slow)')
+    parser.add_argument('--check', action='store_true', help='Run the warm-up, print it and exit')
+    args = parser.parse_args(argv)
+
+    if args.worker_class in ('gevent', 'aiohttp') and importlib.util.find_spec(args.worker_class) is None:
+        parser.error(f"the {args.worker_class} worker class needs {args.worker_class} installed")
+
+    # Settings the app reads at import, so they must be in place before it loads
+    cores = available_cores()
+    args.workers = args.workers or default_workers(args.worker_class, cores)
+    share = str(per_worker_share(args.workers, cores))
+    os.environ.setdefault('PDFTOTEXT_CONCURRENCY', share)
+    os.environ.setdefault('BULK_WORKERS', share)
+
+    from app import app, warm_up
+
+    application = app
+    if args.worker_class == 'aiohttp':
+        from async_app import create_app
+        application = create_app()
+
+    state = warm_up()
+    if args.check or not state['ready']:
+        print(json.dumps(state, indent=2), file=sys.stderr)
+        return 0 if state['ready'] else 1
+
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options(args).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return application
+
+    Server().run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,39 @@
-import subprocess
-import re
-import os
+"""Batch marksheet extraction over a directory tree.
+
+Usage:
+    python test.py MARKSHEETS_DIR [-o results.jsonl | -o results.sqlite3] [--workers N]
+                   [--manifest PATH] [--force] [--retry-failed] [--parser regex|columns]
+                   [--pages 1-1] [--crop x,y,W,H] [--timeout 30]
+
+Every *.pdf under MARKSHEETS_DIR goes through the marksheet pipeline in a
+pool of worker processes. Results are appended to one JSON Lines file, or
+upserted into a SQLite table when the output ends in .sqlite3/.sqlite/.db,
+one record per PDF keyed by its path relative to MARKSHEETS_DIR.
+
+A manifest (SQLite, default OUTPUT.manifest.sqlite3) remembers the
+(path, size, mtime, sha256) of every PDF already handled and the --parser,
+--pages and --crop it was handled with. Re-runs skip PDFs whose size and
+mtime are unchanged, or whose content hashes the same, unless those
+settings differ; a run stopped part way resumes with the PDFs it had not
+reached. A
+PDF is only entered in the manifest after its result has been written;
+after a crash a JSON Lines file can hold a repeated record, in which case
+the last one for a path wins.
+"""
+import argparse
+import hashlib
 import json
+import os
+import sqlite3
 import sys
-from datetime import datetime
-from enum import Enum
-from typing import Dict, List, Tuple, Optional, Any, Union
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from marksheet import ExtractionError, ParseError, extract_table_text, parse_text
+from pdf_region import region_args
+
 
 # ANSI color codes for terminal output
 class Colors:
@@ -36,469 +64,333 @@ def print_processing_header(message: str):
 def print_processing_step(step: int, message: str):
     print(f"{Colors.BLUE}{step}. {message}{Colors.RESET}")
 
-# Create a folder based on PDF name and return its path
-def create_output_folder(pdf_file: str) -> str:    
-    base_name = os.path.splitext(os.path.basename(pdf_file))[0]
-    folder_name = f"{base_name}"
-    os.makedirs(folder_name, exist_ok=True)
-    return folder_name
 
-# Extract text from PDF using pdftotext and save to output file
-def extract_pdf_text(pdf_file: str, output_txt: str) -> Tuple[bool, str]:   
-    try:
-        result = subprocess.run(
-            ['pdftotext', '-layout', pdf_file, '-'],
-            check=True, capture_output=True, text=True
-        )
-        raw_text = result.stdout
-        
-        with open(output_txt, 'w', encoding='utf-8') as f:
-            f.write(raw_text)
-            
-        return True, raw_text
-    except subprocess.CalledProcessError as e:
-        print_error(f"Failed to extract text: {e}")
-        return False, ""
-    except FileNotFoundError:
-        print_error("'pdftotext' not found. Make sure Poppler is installed and in PATH.")
-        return False, ""
-
-# Save raw text data to a file
-def save_raw_data(raw_text: str, folder_path: str, base_name: str) -> str:
-    raw_filename = os.path.join(folder_path, f"raw_{base_name}.txt")
-    with open(raw_filename, 'w', encoding='utf-8') as f:
-        f.write(raw_text)
-    return raw_filename
-
-# Extract subject table from raw text and save to file
-def extract_subject_table(input_txt: str, raw_text: str) -> str:
-    lines = raw_text.split('\n')
-    table_lines = []
-    header_found = False
-    header_line_index = -1
-
-    # Find the table header
-    for i, line in enumerate(lines):
-        if re.search(r'Sem\s+SubCode\s+Subject Name', line):
-            header_found = True
-            header_line_index = i
-            table_lines.append(line.strip())
-            break
-    
-    if not header_found:
-        print_error("Could not find table header in the PDF text.")
-        return ""
-    
-    # Extract table rows until end marker is found
-    for line in lines[header_line_index+1:]:
-        if re.search(r'SGPA|RESULT DATE', line, re.IGNORECASE):
-            break
-        if line.strip() == "":
-            continue
-        table_lines.append(line.rstrip())
-
-    # Save extracted table
-    table_text = '\n'.join(table_lines)
-    with open(input_txt, 'w', encoding='utf-8') as out_file:
-        out_file.write(table_text)
-    return table_text
-
-# Fix and standardize table headers
-def fix_table_headers(input_txt: str) -> bool:
-    try:
-        with open(input_txt, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        if len(lines) < 2:
-            print_error(f"Error: {input_txt} must have at least two lines for header fixing.")
-            return False
-        
-        header_line1 = lines[0].rstrip()
-        header_line2 = lines[1].rstrip()
-        fixed_header = header_line1
-
-        # Add 'Ern' if it's missing in header1 but present in header2
-        if 'Ern' in header_line2:
-            ern_pos = header_line1.find('Crd')
-            if ern_pos >= 0:
-                fixed_header = fixed_header[:ern_pos+3] + " Ern" + fixed_header[ern_pos+3:]
-
-        # Add 'Pnt' if it's missing in header1 but present in header2
-        if 'Crd' in fixed_header and 'Pnt' in header_line2:
-            crd_positions = [i for i in range(len(fixed_header)) if fixed_header.startswith('Crd', i)]
-            if crd_positions:
-                last_crd_pos = crd_positions[-1]
-                fixed_header = fixed_header[:last_crd_pos+3] + "Pnt" + fixed_header[last_crd_pos+3:]
-
-        # Standardize subject name column
-        fixed_header = re.sub(r'Subject\s+name', 'SubjectName', fixed_header)
-        fixed_content = [fixed_header + '\n'] + lines[2:]
-
-        with open(input_txt, 'w', encoding='utf-8') as f:
-            f.writelines(fixed_content)
-
-        return True
-    except Exception as e:
-        print_error(f"Error processing file: {e}")
-        return False
-
-# Remove the semester column from the table
-def remove_sem_column(txt_path: str) -> bool:
+HASH_CHUNK = 64 * 1024  # bytes per read while hashing a PDF
+SQLITE_SUFFIXES = ('.sqlite3', '.sqlite', '.db')
+
+###############################
+# PER-FILE WORK (POOL WORKERS)
+###############################
+
+# Hash a file from the start, leaving it ready to be read again
+def file_digest(f: BinaryIO) -> str:
+    sha256 = hashlib.sha256()
+    for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+        sha256.update(chunk)
+    f.seek(0)
+    return sha256.hexdigest()
+
+# Process one PDF inside a worker; known_hash is the sha256 of the last good run, if any
+def process_file(path: str, known_hash: Optional[str], region: Sequence[str],
+                 timeout: Optional[float], parser: str) -> Dict[str, Any]:
+    digest = None
     try:
-        with open(txt_path, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-
-        if not lines:
-            print_error("The file is empty.")
-            return False
-
-        header_line = lines[0]
-        sem_index = header_line.find("Sem")
-        if sem_index == -1:
-            print_error("No 'Sem' column found.")
-            return False
-
-        sem_width = 4
-        new_lines = []
-        for line in lines:
-            if len(line) > sem_index + sem_width:
-                new_lines.append(line[:sem_index] + line[sem_index+sem_width:])
-            else:
-                new_lines.append(line[:sem_index])
-
-        with open(txt_path, 'w', encoding='utf-8') as file:
-            file.writelines(new_lines)
-
-        return True
-    except Exception as e:
-        print_error(f"Error removing 'Sem' column: {e}")
-        return False
-
-# Parse marksheet text into structured records. Handles all cases including special characters and edge cases.
-def parse_marksheet(text: str) -> List[Dict[str, Any]]:
-    lines = text.split('\n')
-    records = []
-    skipped_lines = []
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        i += 1
-        
-        if not line or line.startswith('SubCode'):
-            continue
-            
-        # Check if this is a main subject line (with SubCode at the beginning)
-        main_line_match = re.match(r'^\*?\s*(\S+)\s+(.*)', line)
-        if not main_line_match:
-            skipped_lines.append(f"Line not matched: {line}")
-            continue
-            
-        # Extract SubCode and the rest of the line
-        sub_code = main_line_match.group(1)
-        rest_of_line = main_line_match.group(2).strip()
-        
-        # Check if there's an 'E' after the subject code
-        if sub_code.endswith('E') and rest_of_line.startswith('FOREIGN LANGUAGE'):
-            sub_code = sub_code[:-1]  # Remove 'E' from subject code
-            
-        # Extract subject name and data part
-        subject_name = ""
-        data_part = ""
-        has_ac = False
-        
-        # Check if this line contains "AC" (Additional Credit)
-        ac_match = re.search(r'\bAC\b', rest_of_line)
-        if ac_match:
-            has_ac = True
-            # Extract subject name (everything before AC)
-            data_part = "AC"
-            subject_name = rest_of_line[:ac_match.start()].strip()
-            
-            # Check if there's a continuation line
-            while i < len(lines):
-                next_line = lines[i].strip()
-                if not next_line:
-                    i += 1
-                    continue
-                
-                # If next line starts with a SubCode, it's a new subject
-                if re.match(r'^\*?\s*\d+', next_line):
-                    break
-                
-                # Otherwise, it's a continuation of the current subject name
-                subject_name += " " + next_line
-                i += 1
+        with open(path, 'rb') as f:
+            digest = file_digest(f)
+            if digest == known_hash:
+                # Touched but not changed: nothing to redo
+                return {'sha256': digest, 'unchanged': True}
+            parsed = parse_text(extract_table_text(f, region, timeout), parser)
+    except (OSError, ExtractionError, ParseError) as e:
+        return {'sha256': digest, 'ok': False, 'error': str(e)}
+    return {'sha256': digest, 'ok': True, 'result': {
+        "filename": os.path.basename(path),
+        "basic_info": parsed["basic_info"],
+        "subject_table": parsed["subject_table"]
+    }}
+
+###############################
+# MANIFEST AND OUTPUT
+###############################
+
+class ManifestEntry(NamedTuple):
+    size: int
+    mtime_ns: int
+    sha256: Optional[str]
+    ok: bool
+    settings: Optional[str]  # run_settings() the PDF was processed with
+
+def run_settings(parser: str, region: Sequence[str]) -> str:
+    """Parser and pdftotext region of a run, as stored in the manifest"""
+    return json.dumps({'parser': parser, 'region': list(region)}, sort_keys=True)
+
+class Manifest:
+    """(path, size, mtime, sha256), settings and outcome of every PDF already processed"""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            sha256 TEXT,
+            ok INTEGER NOT NULL,
+            error TEXT,
+            processed_at REAL NOT NULL,
+            settings TEXT
+        )""")
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(files)')]
+        if 'settings' not in columns:
+            # Manifest from before settings were recorded: its PDFs count as changed
+            self.conn.execute('ALTER TABLE files ADD COLUMN settings TEXT')
+
+    def load(self) -> Dict[str, ManifestEntry]:
+        rows = self.conn.execute('SELECT path, size, mtime_ns, sha256, ok, settings FROM files')
+        return {path: ManifestEntry(size, mtime_ns, sha256, bool(ok), settings)
+                for path, size, mtime_ns, sha256, ok, settings in rows}
+
+    def record(self, path: str, size: int, mtime_ns: int, sha256: Optional[str], ok: bool, settings: str,
+               error: Optional[str] = None) -> None:
+        self.conn.execute('INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256, ok, error, processed_at, '
+                          'settings) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                          (path, size, mtime_ns, sha256, int(ok), error, time.time(), settings))
+
+    def touch(self, path: str, size: int, mtime_ns: int) -> None:
+        """New size/mtime for a PDF whose content has not changed"""
+        self.conn.execute('UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?', (size, mtime_ns, path))
+
+    def close(self) -> None:
+        self.conn.close()
+
+class JsonLinesWriter:
+    """Appends one JSON record per line"""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()  # On disk before the manifest says it is done
+
+    def close(self) -> None:
+        self.file.close()
+
+class SqliteWriter:
+    """Keeps the latest record per path in a `results` table, with the run_settings() behind it"""
+
+    def __init__(self, path: str, settings: str):
+        self.settings = settings
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS results (
+            path TEXT PRIMARY KEY,
+            sha256 TEXT,
+            ok INTEGER NOT NULL,
+            error TEXT,
+            data TEXT,
+            processed_at REAL NOT NULL,
+            settings TEXT
+        )""")
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(results)')]
+        if 'settings' not in columns:
+            # Output from before settings were recorded
+            self.conn.execute('ALTER TABLE results ADD COLUMN settings TEXT')
+
+    def write(self, record: Dict[str, Any]) -> None:
+        data = json.dumps(record['result'], ensure_ascii=False) if record['ok'] else None
+        self.conn.execute('INSERT OR REPLACE INTO results (path, sha256, ok, error, data, processed_at, settings) '
+                          'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                          (record['path'], record['sha256'], int(record['ok']), record.get('error'), data,
+                           time.time(), self.settings))
+
+    def close(self) -> None:
+        self.conn.close()
+
+def open_writer(path: str, settings: str):
+    if path.lower().endswith(SQLITE_SUFFIXES):
+        return SqliteWriter(path, settings)
+    return JsonLinesWriter(path)
+
+###############################
+# PLANNING AND PROGRESS
+###############################
+
+class Task(NamedTuple):
+    path: str  # relative to the input directory
+    full_path: str
+    size: int
+    mtime_ns: int
+    known_hash: Optional[str]
+
+# Yield every PDF under root, in a stable order
+def iter_pdfs(root: str) -> Iterator[str]:
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith('.pdf'):
+                yield os.path.join(directory, name)
+
+# Split the PDFs under root into work to do and a count of files the manifest says are done
+def plan(root: str, done: Dict[str, ManifestEntry], force: bool, retry_failed: bool,
+         settings: str) -> Tuple[List[Task], int]:
+    tasks = []
+    skipped = 0
+    for full_path in iter_pdfs(root):
+        path = os.path.relpath(full_path, root)
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            continue  # Removed while we were walking
+        entry = None if force else done.get(path)
+        if entry is not None and entry.settings != settings:
+            entry = None  # Processed with another parser or region: redo it
+        if entry is not None and not (retry_failed and not entry.ok):
+            if (entry.size, entry.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                skipped += 1
+                continue
+            tasks.append(Task(path, full_path, stat.st_size, stat.st_mtime_ns, entry.sha256))
         else:
-            # Try to find where the data begins (normal grade pattern)
-            data_match = re.search(r'(\d+\s+\d+\s+[A-Z+]+\s+\d+\s+\d+.*)$', rest_of_line)
-            if data_match:
-                # We found data on the same line
-                data_part = data_match.group(1)
-                subject_name = rest_of_line[:data_match.start()].strip()
-                
-                # Check if there's a continuation line
-                while i < len(lines):
-                    next_line = lines[i].strip()
-                    if not next_line:
-                        i += 1
-                        continue
-                        
-                    # If next line starts with a SubCode, it's a new subject
-                    if re.match(r'^\*?\s*\d+', next_line):
-                        break
-                        
-                    # If next line has data pattern, it's a new subject
-                    if re.search(r'(\d+\s+\d+\s+[A-Z+]+\s+\d+\s+\d+.*|\bAC\b)$', next_line):
-                        break
-                        
-                    # Otherwise, it's a continuation of the current subject name
-                    subject_name += " " + next_line
-                    i += 1
-            else:
-                # No data on this line, so the subject name might continue on next line
-                subject_name = rest_of_line
-                
-                # Look for data on the next lines
-                found_data = False
-                while i < len(lines) and not found_data:
-                    next_line = lines[i].strip()
-                    if not next_line:
-                        i += 1
-                        continue
-                        
-                    # If next line starts with a SubCode, it's a new subject
-                    if re.match(r'^\*?\s*\d+', next_line):
-                        # Special case for foreign language subject
-                        if "FOREIGN LANGUAGE" in subject_name:
-                            data_part = "AC"  # Assume it's AC
-                            has_ac = True
-                            found_data = True
-                            break
-                        else:
-                            skipped_lines.append(f"No data found for subject: {subject_name}")
-                            found_data = False
-                            break
-                    
-                    # Check for "AC" in the next line
-                    ac_match = re.search(r'\bAC\b', next_line)
-                    if ac_match:
-                        data_part = "AC"
-                        has_ac = True
-                        # There might be subject name continuation on this line
-                        subject_name_part = next_line[:ac_match.start()].strip()
-                        if subject_name_part:
-                            subject_name += " " + subject_name_part
-                        found_data = True
-                        i += 1
-                        continue
-                        
-                    # Check if this line has normal grade data
-                    data_match = re.search(r'(\d+\s+\d+\s+[A-Z+]+\s+\d+\s+\d+.*)$', next_line)
-                    if data_match:
-                        data_part = data_match.group(1)
-                        # There might be subject name continuation on this line
-                        subject_name_part = next_line[:data_match.start()].strip()
-                        if subject_name_part:
-                            subject_name += " " + subject_name_part
-                        found_data = True
-                        i += 1
-                    else:
-                        # Special check for "Basic Electrical Engineering" case
-                        basic_eng_match = re.search(r'(\d+\s+\d+\s+[A-Z+]+\s+\d+\s+\d+.*)', next_line)
-                        if basic_eng_match:
-                            data_part = basic_eng_match.group(1)
-                            # There might be subject name continuation on this line
-                            subject_name_part = next_line[:basic_eng_match.start()].strip()
-                            if subject_name_part:
-                                subject_name += " " + subject_name_part
-                            found_data = True
-                            i += 1
-                        else:
-                            # It's just a continuation of subject name
-                            subject_name += " " + next_line
-                            i += 1
-                
-                if not found_data:
-                    # Special case for foreign language subjects
-                    if "FOREIGN LANGUAGE" in subject_name:
-                        data_part = "AC"
-                        has_ac = True
-                    else:
-                        skipped_lines.append(f"No data found for subject: {subject_name}")
-                        continue
-        
-        # Clean up the subject name (remove extra spaces)
-        subject_name = re.sub(r'\s+', ' ', subject_name).strip()
-        
-        # Process the data and create a record
-        if has_ac or data_part == "AC":
-            record = {
-                'SubCode': sub_code,
-                'SubjectName': subject_name,
-                'Credit': None,
-                'EarnedCredit': None,
-                'Grade': 'AC',
-                'GradePoint': None,
-                'CreditPoint': None
-            }
+            tasks.append(Task(path, full_path, stat.st_size, stat.st_mtime_ns, None))
+    return tasks, skipped
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+class Progress:
+    """Done/total, throughput and ETA on stderr: one redrawn line on a terminal, a line every 10s otherwise"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.counts = {'ok': 0, 'failed': 0, 'unchanged': 0}
+        self.start = time.monotonic()
+        self.tty = sys.stderr.isatty()
+        self.interval = 0.5 if self.tty else 10
+        self.last_shown = 0.0
+
+    def add(self, outcome: str) -> None:
+        self.counts[outcome] += 1
+        if time.monotonic() - self.last_shown >= self.interval:
+            self.show()
+
+    def line(self) -> str:
+        done = sum(self.counts.values())
+        elapsed = time.monotonic() - self.start
+        rate = done / elapsed if elapsed else 0
+        eta = format_duration((self.total - done) / rate) if rate else '--'
+        width = len(str(self.total))
+        return (f"[{done:>{width}}/{self.total}] ok {self.counts['ok']}  failed {self.counts['failed']}  "
+                f"unchanged {self.counts['unchanged']}  {rate:.1f} PDFs/s  ETA {eta}")
+
+    def show(self, final: bool = False) -> None:
+        self.last_shown = time.monotonic()
+        if self.tty:
+            print(f"\r\033[K{self.line()}", end='\n' if final else '', file=sys.stderr, flush=True)
         else:
-            # Keep the data part as-is (including # if present)
-            data_values = re.findall(r'\S+', data_part)
-            if len(data_values) >= 5:
-                record = {
-                    'SubCode': sub_code,
-                    'SubjectName': subject_name,
-                    'Credit': data_values[0],
-                    'EarnedCredit': data_values[1],
-                    'Grade': data_values[2],
-                    'GradePoint': data_values[3],
-                    'CreditPoint': data_values[4]  # This will include # if present
-                }
-            else:
-                skipped_lines.append(f"Couldn't parse data: {data_part}")
-                continue
-        
-        records.append(record)
-    
-    if skipped_lines:
-        print_warning("Skipped lines during parsing:")
-        for line in skipped_lines:
-            print(f"  {Colors.YELLOW}{line}{Colors.RESET}", file=sys.stderr)
-    
-    return records
-
-def extract_sgpa_info(text: str) -> List[Dict[str, Any]]:
-    pattern = re.compile(
-        r'(?P<semester>\b(?:First|Second|Third|Fourth|Fifth|Sixth|Seventh|Eighth)\s+Semester)\s+SGPA\s*:\s*(?P<sgpa>[^\s]+)\s+Credits Earned/Total\s*:\s*(?P<earned>\d+)/(?P<total>\d+)\s+Total Credit Points\s*:\s*(?P<points>\d+)',
-        re.IGNORECASE
-    )
-
-    results = []
-    for match in pattern.finditer(text):
-        raw_sgpa = match.group("sgpa")
+            print(self.line(), file=sys.stderr, flush=True)
+
+###############################
+# BATCH RUN
+###############################
+
+# Feed tasks through the pool, writing each result and then its manifest entry as it arrives
+def run_batch(tasks: List[Task], writer, manifest: Manifest, progress: Progress, workers: int,
+              region: Sequence[str], timeout: Optional[float], parser: str) -> None:
+    settings = run_settings(parser, region)
+    pending: Dict[Future, Task] = {}
+    queue = iter(tasks)
+    window = workers * 4  # Enough queued work to keep every worker busy, without one future per PDF
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        def submit_more() -> None:
+            while len(pending) < window:
+                task = next(queue, None)
+                if task is None:
+                    return
+                pending[pool.submit(process_file, task.full_path, task.known_hash, region, timeout, parser)] = task
+
         try:
-            # Try to parse SGPA as float; if it works, it's valid
-            float(raw_sgpa)
-            sgpa = raw_sgpa
-        except ValueError:
-            # If it's not a float (e.g., symbols, dashes, gibberish), normalize to "--"
-            sgpa = "--"
-
-        results.append({
-            "semester": match.group("semester").title(),
-            "sgpa": sgpa,
-            "earned_credits": match.group("earned"),
-            "total_credits": match.group("total"),
-            "total_credit_points": match.group("points")
-        })
-    return results
-
-
-# Convert processed text file to JSON format with both subject table and SGPA info
-def txt_to_json(input_filename: str, output_folder: str, raw_text: str) -> Optional[str]:
+            submit_more()
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = pending.pop(future)
+                    try:
+                        outcome = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        outcome = {'sha256': None, 'ok': False, 'error': f"Worker error: {e}"}
+                    if outcome.get('unchanged'):
+                        manifest.touch(task.path, task.size, task.mtime_ns)
+                        progress.add('unchanged')
+                        continue
+                    record = {'path': task.path, 'sha256': outcome['sha256'], 'size': task.size,
+                              'ok': outcome['ok']}
+                    if outcome['ok']:
+                        record['result'] = outcome['result']
+                    else:
+                        record['error'] = outcome['error']
+                    writer.write(record)
+                    manifest.record(task.path, task.size, task.mtime_ns, outcome['sha256'], outcome['ok'],
+                                    settings, outcome.get('error'))
+                    progress.add('ok' if outcome['ok'] else 'failed')
+                submit_more()
+        except BaseException:
+            # Ctrl-C or a dead worker: drop queued work, keep what is recorded
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('directory', help='Directory tree of marksheet PDFs')
+    parser.add_argument('-o', '--output', default='marksheets.jsonl',
+                        help='JSON Lines file, or SQLite database if it ends in .sqlite3/.sqlite/.db')
+    parser.add_argument('--manifest', help='Manifest database (default: OUTPUT.manifest.sqlite3)')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    parser.add_argument('--force', action='store_true', help='Ignore the manifest and process every PDF')
+    parser.add_argument('--retry-failed', action='store_true', help='Process PDFs that failed before again')
+    parser.add_argument('--parser', choices=['regex', 'columns'], default='regex', help='Subject table parser')
+    parser.add_argument('--pages', default='1-1', help="pdftotext page range tried first ('' = all pages)")
+    parser.add_argument('--crop', default='', help="pdftotext crop box 'x,y,W,H' tried first ('' = whole page)")
+    parser.add_argument('--timeout', type=float, default=30, help='Seconds before a pdftotext run is killed')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print_error(f"Input directory not found: {args.directory}")
+        return 2
     try:
-        with open(input_filename, 'r', encoding='utf-8') as file:
-            content = file.read()
-        
-        # Parse subject table
-        subject_records = parse_marksheet(content)
-        
-        if not subject_records:
-            print_warning(f"No subject records parsed from {input_filename}")
-        
-        # Extract SGPA information from raw text
-        sgpa_info = extract_sgpa_info(raw_text)
-        
-        if not sgpa_info:
-            print_warning("No SGPA information found in the document")
-        
-        # Combine both sets of data
-        combined_data = {
-            "basic_info": sgpa_info,
-            "subject_table": subject_records
-        }
-        
-        # Generate JSON filename in the output folder
-        base_name = os.path.splitext(os.path.basename(input_filename))[0]
-        base_name = base_name.replace("subjects_", "")  # Remove subjects_ prefix if present
-        output_filename = os.path.join(output_folder, f"{base_name}.json")
-        
-        with open(output_filename, 'w', encoding='utf-8') as file:
-            json.dump(combined_data, file, indent=4)
-        
-        return output_filename, len(subject_records), len(sgpa_info)
-    except Exception as e:
-        print_error(f"Error converting to JSON: {e}")
-        return None, 0, 0
-
-# Main function that processes the PDF marksheet
-def main() -> None:
+        region = region_args(args.pages, args.crop)
+    except ValueError as e:
+        print_error(str(e))
+        return 2
+
+    settings = run_settings(args.parser, region)
+    manifest = Manifest(args.manifest or f"{args.output}.manifest.sqlite3")
+    tasks, skipped = plan(args.directory, manifest.load(), args.force, args.retry_failed, settings)
+    print_processing_header(f"Processing {args.directory}")
+    print_info(f"{len(tasks)} PDFs to process, {skipped} already processed and unchanged")
+
+    writer = open_writer(args.output, settings)
+    progress = Progress(len(tasks))
     try:
-        # Input PDF file
-        pdf_input = "F.E Sem2 Marksheet.pdf"
-        if not os.path.exists(pdf_input):
-            print_error(f"Input file not found: {pdf_input}")
-            return
-            
-        base_name = os.path.splitext(os.path.basename(pdf_input))[0]
-        
-        # Create output folder
-        output_folder = create_output_folder(pdf_input)
-        print_processing_header(f"Processing {pdf_input}")
-        print_info(f"Output will be saved in: {output_folder}")
-        
-        # Generate filenames inside the folder
-        intermediate_txt = os.path.join(output_folder, f"intermediate_{base_name}.txt")
-        subjects_txt = os.path.join(output_folder, f"subjects_{base_name}.txt")
-        
-        # Step 1: Extract text from PDF and get raw data
-        print_processing_step(1, "Extracting text from PDF")
-        success, raw_text = extract_pdf_text(pdf_input, intermediate_txt)
-        if not success:
-            return
-        
-        # Save raw data separately
-        raw_data_file = save_raw_data(raw_text, output_folder, base_name)
-        print_info(f"Raw text saved to: {raw_data_file}")
-        
-        # Step 2: Extract subject table from raw text
-        print_processing_step(2, "Extracting subject table")
-        table_text = extract_subject_table(intermediate_txt, raw_text)
-        if not table_text:
-            return
-        
-        # Step 3: Fix headers
-        print_processing_step(3, "Standardizing table headers")
-        if not fix_table_headers(intermediate_txt):
-            return
-        
-        # Step 4: Remove "Sem" column
-        print_processing_step(4, "Removing semester column")
-        if not remove_sem_column(intermediate_txt):
-            return
-        
-        # Step 5: Rename to subjects file
-        os.rename(intermediate_txt, subjects_txt)
-        print_info(f"Processed subjects saved to: {subjects_txt}")
-        
-        # Step 6: Convert to JSON with both subject table and SGPA info
-        print_processing_step(5, "Creating JSON output")
-        json_output, subject_count, sgpa_count = txt_to_json(subjects_txt, output_folder, raw_text)
-        
-        if not json_output:
-            return
-        
-        # Print summary
-        print_processing_header("Processing Complete")
-        print_info(f"Total subject records: {subject_count}")
-        print_info(f"Total SGPA records: {sgpa_count}")
-        print_success(f"All files saved in: {output_folder}")
-        print_success(f"Final JSON output: {json_output}")
-        
-    except Exception as e:
-        print_error(f"An unexpected error occurred: {e}")
-        print_error("Please check your input file and try again.")
+        if tasks:
+            run_batch(tasks, writer, manifest, progress, max(1, args.workers), region, args.timeout, args.parser)
+    except KeyboardInterrupt:
+        progress.show(final=True)
+        print_warning("Interrupted; run the same command again to resume")
+        return 130
+    except BrokenProcessPool:
+        progress.show(final=True)
+        print_error("A worker process died; run the same command again to resume")
+        return 1
+    finally:
+        writer.close()
+        manifest.close()
+
+    progress.show(final=True)
+    counts = progress.counts
+    print_processing_header("Processing Complete")
+    print_info(f"Processed {counts['ok'] + counts['failed']} PDFs in "
+               f"{format_duration(time.monotonic() - progress.start)}; "
+               f"{counts['unchanged'] + skipped} unchanged")
+    if counts['failed']:
+        print_warning(f"{counts['failed']} PDFs failed (see 'error' in {args.output})")
+    print_success(f"Results in {args.output}")
+    return 1 if counts['failed'] else 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,15 @@
+import os
+import sys
+from typing import List
+
+import pytest
+
+# The modules live at the repository root, which is not an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def corpus() -> List[str]:
+    """pdftotext output of 200 synthetic marksheets (fixed seed)"""
+    from benchmarks.synthetic import generate_corpus
+    return generate_corpus(200, seed=7)
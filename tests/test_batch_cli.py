@@ -0,0 +1,145 @@
+import importlib.util
+import json
+import os
+import sqlite3
+import stat
+import sys
+
+import pytest
+
+from pdf_region import region_args
+
+# test.py, the batch CLI, loaded under another name so it does not shadow the stdlib `test` package
+_spec = importlib.util.spec_from_file_location(
+    'batch_cli', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test.py'))
+batch_cli = importlib.util.module_from_spec(_spec)
+sys.modules['batch_cli'] = batch_cli  # So pool workers (forked) can unpickle process_file
+_spec.loader.exec_module(batch_cli)
+
+STUB_PDFTOTEXT = """#!{python}
+import sys
+data = sys.stdin.buffer.read()
+if not data.startswith(b'%PDF'):
+    sys.stderr.write('Syntax Error: May not be a PDF file')
+    sys.exit(1)
+with open({text_path!r}) as f:
+    sys.stdout.write(f.read())
+"""
+
+REGEX = batch_cli.run_settings('regex', region_args('1-1', ''))
+
+
+@pytest.fixture
+def stub_pdftotext(tmp_path, monkeypatch, corpus):
+    """A pdftotext on PATH that prints one synthetic marksheet for anything starting with %PDF"""
+    text_path = tmp_path / 'marksheet.txt'
+    text_path.write_text(corpus[0])
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    script = bin_dir / 'pdftotext'
+    script.write_text(STUB_PDFTOTEXT.format(python=sys.executable, text_path=str(text_path)))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+@pytest.fixture
+def marksheets(tmp_path):
+    """Three good PDFs (one in a subdirectory) and one that pdftotext rejects"""
+    root = tmp_path / 'marksheets'
+    (root / 'div').mkdir(parents=True)
+    for name in ('a.pdf', 'b.pdf', 'div/c.pdf'):
+        (root / name).write_bytes(b'%PDF-1.4 ' + name.encode())
+    (root / 'broken.pdf').write_bytes(b'not a pdf')
+    (root / 'notes.txt').write_text('not a marksheet')
+    return root
+
+
+def run(root, tmp_path, *args):
+    output = tmp_path / 'out.jsonl'
+    code = batch_cli.main([str(root), '-o', str(output), '-w', '1', *args])
+    return code, [json.loads(line) for line in output.read_text().splitlines()]
+
+
+def load_manifest(tmp_path):
+    manifest = batch_cli.Manifest(str(tmp_path / 'out.jsonl.manifest.sqlite3'))
+    try:
+        return manifest.load()
+    finally:
+        manifest.close()
+
+
+def test_first_run_processes_every_pdf(stub_pdftotext, marksheets, tmp_path):
+    code, records = run(marksheets, tmp_path)
+    assert code == 1  # broken.pdf failed
+    outcomes = {record['path']: record['ok'] for record in records}
+    assert outcomes == {'a.pdf': True, 'b.pdf': True, os.path.join('div', 'c.pdf'): True, 'broken.pdf': False}
+    assert all(record['result']['subject_table'] for record in records if record['ok'])
+
+
+def test_plan_skips_unchanged_and_failed(stub_pdftotext, marksheets, tmp_path):
+    run(marksheets, tmp_path)
+    tasks, skipped = batch_cli.plan(str(marksheets), load_manifest(tmp_path), False, False, REGEX)
+    assert (tasks, skipped) == ([], 4)
+
+
+def test_plan_retries_failed_only_when_asked(stub_pdftotext, marksheets, tmp_path):
+    run(marksheets, tmp_path)
+    tasks, skipped = batch_cli.plan(str(marksheets), load_manifest(tmp_path), False, True, REGEX)
+    assert [task.path for task in tasks] == ['broken.pdf']
+    assert tasks[0].known_hash is None
+    assert skipped == 3
+
+
+def test_plan_hashes_touched_files(stub_pdftotext, marksheets, tmp_path):
+    run(marksheets, tmp_path)
+    done = load_manifest(tmp_path)
+    os.utime(marksheets / 'a.pdf', ns=(0, 0))
+    (marksheets / 'b.pdf').write_bytes(b'%PDF-1.4 changed')
+
+    tasks, skipped = batch_cli.plan(str(marksheets), done, False, False, REGEX)
+    by_path = {task.path: task for task in tasks}
+    assert sorted(by_path) == ['a.pdf', 'b.pdf']
+    assert by_path['a.pdf'].known_hash == done['a.pdf'].sha256
+    assert skipped == 2
+
+    # Only the changed file produces a new record; the touched one is just re-stamped
+    code, records = run(marksheets, tmp_path)
+    assert [record['path'] for record in records[4:]] == ['b.pdf']
+    assert load_manifest(tmp_path)['a.pdf'].mtime_ns == 0
+
+
+def test_plan_redoes_files_processed_with_other_settings(stub_pdftotext, marksheets, tmp_path):
+    run(marksheets, tmp_path)
+    done = load_manifest(tmp_path)
+    for settings in (batch_cli.run_settings('columns', region_args('1-1', '')),
+                     batch_cli.run_settings('regex', region_args('', ''))):
+        tasks, skipped = batch_cli.plan(str(marksheets), done, False, False, settings)
+        assert len(tasks) == 4 and skipped == 0
+        assert all(task.known_hash is None for task in tasks)
+
+    code, records = run(marksheets, tmp_path, '--parser', 'columns')
+    assert len(records) == 8
+
+
+def test_force_ignores_the_manifest(stub_pdftotext, marksheets, tmp_path):
+    run(marksheets, tmp_path)
+    tasks, skipped = batch_cli.plan(str(marksheets), load_manifest(tmp_path), True, False, REGEX)
+    assert len(tasks) == 4 and skipped == 0
+
+
+def test_sqlite_output_keeps_latest_record_per_path(stub_pdftotext, marksheets, tmp_path):
+    output = tmp_path / 'out.sqlite3'
+    assert batch_cli.main([str(marksheets), '-o', str(output), '-w', '1']) == 1
+    (marksheets / 'a.pdf').write_bytes(b'%PDF-1.4 changed')
+    batch_cli.main([str(marksheets), '-o', str(output), '-w', '1'])
+
+    conn = sqlite3.connect(str(output))
+    try:
+        rows = {path: (ok, data, settings) for path, ok, data, settings
+                in conn.execute('SELECT path, ok, data, settings FROM results')}
+    finally:
+        conn.close()
+    assert sorted(rows) == sorted(['a.pdf', 'b.pdf', os.path.join('div', 'c.pdf'), 'broken.pdf'])
+    assert rows['broken.pdf'][:2] == (0, None)
+    assert json.loads(rows['a.pdf'][1])['subject_table']
+    assert {settings for _, _, settings in rows.values()} == {REGEX}
@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+
+from metrics import RETIRED_SNAPSHOT, Metrics, prune_dead_workers
+
+
+def make_metrics() -> Metrics:
+    registry = Metrics()
+    registry.counter('jobs_total', 'Jobs')
+    registry.gauge('queue_depth', 'Queue depth')
+    registry.histogram('latency_seconds', 'Latency', (0.1, 1.0))
+    return registry
+
+
+def dead_pid() -> int:
+    child = subprocess.Popen([sys.executable, '-c', 'pass'])
+    child.wait()
+    return child.pid
+
+
+def write_snapshot(directory, pid, started=None, jobs=0, depth=0):
+    snapshot = {'pid': pid, 'started': started, 'values': {
+        'jobs_total': {'[]': jobs},
+        'queue_depth': {'[]': depth},
+        'latency_seconds': {'[]': {'buckets': [jobs, 0], 'sum': 0.05 * jobs, 'count': jobs}},
+    }}
+    with open(os.path.join(directory, f'metrics_{pid}.json'), 'w') as f:
+        json.dump(snapshot, f)
+
+
+def test_counters_survive_pruning(tmp_path):
+    registry = make_metrics()
+    registry.inc('jobs_total', 2)
+    write_snapshot(tmp_path, dead_pid(), jobs=3, depth=7)
+    before = registry.collect(str(tmp_path))
+    assert before['jobs_total']['[]'] == 5
+    assert before['queue_depth'] == {}  # A dead worker's gauges are dropped
+
+    prune_dead_workers(str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ['.metrics.lock', RETIRED_SNAPSHOT]
+    assert registry.collect(str(tmp_path)) == before
+
+    # Later deaths add to the retired snapshot instead of replacing it
+    write_snapshot(tmp_path, dead_pid(), jobs=4)
+    prune_dead_workers(str(tmp_path))
+    merged = registry.collect(str(tmp_path))
+    assert merged['jobs_total']['[]'] == 9
+    assert merged['latency_seconds']['[]']['count'] == 7
+
+
+def test_reused_pid_is_retired(tmp_path):
+    # A live pid whose snapshot was written by an earlier process with that pid
+    parent = os.getppid()
+    write_snapshot(tmp_path, parent, started=-1, jobs=5, depth=3)
+    prune_dead_workers(str(tmp_path))
+    assert not os.path.exists(tmp_path / f'metrics_{parent}.json')
+    assert make_metrics().collect(str(tmp_path))['jobs_total']['[]'] == 5
+
+
+def test_first_flush_retires_a_predecessor_under_our_pid(tmp_path):
+    write_snapshot(tmp_path, os.getpid(), started=-1, jobs=5)
+    registry = make_metrics()
+    registry.inc('jobs_total')
+    registry.flush(str(tmp_path), min_interval=0)
+    assert registry.collect(str(tmp_path))['jobs_total']['[]'] == 6
+
+
+def test_live_workers_are_kept(tmp_path):
+    registry = make_metrics()
+    registry.inc('jobs_total')
+    registry.flush(str(tmp_path), min_interval=0)
+    prune_dead_workers(str(tmp_path))
+    assert os.path.exists(tmp_path / f'metrics_{os.getpid()}.json')
+    assert registry.collect(str(tmp_path))['jobs_total']['[]'] == 1
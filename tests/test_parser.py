@@ -0,0 +1,57 @@
+import random
+
+from benchmarks.synthetic import generate_marksheet
+from marksheet import iter_table_lines, parse_marksheet, parse_marksheet_columns, parse_text
+
+
+def test_columns_parser_matches_regex_parser(corpus):
+    for text in corpus:
+        assert parse_marksheet_columns(iter_table_lines(text)) == parse_marksheet(iter_table_lines(text))
+
+
+def test_parsers_recover_generated_records():
+    rng = random.Random(11)
+    for _ in range(100):
+        text, records, basic_info = generate_marksheet(rng, fail_rate=0.2)
+        for parser in ('regex', 'columns'):
+            parsed = parse_text(text, parser)
+            assert parsed['subject_table'] == records
+            assert parsed['basic_info'] == basic_info
+
+
+def test_columns_parser_slices_aligned_tables(corpus):
+    stats = {}
+    for text in corpus:
+        parse_marksheet_columns(iter_table_lines(text), stats)
+    assert stats['column'] > 0
+    assert stats['fallback'] < stats['column']
+
+
+def test_misaligned_rows_fall_back_to_regex(corpus):
+    for text in corpus[:50]:
+        lines = list(iter_table_lines(text))
+        # Squeeze the gaps in every row so nothing sits under its header column
+        shifted = lines[:1] + [' '.join(line.split()) for line in lines[1:]]
+        stats = {}
+        assert parse_marksheet_columns(shifted, stats) == parse_marksheet(shifted)
+        assert stats['fallback'] > 0
+
+
+HEADER = 'SubCode   Subject Name                                 Crd Ern Grd Pnt  Crd Pnt'
+FIRST_ROW = '310244    SOME SUBJECT                                 3   3   A   8  24'
+
+
+def test_bare_marker_is_not_a_subject_code():
+    # Row one column off: the code cell holds only the '*' marker
+    lines = [HEADER, FIRST_ROW, '        * 31024 FOO ACTIVITIES-III                         AC']
+    records = parse_marksheet_columns(lines)
+    assert records == parse_marksheet(lines)
+    assert records[1]['SubCode'] == '31024'
+    assert records[1]['SubjectName'] == 'FOO ACTIVITIES-III'
+
+
+def test_ac_inside_grade_data_falls_back():
+    lines = [HEADER, FIRST_ROW, '381445    PROGRAMMING AND PROBLEM SOLVING              4   4   A+AC 9  36']
+    stats = {}
+    assert parse_marksheet_columns(lines, stats) == parse_marksheet(lines)
+    assert stats['fallback'] == 1
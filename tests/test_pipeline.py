@@ -0,0 +1,41 @@
+import baseline
+from marksheet import (extract_subject_table, fix_table_headers, iter_table_lines, parse_marksheet, parse_text,
+                       remove_sem_column)
+
+
+def baseline_table(raw_text: str) -> str:
+    """The normalized table as the original string-by-string pipeline produced it"""
+    return baseline.remove_sem_column(baseline.fix_table_headers(baseline.extract_subject_table(raw_text)))
+
+
+def test_fused_lines_match_baseline(corpus):
+    for text in corpus:
+        assert list(iter_table_lines(text)) == baseline_table(text).split('\n')
+
+
+def test_string_stages_match_baseline(corpus):
+    for text in corpus:
+        table = baseline.extract_subject_table(text)
+        assert extract_subject_table(text) == table
+        assert fix_table_headers(table) == baseline.fix_table_headers(table)
+        assert remove_sem_column(table) == baseline.remove_sem_column(table)
+
+
+def test_records_match_baseline(corpus):
+    for text in corpus:
+        expected = baseline.parse_marksheet(baseline_table(text))
+        assert expected
+        assert parse_marksheet(iter_table_lines(text)) == expected
+        assert parse_text(text) == {'basic_info': baseline.extract_sgpa_info(text), 'subject_table': expected}
+
+
+def test_no_table_header():
+    text = 'SAVITRIBAI PHULE PUNE UNIVERSITY\nno subject table here\n'
+    assert list(iter_table_lines(text)) == []
+    assert extract_subject_table(text) == baseline.extract_subject_table(text) == ''
+
+
+def test_header_without_rows():
+    text = 'Sem SubCode   Subject Name     Crd Ern Grd Pnt  Crd Pnt\nRESULT DATE : 1 JULY 2024\n'
+    assert list(iter_table_lines(text)) == baseline_table(text).split('\n')
+    assert fix_table_headers('Sem SubCode Subject name Crd') == baseline.fix_table_headers('Sem SubCode Subject name Crd')
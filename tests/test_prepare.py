@@ -0,0 +1,46 @@
+import copy
+import json
+
+import pytest
+
+from benchmarks.synthetic import generate_corpus
+from cohort import prepare_result_data_batch
+from marksheet import parse_text
+from processed import BATCH_PREPARE_MIN, prepare_result_data, prepare_results
+
+
+@pytest.fixture(scope='module')
+def results(corpus):
+    """Parsed results as the app stores them, with plenty of backlogs"""
+    texts = corpus + generate_corpus(100, seed=3, fail_rate=0.5)
+    return [{'filename': f'{i}.pdf', **parse_text(text)} for i, text in enumerate(texts)]
+
+
+def per_student(results):
+    return [prepare_result_data(copy.deepcopy(result)) for result in results]
+
+
+def test_batch_matches_per_student(results):
+    # Compared as JSON so NumPy scalars or float/int mix-ups show up too
+    assert json.dumps(prepare_result_data_batch(results)) == json.dumps(per_student(results))
+
+
+def test_batch_leaves_inputs_unmodified(results):
+    before = copy.deepcopy(results)
+    prepare_result_data_batch(results)
+    assert results == before
+
+
+def test_batch_handles_empty_and_failed_results(results):
+    edge = [
+        {'filename': 'empty.pdf', 'basic_info': [], 'subject_table': []},
+        {'filename': 'failed.pdf', 'subject_table': copy.deepcopy(results[0]['subject_table']),
+         'basic_info': [{'semester': 'First Semester', 'sgpa': '--', 'earned_credits': '0',
+                         'total_credits': '20', 'total_credit_points': '0'}]},
+    ]
+    assert json.dumps(prepare_result_data_batch(edge)) == json.dumps(per_student(edge))
+
+
+@pytest.mark.parametrize('count', [1, BATCH_PREPARE_MIN - 1, BATCH_PREPARE_MIN, 150])
+def test_prepare_results_matches_per_student(results, count):
+    assert json.dumps(prepare_results(results[:count])) == json.dumps(per_student(results[:count]))
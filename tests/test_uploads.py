@@ -0,0 +1,30 @@
+import hashlib
+
+import pytest
+
+from cache import pdf_digest
+from uploads import UPLOAD_CHUNK, SpooledUpload, source_chunks, source_digest, source_size
+
+SPOOL_SIZE = 1024
+
+
+@pytest.mark.parametrize('size', [0, 10, SPOOL_SIZE, SPOOL_SIZE + 1, 3 * UPLOAD_CHUNK + 7])
+def test_digest_is_sha256_of_the_body(size):
+    body = bytes(i % 251 for i in range(size))
+    upload = SpooledUpload(SPOOL_SIZE)
+    for start in range(0, size, 1000):
+        upload.write(body[start:start + 1000])
+
+    assert upload.digest == hashlib.sha256(body).hexdigest()
+    assert upload.digest == pdf_digest(body) == source_digest(upload)
+    assert upload.size == source_size(upload) == size
+    assert upload.on_disk == (size > SPOOL_SIZE)
+    assert b''.join(upload.chunks()) == body
+    assert b''.join(source_chunks(upload)) == body
+
+
+def test_bytes_sources():
+    body = b'%PDF-1.4 not really'
+    assert source_digest(body) == hashlib.sha256(body).hexdigest()
+    assert source_size(body) == len(body)
+    assert list(source_chunks(body)) == [body]
@@ -0,0 +1,63 @@
+import hashlib
+import tempfile
+from typing import Iterator, Union
+
+from cache import pdf_digest
+
+UPLOAD_CHUNK = 64 * 1024  # bytes per read when streaming an upload onward
+
+
+class SpooledUpload(tempfile.SpooledTemporaryFile):
+    """Uploaded file kept in memory up to max_size bytes, then spilled to a temp file.
+
+    Every write also feeds a SHA-256, so once the body has been streamed in
+    its cache key is known without reading it back. The digest only holds
+    for bodies written front to back, which is how uploads arrive.
+    """
+
+    def __init__(self, max_size: int):
+        super().__init__(max_size=max_size, mode='w+b')
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._sha256.update(data)
+        self.size += len(data)
+        return super().write(data)
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 hex digest of everything written, same as cache.pdf_digest"""
+        return self._sha256.hexdigest()
+
+    @property
+    def on_disk(self) -> bool:
+        return self._rolled
+
+    def chunks(self, size: int = UPLOAD_CHUNK) -> Iterator[bytes]:
+        """The whole body from the start, size bytes at a time"""
+        self.seek(0)
+        while True:
+            chunk = self.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+
+# What the pipeline accepts: PDF bytes (bulk, jobs) or a streamed upload
+PdfSource = Union[bytes, SpooledUpload]
+
+
+def source_digest(pdf: PdfSource) -> str:
+    return pdf.digest if isinstance(pdf, SpooledUpload) else pdf_digest(pdf)
+
+
+def source_size(pdf: PdfSource) -> int:
+    return pdf.size if isinstance(pdf, SpooledUpload) else len(pdf)
+
+
+def source_chunks(pdf: PdfSource, size: int = UPLOAD_CHUNK) -> Iterator[bytes]:
+    """The PDF in pieces for writing to a pipe (bytes are passed through whole)"""
+    if isinstance(pdf, SpooledUpload):
+        return pdf.chunks(size)
+    return iter((pdf,))